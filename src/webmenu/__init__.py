@@ -1 +1,3 @@
-__all__ = []
+from .session import BuildSession
+
+__all__ = ["BuildSession"]
@@ -0,0 +1,193 @@
+# ============================================================
+# 複数店舗の一括ビルド（webmenu generate-batch）
+# - マニフェスト（store_id, free, osusume, out の一覧）の店舗をプロセスプールでビルド
+# - 解析キャッシュ（ParseCache）を全店舗で共有し、内容が同じ入力は一度だけ解析する
+# - 店舗ごとにログ（{store_id}.log）と結果（{store_id}.json）、全体の集計（batch_summary.json）を出力
+# ============================================================
+import csv
+import datetime
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+from .core.status_file import now, write_status
+from .pipeline import setup_logger
+from .session import BuildSession, BUILD_OPTIONS
+
+SUMMARY_FILE = "batch_summary.json"
+MANIFEST_KEYS = ("store_id", "free", "osusume", "out")
+_STORE_ID_RE = re.compile(r"^[0-9A-Za-z_.-]+$")
+
+
+# ------------------------------------------------------------
+# マニフェスト読み込み
+# JSON（エントリのリスト、または {"stores": [...]}）か CSV（ヘッダ行付き）
+# 相対パスはマニフェストのあるディレクトリからの相対とする
+# ref を持つエントリはその ref でビルドする（省略時はバッチ共通の ref = default_ref）
+# 同じ出力先・同じ ref のエントリは同じ builds/{ref} に同時に書き込むので受け付けない
+# ------------------------------------------------------------
+def load_manifest(path: str, default_ref: str = "") -> List[Dict[str, str]]:
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = [dict(row) for row in csv.DictReader(f)]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rows = data.get("stores", []) if isinstance(data, dict) else data
+
+    base = os.path.dirname(os.path.abspath(path))
+    entries = []
+    seen = set()
+    targets = {}
+    for n, row in enumerate(rows, 1):
+        missing = [key for key in MANIFEST_KEYS if not str(row.get(key) or "").strip()]
+        if missing:
+            raise ValueError(f"manifest entry {n}: missing {', '.join(missing)}")
+        store_id = str(row["store_id"]).strip()
+        if not _STORE_ID_RE.match(store_id):
+            raise ValueError(f"manifest entry {n}: invalid store_id '{store_id}'")
+        if store_id in seen:
+            raise ValueError(f"manifest entry {n}: duplicate store_id '{store_id}'")
+        seen.add(store_id)
+        entry = {"store_id": store_id, "ref": str(row.get("ref") or "").strip()}
+        for key in ("free", "osusume", "out"):
+            entry[key] = os.path.join(base, os.path.expanduser(str(row[key]).strip()))
+        target = (os.path.normcase(os.path.realpath(entry["out"])), entry["ref"] or default_ref)
+        if target in targets:
+            raise ValueError(f"manifest entry {n}: same out and ref as store_id '{targets[target]}'")
+        targets[target] = store_id
+        entries.append(entry)
+    return entries
+
+
+def _store_logger(store_id: str, log_path: str) -> logging.Logger:
+    """店舗ごとのロガー（ファイルのみに出力。コンソールには集計側の進捗だけを出す）。"""
+    logger = logging.getLogger(f"webmenu_generator.batch.{store_id}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s",
+        "%Y-%m-%d %H:%M:%S"))
+    logger.addHandler(handler)
+    return logger
+
+
+def _new_status(entry: Dict[str, str], ref: str, log_dir: str) -> Dict:
+    store_id = entry["store_id"]
+    return {"store_id": store_id, "result": None, "ref": entry["ref"] or ref,
+            "out_root": None, "pid": os.getpid(), "started_at": now(),
+            "finished_at": None, "duration_s": None, "cache_hits": 0, "cache_misses": 0,
+            "log": os.path.join(log_dir, f"{store_id}.log"), "error": None}
+
+
+def _failed_status(entry: Dict[str, str], ref: str, log_dir: str, error: str) -> Dict:
+    """ワーカーが結果を返せなかった店舗の結果（集計側で作って {store_id}.json に書く）。"""
+    status = _new_status(entry, ref, log_dir)
+    status.update(result="error", pid=None, started_at=None, finished_at=now(), error=error)
+    write_status(os.path.join(log_dir, f"{entry['store_id']}.json"), status)
+    return status
+
+
+# ------------------------------------------------------------
+# 1 店舗分のビルド（ワーカープロセスで実行）
+# 例外は送出せず、結果（result が done / error）を返す
+# ------------------------------------------------------------
+def build_store(entry: Dict[str, str], options: Dict, ref: str, cache_dir: str,
+                cache_max_mb: int, log_dir: str) -> Dict:
+    store_id = entry["store_id"]
+    status = _new_status(entry, ref, log_dir)
+    log_path = status["log"]
+    logger = _store_logger(store_id, log_path)
+    session = None
+    start = time.perf_counter()
+    try:
+        session = BuildSession(entry["free"], entry["osusume"], entry["out"],
+                               cache_dir=cache_dir, cache_max_mb=cache_max_mb, logger=logger)
+        status["out_root"] = session.build(status["ref"], options)
+        status["result"] = "done"
+    except Exception as e:
+        status.update(result="error", error=f"{type(e).__name__}: {e}")
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+    if session is not None:
+        status.update(cache_hits=session.cache.disk.hits, cache_misses=session.cache.disk.misses)
+    status.update(finished_at=now(), duration_s=round(time.perf_counter() - start, 3))
+    write_status(os.path.join(log_dir, f"{store_id}.json"), status)
+    return status
+
+
+# ------------------------------------------------------------
+# 一括ビルド
+# args: generate-batch サブコマンドの引数
+# 戻り値: 集計（batch_summary.json の内容）
+# ワーカープロセスが異常終了した店舗も error として集計し、batch_summary.json は必ず書く
+# ------------------------------------------------------------
+def run_batch(args) -> Dict:
+    logger = setup_logger()
+    ref = args.ref or datetime.datetime.now().strftime("%Y%m%d-%H%M%S-000000")
+    entries = load_manifest(args.manifest, ref)
+    workers = args.workers or os.cpu_count() or 1
+    options = {key: getattr(args, key, default) for key, default in BUILD_OPTIONS.items()}
+    log_dir = args.log_dir
+    os.makedirs(log_dir, exist_ok=True)
+
+    # 全店舗で解析キャッシュを共有する（未指定ならバッチの間だけ一時ディレクトリを使う）
+    temp_cache = None if args.cache_dir else tempfile.TemporaryDirectory(prefix="webmenu-batch-")
+    cache_dir = args.cache_dir or temp_cache.name
+    summary = {"started_at": now(), "finished_at": None, "duration_s": None,
+               "workers": workers, "ref": ref, "stores": len(entries), "done": 0, "error": 0,
+               "cache_hits": 0, "cache_misses": 0, "results": []}
+    logger.info("一括ビルドを開始します。店舗数=%d ワーカー数=%d", len(entries), workers)
+    start = time.perf_counter()
+    results: Dict[str, Dict] = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_store, entry, options, ref, cache_dir,
+                                   args.cache_max_mb, log_dir): entry for entry in entries}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:  # BrokenProcessPool など（ワーカーが結果を返せなかった）
+                    status = _failed_status(entry, ref, log_dir, f"{type(e).__name__}: {e}")
+                results[status["store_id"]] = status
+                log = logger.info if status["result"] == "done" else logger.error
+                log("[%d/%d] %s: %s (%.1fs)%s", len(results), len(entries), status["store_id"],
+                    status["result"], status["duration_s"] or 0,
+                    f" {status['error']}" if status["error"] else "")
+    finally:
+        if temp_cache is not None:
+            temp_cache.cleanup()
+        _write_summary(summary, entries, results, ref, log_dir, start)
+
+    logger.info("一括ビルドが完了しました。成功=%d 失敗=%d 時間=%.1fs 解析キャッシュ hits=%d misses=%d 集計: %s",
+                summary["done"], summary["error"], summary["duration_s"],
+                summary["cache_hits"], summary["cache_misses"],
+                os.path.join(log_dir, SUMMARY_FILE))
+    return summary
+
+
+def _write_summary(summary: Dict, entries: List[Dict[str, str]], results: Dict[str, Dict],
+                   ref: str, log_dir: str, start: float):
+    # 結果はマニフェストの順に並べる（中断などで結果の無い店舗は error とする）
+    for entry in entries:
+        status = results.get(entry["store_id"])
+        if status is None:
+            status = _failed_status(entry, ref, log_dir, "not finished")
+        summary["results"].append(status)
+        summary[status["result"]] += 1
+        summary["cache_hits"] += status["cache_hits"]
+        summary["cache_misses"] += status["cache_misses"]
+    summary.update(finished_at=now(), duration_s=round(time.perf_counter() - start, 3))
+    write_status(os.path.join(log_dir, SUMMARY_FILE), summary)
@@ -6,8 +6,9 @@ WebMenuGenerator CLI モジュール
 
 主な処理の流れ:
   1. コマンドライン引数の解析
-  2. generate コマンドにより run_pipeline を呼び出し
-  3. run_pipeline 内でレガシーデータの読み込み、JSON生成、必要アセットの収集・コピー
+  2. generate コマンドにより BuildSession（session.py）でビルド
+     （watch コマンドは常駐して入力の変更を監視し、同じ BuildSession で変更のたびに再ビルド）
+  3. ビルド内でレガシーデータの読み込み、JSON生成、必要アセットの収集・コピー
   4. 最終的に web_content ディレクトリと index.html を出力
 
 提供されるオプション:
@@ -17,29 +18,110 @@ WebMenuGenerator CLI モジュール
   --ref            : 任意のビルド識別子（未指定時は自動生成）
   --schema-version : web_content のスキーマバージョン
   --skip-assets    : アセットコピー/最適化をスキップ
+  --skip-raw-dump  : raw_dump（解析結果そのままの JSON）の出力をスキップ
   --show-dev-ui    : 生成される index.html に開発用UIを表示
+  --menudb-engine  : menudb.dat の解析エンジン（python / numpy）
+  --cache-dir      : 解析結果キャッシュの保存先（未指定時はキャッシュしない）
+  --cache-max-mb   : 解析結果キャッシュの容量上限（MB、超過分は古い順に削除）
+  --output-format  : JSON の出力形式（compact: インデントなし・orjson があれば使用 / pretty: 従来の整形出力）
+  --writers        : JSON ファイルを書き込むスレッド数（0 でステージ内で逐次書き込み）
+  --page-packs     : 大分類ごとにページ・セル座標を packs/L<nn>.json にまとめて出力（SPA は大分類ごとに一度だけ取得）
+  --precompress    : テキスト出力の圧縮版（.gz、brotli があれば .br）を隣に出力（Nginx の gzip_static 用）
+  --jobs           : 並列処理のワーカー数（独立したステージ・おすすめ読み込みを並行実行、1 で逐次処理）
+  --incremental-from : 前回ビルドの ref（入力が変わっていない出力・素材を引き継ぐ）
+  --profile        : cProfile / スタックサンプリング / tracemalloc の診断結果を builds/{ref}/profile に出力
+
+watch コマンドの追加オプション:
+  --interval       : ポーリング間隔（秒）
+  --status-file    : 状態ファイル（既定は OUT/watch_status.json）
+  --keep-builds    : 残す watch ビルドの数（0 で削除しない）
+
+generate-batch コマンド（--free / --osusume / --out の代わりにマニフェストを使う）:
+  --manifest       : 店舗一覧（store_id, free, osusume, out）の JSON / CSV
+  --workers        : 店舗を並行してビルドするプロセス数（0 で CPU 数）
+  --log-dir        : 店舗ごとのログ・結果と batch_summary.json の出力先
+  （--cache-dir 未指定時も、バッチ中は一時ディレクトリの解析キャッシュを全店舗で共有する）
 """
 import argparse
-from .pipeline import run_pipeline
+from .session import BuildSession
+from .core.profiling import run_profiled
+from .watch import run_watch
+from .batch import run_batch
+from .parsers.menudb_reader import MENUDB_ENGINES
+from .dumpers.json_writer import OUTPUT_FORMATS
 
-def build_parser():
-    p = argparse.ArgumentParser(prog="webmenu", description="WebMenuGenerator CLI")
-    sp = p.add_subparsers(dest="cmd", required=True)
-
-    g = sp.add_parser("generate", help="Convert legacy dumps to web_content")
+def _add_source_options(g):
+    """generate / watch の入力・出力先（generate-batch はマニフェストで店舗ごとに指定）。"""
     g.add_argument("--free", required=True, help="Path to 'free' directory (LZH展開済み)")
     g.add_argument("--osusume", required=True, help="Path to 'osusume' directory (LZH展開済み)")
     g.add_argument("--out", required=True, help="Output root path for builds/{ref}")
-    g.add_argument("--ref", default="", help="Optional ref (YYYYMMDD-hhmmss-commit). Auto if empty.")
+
+def _add_build_options(g):
+    """generate / watch / generate-batch 共通のビルドオプション。"""
     g.add_argument("--schema-version", default="0.1", help="web_content schema version")
     g.add_argument("--skip-assets", action="store_true", help="Skip asset copy/optimization")
+    g.add_argument("--skip-raw-dump", action="store_true", help="Skip writing raw_dump (unused config files are then never read)")
     g.add_argument("--show-dev-ui", action="store_true", help="Show toolbar/log UI in generated index.html")
+    g.add_argument("--menudb-engine", choices=MENUDB_ENGINES, default="python",
+                   help="menudb.dat parser engine (numpy decodes each block with structured dtypes)")
+    g.add_argument("--cache-dir", default="", help="Directory for the content-hash keyed parse cache (disabled if empty)")
+    g.add_argument("--cache-max-mb", type=int, default=512, help="Parse cache size limit in MB (LRU eviction)")
+    g.add_argument("--output-format", choices=OUTPUT_FORMATS, default="compact",
+                   help="JSON output format: compact (no indentation, orjson if installed) or pretty (indented, for development)")
+    g.add_argument("--writers", type=int, default=4,
+                   help="Writer threads for JSON output files (0 = write on the emitting stage's thread)")
+    g.add_argument("--page-packs", action="store_true",
+                   help="Also bundle each large category's pages and cells into packs/L<nn>.json; the SPA loads a pack once per category")
+    g.add_argument("--precompress", action="store_true",
+                   help="Write .gz (and .br if brotli is installed) next to text outputs for nginx gzip_static; unchanged files reuse the previous build's")
+    g.add_argument("--jobs", type=int, default=1, help="Worker count for independent pipeline stages and parallel reading (1 = serial, in declared order)")
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="webmenu", description="WebMenuGenerator CLI")
+    sp = p.add_subparsers(dest="cmd", required=True)
+
+    g = sp.add_parser("generate", help="Convert legacy dumps to web_content")
+    _add_source_options(g)
+    _add_build_options(g)
+    g.add_argument("--ref", default="", help="Optional ref (YYYYMMDD-hhmmss-commit). Auto if empty.")
+    g.add_argument("--incremental-from", default="",
+                   help="Previous build ref under OUT/builds; outputs whose inputs are unchanged are hardlinked (or copied) forward")
+    g.add_argument("--profile", action="store_true",
+                   help="Write cProfile stats, collapsed stacks and tracemalloc top allocations to builds/{ref}/profile (runs serially)")
+
+    w = sp.add_parser("watch", help="Stay resident, poll free/osusume and rebuild incrementally on change")
+    _add_source_options(w)
+    _add_build_options(w)
+    w.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds (a change must be stable for one interval)")
+    w.add_argument("--status-file", default="", help="Status JSON path (default: OUT/watch_status.json)")
+    w.add_argument("--keep-builds", type=int, default=3, help="Number of watch builds to keep under OUT/builds (0 = keep all)")
+
+    b = sp.add_parser("generate-batch", help="Build many stores from a manifest in a process pool")
+    b.add_argument("--manifest", required=True,
+                   help="JSON list (or {\"stores\": [...]}) or CSV of store_id, free, osusume, out (optional ref); relative paths are from the manifest's directory")
+    _add_build_options(b)
+    b.add_argument("--ref", default="", help="Ref used for every store without its own ref. Auto if empty.")
+    b.add_argument("--workers", type=int, default=0, help="Number of store build processes (0 = CPU count)")
+    b.add_argument("--log-dir", default="batch_logs",
+                   help="Directory for per-store logs/status ({store_id}.log / .json) and batch_summary.json")
     return p
 
 def main():
     args = build_parser().parse_args()
     if args.cmd == "generate":
-        run_pipeline(args)
+        session = BuildSession.from_args(args)
+        if args.profile:
+            # cProfile は開始したスレッドしか計測しないので、ステージは逐次実行にする
+            args.jobs = 1
+            run_profiled(lambda a: session.build(a.ref, a), args)
+        else:
+            session.build(args.ref, args)
+    elif args.cmd == "watch":
+        run_watch(args)
+    elif args.cmd == "generate-batch":
+        summary = run_batch(args)
+        if summary["error"]:
+            raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+"""ビルドのステージ別計測（build_profile.json）。
+
+ステージごとに経過時間・CPU 時間・最大 RSS の増分と、処理件数などのカウンタを記録する。
+CPU 時間はステージを実行したスレッドの分だけを数える（osusume の並列読み込みなど、
+ステージ内部で起動したワーカーの分は含まない）。最大 RSS はプロセス全体の最大値なので、
+並行実行中のステージ同士では増分の帰属が前後することがある。
+tracemalloc が有効（--profile）なら、ステージ中に増えたメモリ確保元の上位も記録する。
+"""
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .profiling import take_snapshot, top_allocations
+
+PROFILE_FILE = "build_profile.json"
+PROFILE_VERSION = 1
+
+
+def peak_rss() -> Optional[int]:
+    """プロセスの最大常駐メモリ（バイト）。取得できない環境では None。"""
+    try:
+        import resource
+    except ImportError:
+        return _peak_rss_windows()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイト単位
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _peak_rss_windows() -> Optional[int]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        kernel32 = ctypes.windll.kernel32
+        psapi = ctypes.windll.psapi
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [
+            wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(),
+                                          ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except Exception:
+        return None
+
+
+def record_count(payload) -> int:
+    """解析結果のレコード数（リストの要素数の合計。dict は値ごとに数える）。"""
+    if isinstance(payload, list):
+        return len(payload)
+    if isinstance(payload, dict):
+        return sum(len(v) for v in payload.values() if isinstance(v, (list, dict)))
+    return 0
+
+
+class BuildProfile:
+    def __init__(self, jobs: int = 1):
+        self.jobs = jobs
+        self.started_at = datetime.datetime.now()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._stages: Dict[str, Dict] = {}
+        self._order: List[str] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """ブロック内をステージ name として計測する。"""
+        record = {"start_s": None, "wall_s": None, "cpu_s": None,
+                  "peak_rss_delta_bytes": None, "counters": {}}
+        with self._lock:
+            self._stages[name] = record
+            self._order.append(name)
+        prev = getattr(self._local, "record", None)
+        self._local.record = record
+        rss0 = peak_rss()
+        base = take_snapshot()
+        start = time.perf_counter()
+        record["start_s"] = round(start - self._t0, 6)
+        cpu = time.thread_time()
+        try:
+            yield record
+        finally:
+            record["cpu_s"] = round(time.thread_time() - cpu, 6)
+            end = time.perf_counter()
+            rss1 = peak_rss()
+            record["wall_s"] = round(end - start, 6)
+            record["peak_rss_delta_bytes"] = (
+                rss1 - rss0 if rss0 is not None and rss1 is not None else None)
+            if base is not None:
+                record["allocations"] = top_allocations(take_snapshot(), base)
+            self._local.record = prev
+
+    def count(self, **counters: int):
+        """実行中のステージのカウンタに加算する（ステージ外からの呼び出しは無視）。"""
+        record = getattr(self._local, "record", None)
+        if record is None:
+            return
+        for key, n in counters.items():
+            record["counters"][key] = record["counters"].get(key, 0) + n
+
+    def totals(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for name in self._order:
+            for key, n in self._stages[name]["counters"].items():
+                totals[key] = totals.get(key, 0) + n
+        return totals
+
+    def to_dict(self, stage_order: Optional[List[str]] = None) -> Dict:
+        """stage_order を渡すとその順（宣言順など）で並べる。未指定なら開始順。"""
+        order = [n for n in (stage_order or self._order) if n in self._stages]
+        return {
+            "version": PROFILE_VERSION,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "jobs": self.jobs,
+            "wall_s": round(time.perf_counter() - self._t0, 6),
+            "cpu_s": round(time.process_time() - self._cpu0, 6),
+            "peak_rss_bytes": peak_rss(),
+            "counters": self.totals(),
+            "stages": [dict(name=n, **self._stages[n]) for n in order],
+        }
+
+    def save(self, out_root: str, stage_order: Optional[List[str]] = None) -> Dict:
+        data = self.to_dict(stage_order)
+        os.makedirs(out_root, exist_ok=True)
+        with open(os.path.join(out_root, PROFILE_FILE), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+    @staticmethod
+    def summary(data: Dict, top: int = 3) -> str:
+        """ログ用の一行要約（合計時間・最大 RSS・時間の長いステージ・カウンタ合計）。"""
+        slow = sorted(data["stages"], key=lambda s: s["wall_s"], reverse=True)[:top]
+        rss = data["peak_rss_bytes"]
+        parts = [
+            f"wall={data['wall_s']:.2f}s",
+            f"cpu={data['cpu_s']:.2f}s",
+            f"peak_rss={rss / (1024 * 1024):.1f}MB" if rss is not None else "peak_rss=n/a",
+            "slowest=" + ",".join(f"{s['name']}:{s['wall_s']:.2f}s" for s in slow),
+        ]
+        parts.extend(f"{k}={v}" for k, v in sorted(data["counters"].items()))
+        return " ".join(parts)
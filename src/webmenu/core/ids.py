@@ -3,5 +3,33 @@
 def small_id(large_idx:int, middle_idx:int, small_idx:int) -> str:
     return f"sm-{large_idx:02d}{middle_idx:02d}{small_idx:03d}"
 
+def sub_id(sub_idx:int) -> str:
+    return f"sub-{sub_idx:03d}"
+
 def page_relpath(small_id:str, page:int) -> str:
     return f"small/{small_id}/page-{page}.json"
+
+CELLS_FILE = "cells.json"
+
+def cells_relpath(small_id:str) -> str:
+    return f"small/{small_id}/{CELLS_FILE}"
+
+def is_cells_relpath(rel_path:str) -> bool:
+    return rel_path.endswith(f"/{CELLS_FILE}")
+
+# 事前圧縮（--precompress）で出力の隣に置く圧縮版の拡張子
+SIDECAR_SUFFIXES = (".gz", ".br")
+
+def is_sidecar_relpath(rel_path:str) -> bool:
+    return rel_path.endswith(SIDECAR_SUFFIXES)
+
+def pack_relpath(large_idx:int) -> str:
+    return f"packs/L{large_idx:02d}.json"
+
+def pack_relpath_of(rel_path:str) -> str:
+    """small/sm-LLMMSSS/... が属する大分類のページパック（該当しなければ空文字）。"""
+    parts = rel_path.split("/")
+    if len(parts) < 2 or parts[0] != "small" or not parts[1].startswith("sm-"):
+        return ""
+    large = parts[1][3:5]
+    return pack_relpath(int(large)) if large.isdigit() else ""
@@ -0,0 +1,190 @@
+"""前回ビルドを引き継ぐ差分ビルド（--incremental-from）。
+
+入力をグループ（menudb / config / datas / osusume / images）に分け、ファイルごとの
+サイズ・更新日時・内容ハッシュを build_inputs.json としてビルドディレクトリに保存する。
+次のビルドでは指定した前回ビルドの build_inputs.json と比較し、依存する入力グループが
+変わっていない出力（processed_dump・小分類ページ・cells・raw_dump）と、元ファイルが
+変わっていない素材は、前回ビルドからハードリンク（できなければコピー）で引き継ぐ。
+"""
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..dumpers.json_writer import remove_file
+from .ids import is_sidecar_relpath
+from .inventory import FREE, OSUSUME, SourceInventory
+from .parse_cache import file_digest
+
+INPUTS_FILE = "build_inputs.json"
+INPUTS_VERSION = 1
+
+MENUDB = "menudb"
+CONFIG = "config"
+DATAS = "datas"
+OSUSUME_GROUP = "osusume"
+IMAGES = "images"
+ALL_GROUPS = (MENUDB, CONFIG, DATAS, OSUSUME_GROUP, IMAGES)
+
+# 素材が多いグループは初回に全件のハッシュを取らない（サイズが同じで更新日時だけ
+# 変わったファイルのみハッシュで比較する）
+_HASH_ALL = {MENUDB: True, CONFIG: True, DATAS: True, OSUSUME_GROUP: False, IMAGES: False}
+
+
+def _walk_files(top: str) -> Iterable[Tuple[str, str, os.stat_result]]:
+    for dirpath, _, files in os.walk(top):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            yield os.path.relpath(path, top).replace(os.sep, "/"), path, st
+
+
+def _inventory_files(inventory: SourceInventory, root: str):
+    for sub, _, files in inventory.walk(root):
+        for name in files:
+            rel = f"{sub}/{name}" if sub else name
+            st = inventory.stat(root, rel)
+            if st is not None:
+                yield rel, inventory.path(root, rel), st
+
+
+def _same(prev: Optional[List], cur: List) -> bool:
+    if not prev or prev[0] != cur[0]:
+        return False
+    return prev[1] == cur[1] or (bool(prev[2]) and prev[2] == cur[2])
+
+
+def link_or_copy(src: str, dst: str):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class IncrementalBuild:
+    def __init__(self, out_root: str, version: str, free_dir: str,
+                 inventory: SourceInventory, previous_dir: Optional[str] = None):
+        self.out_root = out_root
+        self.version = version
+        self.previous_dir = None
+        self.linked = 0
+        self._lock = threading.Lock()
+
+        prev_groups: Dict[str, Dict] = {}
+        if previous_dir:
+            try:
+                with open(os.path.join(previous_dir, INPUTS_FILE), "r", encoding="utf-8") as f:
+                    prev = json.load(f)
+            except (OSError, ValueError):
+                prev = {}
+            # 出力形式（スキーマ・解析バージョン）が同じ前回ビルドのみ引き継ぐ
+            if prev.get("format") == INPUTS_VERSION and prev.get("version") == version:
+                self.previous_dir = previous_dir
+                prev_groups = prev.get("groups", {})
+
+        datas_files = list(_walk_files(os.path.join(free_dir, "datas")))
+        sources = {
+            MENUDB: [f for f in datas_files if f[0] == "menudb.dat"],
+            CONFIG: _walk_files(os.path.join(free_dir, "config")),
+            DATAS: [f for f in datas_files if f[0] != "menudb.dat"],
+            OSUSUME_GROUP: _inventory_files(inventory, OSUSUME),
+            IMAGES: _inventory_files(inventory, FREE),
+        }
+        self.groups: Dict[str, Dict[str, List]] = {}
+        self.changed = set()
+        # 素材の実パス -> 前回から変わっていないか
+        self._unchanged_paths: Dict[str, bool] = {}
+        for group in ALL_GROUPS:
+            prev_files = prev_groups.get(group, {})
+            files = {}
+            all_same = True
+            for rel, path, st in sources[group]:
+                prev = prev_files.get(rel)
+                cur = [st.st_size, st.st_mtime, ""]
+                if prev and prev[0] == cur[0] and prev[1] == cur[1]:
+                    cur[2] = prev[2]
+                elif _HASH_ALL[group] or (prev and prev[0] == cur[0]):
+                    cur[2] = file_digest(path)
+                files[rel] = cur
+                same = _same(prev, cur)
+                self._unchanged_paths[os.path.normcase(path)] = same
+                all_same = all_same and same
+            self.groups[group] = files
+            if self.previous_dir is None or not all_same or files.keys() != prev_files.keys():
+                self.changed.add(group)
+
+    def unchanged(self, *groups: str) -> bool:
+        return self.previous_dir is not None and not any(g in self.changed for g in groups)
+
+    def _count(self, n: int = 1):
+        with self._lock:
+            self.linked += n
+
+    def link_forward(self, rel: str, groups: Iterable[str]) -> bool:
+        """依存グループが前回から変わっていなければ、前回の出力 rel（out_root 相対）を引き継ぐ。"""
+        if not self.unchanged(*groups):
+            return False
+        src = os.path.join(self.previous_dir, *rel.split("/"))
+        if not os.path.isfile(src):
+            return False
+        dst = os.path.join(self.out_root, *rel.split("/"))
+        remove_file(dst)
+        link_or_copy(src, dst)
+        self._count()
+        return True
+
+    def link_tree(self, rel: str, groups: Iterable[str]) -> bool:
+        """link_forward のディレクトリ版（配下のファイルをすべて引き継ぐ）。
+
+        圧縮版（.gz / .br）は引き継がない（事前圧縮のステージが元ファイルごとに判断する）。
+        """
+        if not self.unchanged(*groups):
+            return False
+        src_top = os.path.join(self.previous_dir, *rel.split("/"))
+        if not os.path.isdir(src_top):
+            return False
+        dst_top = os.path.join(self.out_root, *rel.split("/"))
+        n = 0
+        for sub_rel, path, _ in _walk_files(src_top):
+            if is_sidecar_relpath(sub_rel):
+                continue
+            dst = os.path.join(dst_top, *sub_rel.split("/"))
+            remove_file(dst)
+            link_or_copy(path, dst)
+            n += 1
+        self._count(n)
+        return True
+
+    def copy_asset(self, src_path: str, dst_path: str) -> bool:
+        """素材のコピー。元ファイルが前回から変わっていなければ前回ビルドの同じ素材を引き継ぐ。
+
+        引き継いだ（リンクした）場合は True、コピーした場合は False を返す。
+        """
+        remove_file(dst_path)
+        if self.previous_dir is not None and self._unchanged_paths.get(os.path.normcase(src_path)):
+            prev = os.path.join(self.previous_dir, os.path.relpath(dst_path, self.out_root))
+            if os.path.isfile(prev):
+                link_or_copy(prev, dst_path)
+                self._count()
+                return True
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        shutil.copy2(src_path, dst_path)
+        return False
+
+    def save(self):
+        data = {"format": INPUTS_VERSION, "version": self.version, "groups": self.groups}
+        os.makedirs(self.out_root, exist_ok=True)
+        with open(os.path.join(self.out_root, INPUTS_FILE), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def summary(self, linked: bool = True) -> str:
+        if self.previous_dir is None:
+            return "前回ビルドなし（全件生成）"
+        changed = ",".join(g for g in ALL_GROUPS if g in self.changed) or "なし"
+        text = f"前回={os.path.basename(self.previous_dir)} 変更グループ={changed}"
+        return f"{text} 引き継ぎ={self.linked}" if linked else text
@@ -0,0 +1,123 @@
+"""入力素材ディレクトリのインベントリ。
+
+free/images と osusume/smenu を os.scandir で一度だけ走査し、
+ファイルの有無・サイズ・更新日時の問い合わせをすべてメモリ上で答える。
+ネットワークドライブ上では stat 呼び出しがビルド時間の大半を占めるため、
+画像パスの解決や素材のコピーは個別に os.path.isfile を呼ばずにこれを使う。
+"""
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+FREE = "free"
+OSUSUME = "osusume"
+
+
+def _key(rel: str) -> str:
+    """問い合わせ用のキー。Windows では大文字小文字と区切り文字の違いを吸収する。"""
+    return os.path.normcase(rel).replace(os.sep, "/").strip("/")
+
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
+
+
+class SourceInventory:
+    """root（"free" = free/images、"osusume" = osusume/smenu）配下の相対パスで問い合わせる。
+
+    相対パスの区切りは "/"。ディレクトリの子要素は os.scandir の列挙順を保持する。
+    """
+
+    def __init__(self, free_dir: str = "", osusume_dir: str = ""):
+        self.roots: Dict[str, str] = {}
+        self._files: Dict[Tuple[str, str], os.DirEntry] = {}
+        # (root, ディレクトリのキー) -> (サブディレクトリ名一覧, ファイル名一覧)
+        self._tree: Dict[Tuple[str, str], Tuple[List[str], List[str]]] = {}
+        if free_dir:
+            self._scan(FREE, os.path.join(free_dir, "images"))
+        if osusume_dir:
+            self._scan(OSUSUME, os.path.join(osusume_dir, "smenu"))
+
+    def _scan(self, root: str, top: str):
+        self.roots[root] = top
+        stack = [("", top)]
+        while stack:
+            rel, path = stack.pop()
+            try:
+                it = os.scandir(path)
+            except OSError:
+                continue
+            dirs: List[str] = []
+            files: List[str] = []
+            with it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dirs.append(entry.name)
+                        # os.walk と同じくシンボリックリンク先のディレクトリは辿らない
+                        if not entry.is_symlink():
+                            stack.append((_join(rel, entry.name), entry.path))
+                    elif entry.is_file():
+                        files.append(entry.name)
+                        self._files[(root, _key(_join(rel, entry.name)))] = entry
+            self._tree[(root, _key(rel))] = (dirs, files)
+
+    # --- 問い合わせ ---
+    def isfile(self, root: str, rel: str) -> bool:
+        return (root, _key(rel)) in self._files
+
+    def isdir(self, root: str, rel: str = "") -> bool:
+        return (root, _key(rel)) in self._tree
+
+    def path(self, root: str, rel: str) -> Optional[str]:
+        """ファイルの実パス。存在しなければ None。"""
+        entry = self._files.get((root, _key(rel)))
+        return entry.path if entry is not None else None
+
+    def stat(self, root: str, rel: str) -> Optional[os.stat_result]:
+        """ファイルの stat（Windows では走査時に取得済みの値）。存在しなければ None。"""
+        entry = self._files.get((root, _key(rel)))
+        if entry is None:
+            return None
+        try:
+            return entry.stat()
+        except OSError:
+            return None
+
+    def size(self, root: str, rel: str) -> Optional[int]:
+        st = self.stat(root, rel)
+        return st.st_size if st is not None else None
+
+    def mtime(self, root: str, rel: str) -> Optional[float]:
+        st = self.stat(root, rel)
+        return st.st_mtime if st is not None else None
+
+    def listdir(self, root: str, rel: str = "") -> List[str]:
+        """直下のサブディレクトリ名とファイル名（存在しなければ空）。"""
+        dirs, files = self._tree.get((root, _key(rel)), ((), ()))
+        return list(dirs) + list(files)
+
+    def subdirs(self, root: str, rel: str = "") -> List[str]:
+        return list(self._tree.get((root, _key(rel)), ((), ()))[0])
+
+    def files(self, root: str, rel: str = "") -> List[str]:
+        return list(self._tree.get((root, _key(rel)), ((), ()))[1])
+
+    def walk(self, root: str, rel: str = "") -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk 相当。(rel からの相対ディレクトリ, サブディレクトリ名, ファイル名) を返す。"""
+        stack = [("", rel)]
+        while stack:
+            sub, full = stack.pop()
+            node = self._tree.get((root, _key(full)))
+            if node is None:
+                continue
+            dirs, files = node
+            yield sub, list(dirs), list(files)
+            for name in reversed(dirs):
+                stack.append((_join(sub, name), _join(full, name)))
+
+    def lang_dirs(self) -> List[str]:
+        """free/images 直下の、ファイルを含むサブディレクトリ名（多言語画像ディレクトリ）。"""
+        return [name for name in self.subdirs(FREE) if self.files(FREE, name)]
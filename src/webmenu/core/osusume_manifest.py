@@ -0,0 +1,178 @@
+"""おすすめ（osusume/smenu/L/M/V）の差分読み込み用フィンガープリントマニフェスト。
+
+ビルド出力（builds/<ref>/）にバリアントごとのファイル名・サイズ・更新日時・
+内容ハッシュを osusume_manifest.json として保存し、解析済みエントリを
+osusume_entries.pkl に保存する。次回のビルドでは直近のマニフェストと比較し、
+変更の無いバリアントは解析結果と small/<sid>/page-1.json・cells.json を再利用する。
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .ids import page_relpath
+from .inventory import OSUSUME, SourceInventory
+from .parse_cache import PICKLE_PROTOCOL, file_digest
+
+MANIFEST_FILE = "osusume_manifest.json"
+ENTRIES_FILE = "osusume_entries.pkl"
+# 小分類ページの生成内容が変わったら上げる（上がると前回ページを再利用しない）
+MANIFEST_VERSION = 1
+
+
+def mapping_digest(menudb_path: str, schema_version: str, parser_version) -> str:
+    """ページ再利用の前提条件（menudb.dat の内容・スキーマ・解析/生成バージョン）のハッシュ。"""
+    h = hashlib.sha256()
+    h.update(f"{MANIFEST_VERSION}\0{parser_version}\0{schema_version}\0".encode("utf-8"))
+    h.update(file_digest(menudb_path).encode("ascii"))
+    return h.hexdigest()
+
+
+def find_previous(builds_dir: str) -> Optional[str]:
+    """builds/ 配下で最後に保存されたマニフェストを持つビルドディレクトリ。"""
+    candidates = []
+    for path in glob.glob(os.path.join(glob.escape(builds_dir), "*", MANIFEST_FILE)):
+        try:
+            candidates.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    if not candidates:
+        return None
+    return os.path.dirname(max(candidates)[1])
+
+
+class OsusumeManifest:
+    def __init__(self, osusume_root: str, digest: str, previous_dir: Optional[str] = None):
+        self.osusume_root = osusume_root
+        self.digest = digest
+        self.previous_dir = previous_dir
+        self.reused = 0
+        self.rebuilt = 0
+        self.pages_reused = 0
+        self._variants: Dict[str, Dict] = {}
+        self._entries: Dict[str, Dict] = {}
+        self._rel_by_key: Dict[Tuple[int, int, int], str] = {}
+        self._lock = threading.Lock()
+
+        self._prev_variants: Dict[str, Dict] = {}
+        self._prev_entries: Dict[str, Dict] = {}
+        self._prev_pages_ok = False
+        if previous_dir:
+            self._load_previous(previous_dir)
+
+    def _load_previous(self, previous_dir: str):
+        try:
+            with open(os.path.join(previous_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(os.path.join(previous_dir, ENTRIES_FILE), "rb") as f:
+                entries = pickle.load(f)
+        except Exception:
+            # 読めない前回マニフェストは無視して全件作り直す
+            return
+        # エントリには osusume の実パスが入るため、入力ルートが同じ場合のみ再利用する
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("root") != self.osusume_root:
+            return
+        self._prev_variants = manifest.get("variants", {})
+        self._prev_entries = entries
+        self._prev_pages_ok = manifest.get("digest") == self.digest
+
+    # --- 解析（read_osusume から呼ばれる） ---
+    def _fingerprint(self, inventory: SourceInventory, rel: str) -> Dict[str, List]:
+        prev_files = self._prev_variants.get(rel, {}).get("files", {})
+        files = {}
+        for sub, _, names in inventory.walk(OSUSUME, rel):
+            for name in names:
+                name_rel = f"{sub}/{name}" if sub else name
+                full_rel = f"{rel}/{name_rel}"
+                st = inventory.stat(OSUSUME, full_rel)
+                if st is None:
+                    continue
+                prev = prev_files.get(name_rel)
+                # サイズと更新日時が前回と同じなら内容ハッシュは再計算しない
+                if prev and prev[0] == st.st_size and prev[1] == st.st_mtime:
+                    digest = prev[2]
+                else:
+                    digest = file_digest(inventory.path(OSUSUME, full_rel))
+                files[name_rel] = [st.st_size, st.st_mtime, digest]
+        return files
+
+    def reusable_entry(self, inventory: SourceInventory, rel: str) -> Optional[Dict]:
+        """バリアントのフィンガープリントを記録し、前回から変更が無ければ前回の解析結果を返す。"""
+        files = self._fingerprint(inventory, rel)
+        prev = self._prev_variants.get(rel)
+        entry = None
+        if prev is not None and rel in self._prev_entries:
+            # 更新日時だけの変化（再展開など）は変更とみなさない
+            same = {k: (v[0], v[2]) for k, v in prev.get("files", {}).items()} == \
+                {k: (v[0], v[2]) for k, v in files.items()}
+            if same:
+                entry = self._prev_entries[rel]
+        with self._lock:
+            self._variants[rel] = {"files": files, "pages": [], "reused": entry is not None}
+            if entry is None:
+                self.rebuilt += 1
+            else:
+                self.reused += 1
+        return entry
+
+    def record_entry(self, rel: str, entry: Dict):
+        with self._lock:
+            self._entries[rel] = entry
+            self._rel_by_key[(entry.get("l_index"), entry.get("m_index"), entry.get("variant"))] = rel
+
+    # --- 小分類ページ生成（make_small_pages から呼ばれる） ---
+    def _rel_of(self, entry: Dict) -> Optional[str]:
+        return self._rel_by_key.get((entry.get("l_index"), entry.get("m_index"), entry.get("variant")))
+
+    def reused_page(self, entry: Dict, sid: str):
+        """変更の無いバリアントから前回生成したページなら (page, cells or None) を返す。"""
+        rel = self._rel_of(entry)
+        if rel is None or not self._prev_pages_ok or not self._variants[rel]["reused"]:
+            return None
+        if sid not in self._prev_variants.get(rel, {}).get("pages", []):
+            return None
+        web_dir = os.path.join(self.previous_dir, "web_content")
+        try:
+            with open(os.path.join(web_dir, page_relpath(sid, 1)), "r", encoding="utf-8") as f:
+                page = json.load(f)
+            cells = None
+            cells_path = next((gi.get("cells_path") for gi in page.get("grid_items", [])
+                               if gi.get("cells_path")), "")
+            if cells_path:
+                with open(os.path.join(web_dir, cells_path), "r", encoding="utf-8") as f:
+                    cells = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.record_page(entry, sid)
+        self.pages_reused += 1
+        return page, cells
+
+    def record_page(self, entry: Dict, sid: str):
+        rel = self._rel_of(entry)
+        # 同じ結果を書き出し直す場合（BuildSession.emit）も重複させない
+        if rel is not None and sid not in self._variants[rel]["pages"]:
+            self._variants[rel]["pages"].append(sid)
+
+    # --- 保存 ---
+    def save(self, out_root: str):
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "root": self.osusume_root,
+            "digest": self.digest,
+            "variants": {
+                rel: {"files": v["files"], "pages": v["pages"]}
+                for rel, v in sorted(self._variants.items())
+            },
+        }
+        os.makedirs(out_root, exist_ok=True)
+        with open(os.path.join(out_root, ENTRIES_FILE), "wb") as f:
+            # 並列読み込みでは記録順が不定なので、パス順に並べて保存内容を揃える
+            pickle.dump(dict(sorted(self._entries.items())), f, protocol=PICKLE_PROTOCOL)
+        with open(os.path.join(out_root, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def summary(self) -> str:
+        return f"再利用={self.reused} 再構築={self.rebuilt} ページ再利用={self.pages_reused}"
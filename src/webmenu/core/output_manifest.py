@@ -0,0 +1,215 @@
+"""出力マニフェスト（web_content/build_manifest.json）と変更の無い出力の書き込み省略。
+
+web_content 配下のすべての出力ファイルのパス・サイズ・sha256 を記録する。
+書き出す内容が前回ビルドのマニフェストと同じファイルは、前回ビルドのファイルへの
+ハードリンク（できなければコピー）にし、同じ場所に同じ内容が既にあれば書き込まない。
+更新日時が変わらないので、配信側（Nginx / CDN）・端末の再検証を避けられる。
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from .ids import is_sidecar_relpath
+from .incremental import link_or_copy
+from .parse_cache import file_digest
+from ..dumpers.json_writer import remove_file, write_bytes
+
+MANIFEST_FILE = "build_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class OutputManifest:
+    def __init__(self, web_dir: str, previous_dir: Optional[str] = None):
+        """web_dir: 今回の web_content。previous_dir: 前回ビルドのディレクトリ（builds/{ref}）。"""
+        self.web_dir = web_dir
+        self.previous_web_dir = None
+        self.written = 0
+        self.linked = 0
+        self.kept = 0
+        self._files: Dict[str, Dict] = {}
+        # 今回のビルドで各ファイルをどう出力したか（rel -> (written / linked / kept, バイト数)）
+        self._outcomes: Dict[str, Tuple[str, int]] = {}
+        self._previous: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # 出力先に既にあるマニフェスト（同じ ref の再ビルド時。派生ファイルの再利用判定に使う）
+        self._in_place = _load_entries(web_dir)
+
+        prev_web_dir = os.path.join(previous_dir, "web_content") if previous_dir else None
+        # 同じ ref の再ビルドでは前回ビルド＝今回の出力先なので、リンク元にはしない
+        if prev_web_dir and os.path.realpath(prev_web_dir) != os.path.realpath(web_dir):
+            prev = _load_entries(prev_web_dir)
+            if prev is not None:
+                self.previous_web_dir = prev_web_dir
+                self._previous = prev
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.web_dir).replace(os.sep, "/")
+
+    def _previous_path(self, rel: str, size: int, digest: str) -> Optional[str]:
+        """前回ビルドに同じ内容のファイルがあればそのパス。"""
+        prev = self._previous.get(rel)
+        if prev is None or prev["size"] != size or prev["sha256"] != digest:
+            return None
+        path = os.path.join(self.previous_web_dir, *rel.split("/"))
+        try:
+            return path if os.path.getsize(path) == size else None
+        except OSError:
+            return None
+
+    def _record(self, rel: str, size: int, digest: str, counter: str):
+        with self._lock:
+            if rel not in self._files:
+                setattr(self, counter, getattr(self, counter) + 1)
+            self._files[rel] = {"path": rel, "size": size, "sha256": digest}
+            self._outcomes[rel] = (counter, size)
+
+    def write(self, path: str, data: bytes) -> int:
+        """WriterPool の write_file。内容が変わらないファイルは書き込まない。"""
+        rel = self._rel(path)
+        digest = hashlib.sha256(data).hexdigest()
+        if _same_bytes(path, data):
+            self._record(rel, len(data), digest, "kept")
+            return len(data)
+        prev_path = self._previous_path(rel, len(data), digest)
+        if prev_path is not None:
+            remove_file(path)
+            link_or_copy(prev_path, path)
+            self._record(rel, len(data), digest, "linked")
+            return len(data)
+        write_bytes(path, data)
+        self._record(rel, len(data), digest, "written")
+        return len(data)
+
+    def record(self, path: str):
+        """WriterPool を通さずに出力したファイル（素材・index.html・差分ビルドの引き継ぎなど）を記録する。
+
+        前回ビルドと同じ内容なら前回のファイルへのリンクに置き換える。
+        """
+        rel = self._rel(path)
+        size = os.path.getsize(path)
+        prev = self._previous.get(rel)
+        if prev is not None and prev["size"] == size:
+            prev_path = os.path.join(self.previous_web_dir, *rel.split("/"))
+            try:
+                if os.path.samefile(path, prev_path):
+                    # 前回ビルドから引き継いだファイル（内容は前回のマニフェストのとおり）
+                    self._record(rel, size, prev["sha256"], "linked")
+                    return
+            except OSError:
+                pass
+        digest = file_digest(path)
+        prev_path = self._previous_path(rel, size, digest)
+        if prev_path is not None:
+            remove_file(path)
+            link_or_copy(prev_path, path)
+            self._record(rel, size, digest, "linked")
+        else:
+            self._record(rel, size, digest, "written")
+
+    def reuse_derived(self, rel: str, derived_rel: str) -> Optional[int]:
+        """rel から作る派生ファイル derived_rel（圧縮版など）を作り直さずに済むなら再利用して記録する。
+
+        前回ビルド（または出力先に既にあるマニフェスト）で rel が今回と同じ内容なら、
+        その時に作った derived_rel をリンクする（出力先にあればそのまま残す）。
+        再利用した場合は derived_rel のサイズ、できなければ None を返す。
+        """
+        with self._lock:
+            current = self._files.get(rel)
+        if current is None:
+            return None
+        path = os.path.join(self.web_dir, *derived_rel.split("/"))
+        for entries, top in ((self._in_place, self.web_dir), (self._previous, self.previous_web_dir)):
+            if not entries:
+                continue
+            src, derived = entries.get(rel), entries.get(derived_rel)
+            if src is None or derived is None or src["sha256"] != current["sha256"]:
+                continue
+            found = os.path.join(top, *derived_rel.split("/"))
+            try:
+                if os.path.getsize(found) != derived["size"]:
+                    continue
+            except OSError:
+                continue
+            if top == self.web_dir:
+                self._record(derived_rel, derived["size"], derived["sha256"], "kept")
+            else:
+                remove_file(path)
+                link_or_copy(found, path)
+                self._record(derived_rel, derived["size"], derived["sha256"], "linked")
+            return derived["size"]
+        return None
+
+    def record_tree(self, top: str):
+        """top 配下のファイルをすべて record する（圧縮版 .gz / .br は除く）。"""
+        for dirpath, _, files in os.walk(top):
+            for name in files:
+                if not is_sidecar_relpath(name):
+                    self.record(os.path.join(dirpath, name))
+
+    def forget(self, path: str):
+        """削除したファイルの記録を取り消す。"""
+        rel = self._rel(path)
+        with self._lock:
+            self._files.pop(rel, None)
+            self._outcomes.pop(rel, None)
+
+    def tally(self, *prefixes: str, sidecars: bool = False) -> Dict[str, int]:
+        """今回 prefixes（web_content 相対のファイルまたはディレクトリ）に出力したファイルを数える。
+
+        戻り値: {files_written, files_linked, files_kept, bytes_written}
+        （bytes_written は実際に書き込んだファイルの分だけ）。
+        sidecars=True なら圧縮版（.gz / .br）だけを、False なら圧縮版以外を数える。
+        """
+        counts = {"files_written": 0, "files_linked": 0, "files_kept": 0, "bytes_written": 0}
+        with self._lock:
+            outcomes = list(self._outcomes.items())
+        for rel, (counter, size) in outcomes:
+            if is_sidecar_relpath(rel) != sidecars:
+                continue
+            if prefixes and not any(rel == p or rel.startswith(p + "/") for p in prefixes):
+                continue
+            counts["files_" + counter] += 1
+            if counter == "written":
+                counts["bytes_written"] += size
+        return counts
+
+    def files(self) -> Dict[str, Dict]:
+        """web_content 相対パス -> {path, size, sha256}（記録済みの分）。"""
+        with self._lock:
+            return dict(self._files)
+
+    def save(self, emitter) -> int:
+        """build_manifest.json を書き出し、書き込んだバイト数を返す（同じ内容が既にあれば書かずに 0）。"""
+        data = {"version": MANIFEST_VERSION,
+                "files": [entry for _, entry in sorted(self.files().items())]}
+        path = os.path.join(self.web_dir, MANIFEST_FILE)
+        encoded = emitter.dumps(data, indent=2)
+        if _same_bytes(path, encoded):
+            return 0
+        return write_bytes(path, encoded)
+
+    def summary(self) -> str:
+        return f"ファイル数={len(self._files)} 書き込み={self.written} 前回から引き継ぎ={self.linked} 変更なし={self.kept}"
+
+
+def _load_entries(web_dir: str) -> Optional[Dict[str, Dict]]:
+    try:
+        with open(os.path.join(web_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    return {e["path"]: e for e in data.get("files", [])}
+
+
+def _same_bytes(path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
@@ -0,0 +1,190 @@
+"""入力ファイルの内容ハッシュをキーにした解析結果のディスクキャッシュ。
+
+キー = 解析種別 + パーサーバージョン + 入力ファイルのパスと内容ハッシュ（+ 付加情報）。
+解析結果がパスに依存しない種別は by_path=False で内容ハッシュだけをキーにし、
+別のディレクトリ（generate-batch の店舗ごとの入力など）にある同一内容のファイルと共有する。
+値は pickle（protocol 5）で保存し、ヒット時はファイルの mtime を更新して
+LRU の順序に使う。容量上限を超えた分は prune() で古い順に削除する。
+常駐プロセス向けにはメモリ上に保持する MemoryParseCache も用意する。
+"""
+import hashlib
+import os
+import pickle
+import threading
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+PICKLE_PROTOCOL = 5
+_SUFFIX = ".pkl"
+
+
+def file_digest(path: str) -> str:
+    """ファイル内容の sha256。存在しない場合は "missing"。"""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    except FileNotFoundError:
+        return "missing"
+    return h.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        # 並列読み込み（--jobs）から同時に呼ばれるため、カウンタ更新は排他する
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, kind: str, version, sources, extra=(), by_path: bool = True) -> str:
+        h = hashlib.sha256()
+        h.update(f"{kind}\0{version}\0".encode("utf-8"))
+        for path in sources:
+            if by_path:
+                h.update(os.path.abspath(path).encode("utf-8", "surrogateescape"))
+            h.update(b"\0")
+            h.update(file_digest(path).encode("ascii"))
+            h.update(b"\0")
+        for item in extra:
+            h.update(repr(item).encode("utf-8", "surrogateescape"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get_or_parse(self, kind: str, version, sources, parse, *args, extra=(), by_path: bool = True):
+        key = self.make_key(kind, version, sources, extra, by_path)
+        path = os.path.join(self.cache_dir, key + _SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # 壊れたエントリは作り直す
+            _remove(path)
+        else:
+            with self._lock:
+                self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return result
+
+        with self._lock:
+            self.misses += 1
+        result = parse(*args)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(result, f, protocol=PICKLE_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            # キャッシュ書き込み失敗は解析結果に影響させない
+            _remove(tmp)
+        return result
+
+    def prune(self):
+        """容量上限を超えている場合、最終利用（mtime）の古いエントリから削除する。"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX) or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    # 同じキャッシュを使う別プロセスが削除した
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if _remove(path):
+                total -= size
+                self.evicted += 1
+        return total
+
+    def summary(self) -> str:
+        return f"hits={self.hits} misses={self.misses} evicted={self.evicted}"
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def cached(cache, kind: str, version, sources, parse, *args, extra=(), by_path: bool = True):
+    """cache が None なら parse(*args) をそのまま呼ぶ。"""
+    if cache is None:
+        return parse(*args)
+    return cache.get_or_parse(kind, version, sources, parse, *args, extra=extra, by_path=by_path)
+
+
+class MemoryParseCache:
+    """常駐プロセス（webmenu watch）用のメモリ上の解析結果キャッシュ。
+
+    キーは入力ファイルのパス・サイズ・更新日時なので、内容ハッシュを取らずに判定できる。
+    disk（ParseCache）を渡すと、メモリに無い分はディスクキャッシュから読み込む。
+    prune() の時点で直近 2 回のビルドで使われていないエントリを破棄する。
+    """
+
+    def __init__(self, disk: "ParseCache" = None):
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._entries = {}
+        self._used = set()
+        self._used_prev = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind: str, version, sources, extra=()):
+        stamps = []
+        for path in sources:
+            try:
+                st = os.stat(path)
+                stamps.append((os.path.abspath(path), st.st_size, st.st_mtime_ns))
+            except OSError:
+                stamps.append((os.path.abspath(path), None, None))
+        return (kind, version, tuple(stamps), tuple(repr(item) for item in extra))
+
+    def get_or_parse(self, kind: str, version, sources, parse, *args, extra=(), by_path: bool = True):
+        key = self.make_key(kind, version, sources, extra)
+        with self._lock:
+            self._used.add(key)
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        if self.disk is not None:
+            result = self.disk.get_or_parse(kind, version, sources, parse, *args,
+                                            extra=extra, by_path=by_path)
+        else:
+            result = parse(*args)
+        with self._lock:
+            self._entries[key] = result
+        return result
+
+    def prune(self):
+        with self._lock:
+            keep = self._used | self._used_prev
+            for key in [k for k in self._entries if k not in keep]:
+                del self._entries[key]
+                self.evicted += 1
+            self._used_prev, self._used = self._used, set()
+        if self.disk is not None:
+            self.disk.prune()
+
+    def summary(self) -> str:
+        return f"memory hits={self.hits} misses={self.misses} evicted={self.evicted} entries={len(self._entries)}"
@@ -0,0 +1,155 @@
+"""--profile 用の診断出力（cProfile・スタックサンプリング・tracemalloc）。
+
+ビルドディレクトリの profile/ に次を書き出す。
+  profile.pstats        : cProfile の結果（python -m pstats / snakeviz などで読む）
+  profile.collapsed     : 全スレッドのスタックを一定間隔で採取した折り畳み形式
+                          （"スレッド;呼び出し元;...;関数 回数"、flamegraph.pl / speedscope で読む）
+  tracemalloc_top.txt   : ビルド終了時点のメモリ確保元の上位
+ステージ境界ごとの確保元の上位は build_profile.json の各ステージに入る。
+"""
+import cProfile
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PROFILE_DIR = "profile"
+PSTATS_FILE = "profile.pstats"
+COLLAPSED_FILE = "profile.collapsed"
+TRACEMALLOC_FILE = "tracemalloc_top.txt"
+TOP_ALLOCATIONS = 10
+SAMPLE_INTERVAL = 0.005
+
+# 計測処理自身の確保は上位から除く（filter_traces は件数が多いと遅いので集計後に除外する）
+_IGNORED_FILES = {
+    tracemalloc.__file__,
+    __file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+}
+
+
+# run_profiled 実行中の cProfile（スナップショットの集計処理自体は計測しない）
+_active_profiler: Optional[cProfile.Profile] = None
+
+
+@contextmanager
+def _unprofiled():
+    profiler = _active_profiler
+    if profiler is not None:
+        profiler.disable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.enable()
+
+
+def take_snapshot() -> Optional[tracemalloc.Snapshot]:
+    """tracemalloc が有効なら計測自身の確保を除いたスナップショット。無効なら None。"""
+    if not tracemalloc.is_tracing():
+        return None
+    with _unprofiled():
+        return tracemalloc.take_snapshot()
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, base: Optional[tracemalloc.Snapshot] = None,
+                    limit: int = TOP_ALLOCATIONS) -> List[Dict]:
+    """確保元（ファイル:行）ごとの上位。base を渡すとその時点からの増分で並べる。"""
+    with _unprofiled():
+        if base is not None:
+            stats = _head(snapshot.compare_to(base, "lineno"), limit)
+            return [{"site": _site(s.traceback), "size_bytes": s.size,
+                     "size_diff_bytes": s.size_diff, "count": s.count,
+                     "count_diff": s.count_diff} for s in stats]
+        return [{"site": _site(s.traceback), "size_bytes": s.size, "count": s.count}
+                for s in _head(snapshot.statistics("lineno"), limit)]
+
+
+def _head(stats, limit: int):
+    return [s for s in stats if s.traceback[0].filename not in _IGNORED_FILES][:limit]
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class StackSampler(threading.Thread):
+    """一定間隔で全スレッドのスタックを採取し、折り畳み形式で集計する。
+
+    cProfile は開始したスレッドしか計測しないため、ステージやワーカーのスレッドは
+    こちらで補う。
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name="webmenu-stack-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.counts[";".join(s.replace(";", ":") for s in reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def run_profiled(func, args, logger: Optional[logging.Logger] = None):
+    """func(args) を cProfile・スタックサンプリング・tracemalloc 付きで実行する。
+
+    func はビルドディレクトリのパスを返すこと（診断出力はその profile/ に置く）。
+    """
+    global _active_profiler
+    logger = logger or logging.getLogger("webmenu_generator")
+    tracemalloc.start()
+    sampler = StackSampler()
+    sampler.start()
+    profiler = _active_profiler = cProfile.Profile()
+    try:
+        out_root = profiler.runcall(func, args)
+    except BaseException:
+        tracemalloc.stop()
+        raise
+    finally:
+        _active_profiler = None
+        sampler.stop()
+
+    try:
+        # pstats の書き出しで確保されるメモリを含めないよう、先にスナップショットを取る
+        current, peak = tracemalloc.get_traced_memory()
+        top = top_allocations(take_snapshot(), limit=30)
+        profile_dir = os.path.join(out_root, PROFILE_DIR)
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(profile_dir, PSTATS_FILE))
+        sampler.write(os.path.join(profile_dir, COLLAPSED_FILE))
+        with open(os.path.join(profile_dir, TRACEMALLOC_FILE), "w", encoding="utf-8") as f:
+            f.write(f"current={current} peak={peak}\n")
+            for stat in top:
+                f.write(f"{stat['size_bytes']:>12} {stat['count']:>8} {stat['site']}\n")
+    finally:
+        tracemalloc.stop()
+    logger.info("プロファイル結果を出力しました: %s", profile_dir)
+    return out_root
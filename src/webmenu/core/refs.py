@@ -1,9 +1,96 @@
-"""レガシー→Web の参照テーブル。解析時に随時格納する。"""
+"""レガシー→Web の参照テーブル。解析直後に一度だけ構築し、全マッピング処理で共有する。"""
+from typing import Dict, List, Optional, Tuple
+
+from ..parsers import menudb_reader as mreader
+
 
 class RefTable:
+    """menudb のアドレス／オフセット相互参照インデックス。
+
+    - smenu_index_by_offset : SMENU 先頭オフセット → smenus のインデックス
+    - item_info_by_addr     : ITEM_INFO アドレス → ItemInfo
+    - item_info_by_code     : 商品コード(str) → ItemInfo（重複コードは後勝ち）
+    - smenu_range_by_lm     : (L, M) → (SMENU 先頭インデックス, ページ数)
+    - mmenus_by_l           : L → その大分類に属する MMenu 一覧
+    - item_cell_base        : ITEM_CELL 配列の先頭アドレス
+    - sub_smenu_index_by_offset : SUB_SMENU 先頭オフセット → sub_smenus のインデックス
+    - sub_item_cell_base    : SUB_ITEM_CELL 配列の先頭アドレス
+    """
+
     def __init__(self):
-        self.small_addr_to_id = {}
-        self.page_index = {}  # (small_id) -> page_count/int など
+        self.smenus = []
+        self.item_cells = []
+        self.smenu_index_by_offset: Dict[int, int] = {}
+        self.item_info_by_addr: Dict[int, object] = {}
+        self.item_info_by_code: Dict[str, object] = {}
+        self.smenu_range_by_lm: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.mmenus_by_l: Dict[int, List] = {}
+        self.item_cell_base = 0
+        self.sub_smenus = []
+        self.sub_item_cells = []
+        self.sub_smenu_index_by_offset: Dict[int, int] = {}
+        self.sub_item_cell_base = 0
+
+    @classmethod
+    def from_menudb(cls, menudb) -> "RefTable":
+        refs = cls()
+        meta = menudb.get("meta", {})
+        counts = meta.get("counts", {})
+        base = meta.get("base")
+        stride = meta.get("stride", mreader.ITEM_INFORMATION_SIZE)
+        item_infos = menudb.get("item_infos", [])
+        refs.smenus = smenus = menudb.get("smenus", [])
+        refs.item_cells = menudb.get("item_cells", [])
+
+        if base is not None:
+            refs.item_info_by_addr = {base + stride * info.index: info for info in item_infos}
+            item_frame_size = mreader.ITEM_FRAME_INFORMATION_SIZE * counts.get("ItemFrmNum", 0)
+            item_cell_size = mreader.ITEM_CELL_INFORMATION_SIZE * counts.get("ItemCellNum", 0)
+            refs.item_cell_base = base - item_frame_size - item_cell_size
+        refs.item_info_by_code = {str(info.code): info for info in item_infos}
+        refs.smenu_index_by_offset = {sm.offset: idx for idx, sm in enumerate(smenus)}
+
+        refs.sub_smenus = sub_smenus = menudb.get("sub_smenus", [])
+        refs.sub_item_cells = menudb.get("sub_item_cells", [])
+        refs.sub_smenu_index_by_offset = {sm.offset: idx for idx, sm in enumerate(sub_smenus)}
+        if base is not None:
+            sub_code_size = mreader.SUBCODE_INFO_SIZE * counts.get("SubCodeInfoNum", 0)
+            sub_smenu_size = mreader.SMENU_INFORMATION_SIZE * counts.get("SubSMenuNum", 0)
+            refs.sub_item_cell_base = (
+                base + stride * counts.get("ItemInfoNum", 0) + sub_code_size + sub_smenu_size)
+
+        for mm in menudb.get("mmenus", []):
+            refs.mmenus_by_l.setdefault(mm.l_index, []).append(mm)
+            start_idx = refs.smenu_index_by_offset.get(mm.sMenuAddr)
+            if start_idx is not None:
+                refs.smenu_range_by_lm[(mm.l_index, mm.index)] = (start_idx, max(1, mm.sMenuNum))
+        return refs
+
+    def smenu_range(self, l_index: int, m_index: int) -> Optional[Tuple[int, int]]:
+        """(SMENU 先頭インデックス, ページ数) を返す。中分類の sMenuAddr が不正なら None。"""
+        return self.smenu_range_by_lm.get((l_index, m_index))
+
+    def smenus_in(self, l_index: int, m_index: int) -> List:
+        """中分類に属する SMENU を順に返す（smenus の範囲外は切り捨て）。"""
+        rng = self.smenu_range_by_lm.get((l_index, m_index))
+        if rng is None:
+            return []
+        start_idx, count = rng
+        return self.smenus[start_idx:start_idx + count]
+
+    def item_cells_at(self, item_addr: int, item_count: int) -> List:
+        """SMENU.itemAddr / itemNum が指す ITEM_CELL の範囲を返す。"""
+        return _cell_range(self.item_cells, self.item_cell_base, item_addr, item_count)
+
+    def sub_item_cells_at(self, item_addr: int, item_count: int) -> List:
+        """SUB_SMENU.itemAddr / itemNum が指す SUB_ITEM_CELL の範囲を返す。"""
+        return _cell_range(self.sub_item_cells, self.sub_item_cell_base, item_addr, item_count)
+
 
-    def bind_small(self, addr:int, small_id:str):
-        self.small_addr_to_id[addr] = small_id
+def _cell_range(cells, cell_base: int, item_addr: int, item_count: int) -> List:
+    if item_addr < cell_base:
+        return []
+    start = (item_addr - cell_base) // mreader.ITEM_CELL_INFORMATION_SIZE
+    if not 0 <= start < len(cells):
+        return []
+    return cells[start:start + item_count]
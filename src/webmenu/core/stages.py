@@ -0,0 +1,115 @@
+"""パイプラインのステージ定義と実行スケジューラ。
+
+各ステージは入力（先行ステージの出力名）と出力名を宣言し、
+run_stages が依存関係の揃ったステージから順に実行する。
+jobs=1 のときは宣言順に逐次実行する（デバッグ用。従来の処理順と同じ）。
+jobs>1 のときはスレッドプールで独立したステージを並行して実行する。
+profile（BuildProfile）を渡すと各ステージの時間・メモリ・カウンタを記録する。
+ステージ間の受け渡しは出力名をキーにした辞書だけなので、
+実行順が変わっても各ステージが受け取る値（＝出力内容）は変わらない。
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class Stage:
+    """func(**{入力名: 値}) を呼び、戻り値を outputs に割り当てるステージ。
+
+    outputs が 1 つなら戻り値そのもの、複数ならタプルを順に割り当てる。
+    after には値を受け取らずに完了だけ待つステージ名を指定する。
+    """
+    __slots__ = ("name", "func", "inputs", "outputs", "after")
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = (), after: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(after)
+
+    def run(self, values: Dict[str, Any]):
+        result = self.func(**{name: values[name] for name in self.inputs})
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        if not self.outputs:
+            return {}
+        return dict(zip(self.outputs, result))
+
+
+def _dependencies(stages: List[Stage], initial: Dict[str, Any]) -> Dict[str, List[str]]:
+    """ステージ名 -> 先行ステージ名。宣言順がそのまま実行可能な順序であることも検証する。"""
+    producer: Dict[str, str] = {}
+    done = set()
+    deps: Dict[str, List[str]] = {}
+    for stage in stages:
+        if stage.name in deps:
+            raise ValueError(f"duplicate stage: {stage.name}")
+        names = []
+        for value in stage.inputs:
+            if value in initial:
+                continue
+            if value not in producer:
+                raise ValueError(f"stage '{stage.name}' needs '{value}' before it is produced")
+            names.append(producer[value])
+        for name in stage.after:
+            if name not in done:
+                raise ValueError(f"stage '{stage.name}' must be declared after '{name}'")
+            names.append(name)
+        for value in stage.outputs:
+            if value in producer or value in initial:
+                raise ValueError(f"'{value}' is produced twice")
+            producer[value] = stage.name
+        deps[stage.name] = sorted(set(names))
+        done.add(stage.name)
+    return deps
+
+
+def _execute(stage: Stage, values: Dict[str, Any], profile):
+    if profile is None:
+        return stage.run(values)
+    with profile.stage(stage.name):
+        return stage.run(values)
+
+
+def run_stages(stages: List[Stage], jobs: int = 1,
+               initial: Optional[Dict[str, Any]] = None, profile=None) -> Dict[str, Any]:
+    """ステージを依存順に実行し、すべての出力（initial を含む）を返す。
+
+    途中で失敗した場合は新しいステージを開始せず、実行中のものの完了を待ってから
+    宣言順で最初に失敗したステージの例外を送出する。
+    """
+    values: Dict[str, Any] = dict(initial or {})
+    deps = _dependencies(stages, values)
+
+    if jobs <= 1:
+        for stage in stages:
+            values.update(_execute(stage, values, profile))
+        return values
+
+    pending = list(stages)
+    finished = set()
+    errors: Dict[str, BaseException] = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            if not errors:
+                # 依存の揃ったものを宣言順に投入する
+                for stage in [s for s in pending if all(d in finished for d in deps[s.name])]:
+                    pending.remove(stage)
+                    running[pool.submit(_execute, stage, dict(values), profile)] = stage
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    values.update(future.result())
+                except BaseException as e:
+                    errors[stage.name] = e
+                finished.add(stage.name)
+
+    if errors:
+        first = next(s.name for s in stages if s.name in errors)
+        raise errors[first]
+    return values
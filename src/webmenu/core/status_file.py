@@ -0,0 +1,18 @@
+"""状態・結果の JSON ファイル（watch_status.json・batch_summary.json など）。"""
+import datetime
+import json
+import os
+from typing import Dict
+
+
+def now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def write_status(path: str, status: Dict):
+    """状態ファイルを書き換える（読み手が途中の内容を読まないよう置き換えで更新）。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
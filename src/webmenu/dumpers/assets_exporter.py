@@ -1,58 +1,81 @@
 import os, shutil
 
+from ..core.inventory import SourceInventory, FREE, OSUSUME
+
 FREE_PREFIX = "free_images/"
 OSUSUME_PREFIX = "osusume_images/"
 SOLDOUT_PREFIX = "soldout_images/"
 
 
-def export_assets(free_dir:str, osusume_dir:str, out_assets_dir:str, required_assets=None):
-    if required_assets:
-        assets = sorted({asset for asset in required_assets if asset})
-        os.makedirs(out_assets_dir, exist_ok=True)
+def _source_path(inventory: SourceInventory, rel: str):
+    """出力用の相対パスから元ファイルの実パスを返す（インベントリに無ければ None）。"""
+    if rel.startswith(FREE_PREFIX):
+        return inventory.path(FREE, rel[len(FREE_PREFIX):])
+    if rel.startswith(OSUSUME_PREFIX):
+        return inventory.path(OSUSUME, rel[len(OSUSUME_PREFIX):])
+    # fallback: treat as free/images root
+    return inventory.path(FREE, rel)
 
-        for rel in assets:
-            src_path = None
-            if rel.startswith(FREE_PREFIX):
-                rel_sub = rel[len(FREE_PREFIX):]
-                src_path = os.path.join(free_dir, "images", rel_sub)
-            elif rel.startswith(OSUSUME_PREFIX):
-                rel_sub = rel[len(OSUSUME_PREFIX):]
-                src_path = os.path.join(osusume_dir, "smenu", rel_sub)
-            else:
-                # fallback: treat as free/images root
-                src_path = os.path.join(free_dir, "images", rel)
 
-            if not src_path or not os.path.isfile(src_path):
-                continue
+def _copy(src_path: str, dst_path: str) -> bool:
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    shutil.copy2(src_path, dst_path)
+    return False
+
 
-            dst_path = os.path.join(out_assets_dir, rel)
-            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-            shutil.copy2(src_path, dst_path)
-        return
+def _copy_all(inventory: SourceInventory, out_assets_dir: str, assets, resolve=_source_path,
+              copy_file=None):
+    """出力用相対パスの素材をコピーし、(コピー数, 元ファイルが無くスキップした数, 引き継ぎ数) を返す。
+
+    copy_file(元パス, 出力パス) を渡すとコピー処理を差し替える（差分ビルドの引き継ぎなど）。
+    copy_file はコピーせずに前回ビルドのファイルを引き継いだ（リンクした）場合に True を返す。
+    """
+    copy_file = copy_file or _copy
+    copied = skipped = linked = 0
+    for rel in assets:
+        src_path = resolve(inventory, rel)
+        if not src_path:
+            skipped += 1
+            continue
+        if copy_file(src_path, os.path.join(out_assets_dir, rel)):
+            linked += 1
+        else:
+            copied += 1
+    return copied, skipped, linked
+
+
+def export_assets(inventory: SourceInventory, out_assets_dir:str, required_assets=None,
+                  copy_file=None):
+    if required_assets:
+        assets = sorted({asset for asset in required_assets if asset})
+        os.makedirs(out_assets_dir, exist_ok=True)
+        return _copy_all(inventory, out_assets_dir, assets, copy_file=copy_file)
 
     os.makedirs(out_assets_dir, exist_ok=True)
-    src = os.path.join(free_dir, "images")
     dst = os.path.join(out_assets_dir, "free_images")
-    if not os.path.isdir(src):
-        return
-    
-    for root, dirs, files in os.walk(src):
-        rel_dir = os.path.relpath(root, src)
-        dst_dir = dst if rel_dir == "." else os.path.join(dst, rel_dir)
+    if not inventory.isdir(FREE):
+        return 0, 0, 0
+
+    copy_file = copy_file or _copy
+    copied = linked = 0
+    for rel_dir, dirs, files in inventory.walk(FREE):
+        dst_dir = os.path.join(dst, *rel_dir.split("/")) if rel_dir else dst
 
         os.makedirs(dst_dir, exist_ok=True)
 
         for file in files:
-            src_file = os.path.join(root, file)
-            dst_file = os.path.join(dst_dir, file)
-            shutil.copy2(src_file, dst_file)
-            
+            src_file = inventory.path(FREE, f"{rel_dir}/{file}" if rel_dir else file)
+            if copy_file(src_file, os.path.join(dst_dir, file)):
+                linked += 1
+            else:
+                copied += 1
+    return copied, 0, linked
 
-def export_soldout_assets(free_dir:str,out_assets_dir:str, soldout):
+
+def export_soldout_assets(inventory: SourceInventory, out_assets_dir:str, soldout, copy_file=None):
     if not soldout:
-        return
+        return 0, 0, 0
     
-    source_dir = os.path.join(free_dir, "images")
     target_dir = os.path.join(out_assets_dir, "soldout_images")
     os.makedirs(target_dir, exist_ok=True)
     
@@ -72,19 +95,14 @@ def export_soldout_assets(free_dir:str,out_assets_dir:str, soldout):
 
     collect_images(soldout)
 
-    for image in image_files:
-        source_path = os.path.join(source_dir, image)
-        target_path = os.path.join(target_dir, image)
-
-        if os.path.isfile(source_path):
-            os.makedirs(os.path.dirname(target_path), exist_ok=True)
-            shutil.copy2(source_path, target_path)
+    return _copy_all(inventory, target_dir, image_files,
+                     resolve=lambda inv, image: inv.path(FREE, image), copy_file=copy_file)
 
 
-def export_jump_btn_assets(free_dir:str,osusume_dir:str,out_assets_dir:str, jump_btns):
+def export_jump_btn_assets(inventory: SourceInventory, out_assets_dir:str, jump_btns, copy_file=None):
     buttons = jump_btns.get("jumpmenu", {}).get("buttons", [])
     if not buttons:
-        return
+        return 0, 0, 0
     
     image_files = set()
     
@@ -97,35 +115,20 @@ def export_jump_btn_assets(free_dir:str,osusume_dir:str,out_assets_dir:str, jump
             if path:
                 image_files.add(path)
                 
-    for image in image_files:
-        if image.startswith(FREE_PREFIX):
-            rel = image[len(FREE_PREFIX):]
-            src_path = os.path.join(free_dir, "images", rel)
-        elif image.startswith(OSUSUME_PREFIX):
-            rel = image[len(OSUSUME_PREFIX):]
-            src_path = os.path.join(osusume_dir, "smenu", rel)
-        else:
-            src_path = os.path.join(free_dir, "images", image)
-
-        if not os.path.isfile(src_path):
-            continue
-
-        dst_path = os.path.join(out_assets_dir, image)
-        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-        shutil.copy2(src_path, dst_path)
+    return _copy_all(inventory, out_assets_dir, image_files, copy_file=copy_file)
 
 
 def export_checkin_btn_assets(
-    free_dir: str,
-    osusume_dir: str,
+    inventory: SourceInventory,
     out_assets_dir: str,
-    checkin_btn
+    checkin_btn,
+    copy_file=None
 ):
     checkin = checkin_btn.get("checkin_hansoku", {})
     screens = checkin.get("screens", {})
 
     if not screens:
-        return
+        return 0, 0, 0
 
     image_files = set()
 
@@ -141,21 +144,4 @@ def export_checkin_btn_assets(
         for btn in screen.get("buttons", []):
             collect_image_map(btn.get("image"))
 
-    for image in image_files:
-        if image.startswith(FREE_PREFIX):
-            rel = image[len(FREE_PREFIX):]
-            src_path = os.path.join(free_dir, "images", rel)
-
-        elif image.startswith(OSUSUME_PREFIX):
-            rel = image[len(OSUSUME_PREFIX):]
-            src_path = os.path.join(osusume_dir, "smenu", rel)
-
-        else:
-            src_path = os.path.join(free_dir, "images", image)
-
-        if not os.path.isfile(src_path):
-            continue
-
-        dst_path = os.path.join(out_assets_dir, image)
-        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-        shutil.copy2(src_path, dst_path)
+    return _copy_all(inventory, out_assets_dir, image_files, copy_file=copy_file)
@@ -0,0 +1,156 @@
+import os
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List
+
+try:
+    import orjson
+except ImportError:  # orjson は任意依存（無ければ標準 json の C エンコーダを使う）
+    orjson = None
+
+# --output-format
+OUTPUT_FORMATS = ("compact", "pretty")
+
+
+def remove_file(path: str):
+    """path を削除する（無ければ何もしない）。
+
+    出力は差分ビルドで前回ビルドとハードリンクを共有していることがあるので、
+    既存の出力を書き換えるときは上書きせず、これで削除してから新しく作る。
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_bytes(path: str, data: bytes) -> int:
+    remove_file(path)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def write_json(path: str, payload, **kwargs) -> int:
+    """payload を UTF-8 の JSON で書き出し、書き込んだバイト数を返す（kwargs は json.dumps と同じ）。"""
+    return write_bytes(path, json.dumps(payload, ensure_ascii=False, **kwargs).encode("utf-8"))
+
+
+class JsonEmitter:
+    """出力形式ごとの JSON 書き出し（web_content・raw_dump の出力はすべてこれを通す）。
+
+    pretty : 各出力の従来の書式（呼び出し側が渡す indent=2 など）で書き出す。開発・確認用。
+    compact: インデント・改行なし、区切りを詰めて書き出す。orjson があれば orjson、
+             無ければ標準 json の C エンコーダ（json.dumps の一括変換）を使う。
+    """
+
+    def __init__(self, output_format: str = "compact"):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format: {output_format}")
+        self.output_format = output_format
+
+    def dumps(self, payload, default=None, **pretty_kwargs) -> bytes:
+        """JSON のバイト列。pretty_kwargs（indent / separators）は pretty のときだけ使う。"""
+        if self.output_format == "pretty":
+            return json.dumps(payload, ensure_ascii=False, default=default,
+                              **pretty_kwargs).encode("utf-8")
+        if orjson is not None:
+            try:
+                return orjson.dumps(payload, default=default, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # orjson が扱えない値（64bit を超える整数など）は標準 json に任せる
+                pass
+        return json.dumps(payload, ensure_ascii=False, default=default,
+                          separators=(",", ":")).encode("utf-8")
+
+    def write(self, path: str, payload, default=None, **pretty_kwargs) -> int:
+        """payload を path に書き出し、書き込んだバイト数を返す。"""
+        return write_bytes(path, self.dumps(payload, default=default, **pretty_kwargs))
+
+
+class WriterPool:
+    """JSON ファイルの書き出しをワーカースレッドで並行して行う。
+
+    submit() の時点で emitter で直列化し（直列化は GIL を持つのでワーカーに回しても
+    並行にならない）、ファイルの書き込み・クローズだけをワーカーに任せる。
+    書き込み待ちのバイト数が max_pending_bytes を超えると submit() は空くまで待つ。
+    ディレクトリは初回の submit() で一度だけ作る。
+    workers=0 なら submit() の中でそのまま書き込む。
+    write_file（パス, バイト列 -> バイト数）で実際の書き込みを差し替えられる
+    （出力マニフェストで変更の無いファイルの書き込みを省く場合など）。
+    """
+
+    def __init__(self, emitter: JsonEmitter, workers: int = 4,
+                 max_pending_bytes: int = 32 * 1024 * 1024, write_file=None):
+        self.emitter = emitter
+        self.max_pending_bytes = max_pending_bytes
+        self.write_file = write_file or write_bytes
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webmenu-writer") \
+            if workers > 0 else None
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._dirs = set()
+        self._futures: List[Future] = []
+
+    def _makedirs(self, directory: str):
+        with self._cond:
+            if directory in self._dirs:
+                return
+        os.makedirs(directory, exist_ok=True)
+        with self._cond:
+            self._dirs.add(directory)
+
+    def _write(self, path: str, data: bytes) -> int:
+        try:
+            return self.write_file(path, data)
+        finally:
+            with self._cond:
+                self._pending -= len(data)
+                self._cond.notify_all()
+
+    def submit(self, path: str, payload, default=None, **pretty_kwargs) -> Future:
+        """書き出しを登録する。Future の結果は書き込んだバイト数。"""
+        return self.submit_bytes(path, self.emitter.dumps(payload, default=default, **pretty_kwargs))
+
+    def submit_bytes(self, path: str, data: bytes) -> Future:
+        """直列化済みのバイト列の書き出しを登録する（submit と同じ）。"""
+        self._makedirs(os.path.dirname(path))
+        if self._pool is None:
+            future = Future()
+            future.set_result(self.write_file(path, data))
+            return future
+        with self._cond:
+            # 1 ファイルで上限を超える場合は、先行分が書き終わってから投入する
+            while self._pending and self._pending + len(data) > self.max_pending_bytes:
+                self._cond.wait()
+            self._pending += len(data)
+        future = self._pool.submit(self._write, path, data)
+        with self._cond:
+            self._futures.append(future)
+        return future
+
+    @staticmethod
+    def wait(futures: Iterable[Future]) -> int:
+        """futures の書き込みを待ち、合計バイト数を返す（失敗があればその例外を送出）。"""
+        return sum(future.result() for future in futures)
+
+    def close(self):
+        """残りの書き込みを待って終了する。"""
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True)
+        with self._cond:
+            futures, self._futures = self._futures, []
+        self.wait(futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._pool is not None:
+            # 既に失敗しているので、書き込みの終了だけ待って元の例外を優先する
+            self._pool.shutdown(wait=True)
+        return False
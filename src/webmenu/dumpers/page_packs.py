@@ -0,0 +1,68 @@
+import json
+import os
+from concurrent.futures import Future
+from typing import Dict, List
+
+from ..core.ids import pack_relpath_of
+from .json_writer import WriterPool
+
+
+class PagePacks:
+    """大分類（L）ごとのページパック（packs/L<nn>.json）の書き出し（--page-packs）。
+
+    small/ 配下の page-1.json・cells.json を大分類ごとに 1 ファイルへまとめ、
+    SPA がページ遷移のたびに個別の JSON を取得しなくて済むようにする。
+    {"schema_version": ..., "large": "L01", "files": {"small/sm-0101001/page-1.json": {...}, ...}}
+
+    ページは保持せず、各ページのファイル用に直列化したバイト列をそのまま埋め込む。
+    ページは大分類の順に届くので、大分類が変わった時点でそのパックを書き出し、
+    保持するのは書き出し中の大分類 1 つ分のバイト列だけにする。
+    """
+
+    def __init__(self, web_dir: str, writer: WriterPool, schema_version: str = "0.1"):
+        self.web_dir = web_dir
+        self.writer = writer
+        self.schema_version = schema_version
+        self._pack = None
+        self._parts: List[bytes] = []
+        # 書き出しを登録済みのパック -> Future
+        self._written: Dict[str, Future] = {}
+        self._futures: List[Future] = []
+
+    def add(self, rel_path: str, data: bytes):
+        """rel_path（web_content 相対）の直列化済み JSON を属する大分類のパックに加える。"""
+        pack = pack_relpath_of(rel_path)
+        if not pack:
+            return
+        if pack != self._pack:
+            self._submit()
+            self._pack = pack
+        key = json.dumps(rel_path, ensure_ascii=False).encode("utf-8")
+        self._parts.append(key + b":" + data)
+
+    def _submit(self):
+        if self._pack is None:
+            return
+        pack, parts = self._pack, self._parts
+        self._pack, self._parts = None, []
+        path = os.path.join(self.web_dir, *pack.split("/"))
+        previous = self._written.get(pack)
+        if previous is None:
+            large = os.path.splitext(os.path.basename(pack))[0]
+            head = self.writer.emitter.dumps({"schema_version": self.schema_version, "large": large})
+            data = head[:-1] + b',"files":{' + b",".join(parts) + b"}}"
+        else:
+            # 書き出し済みの大分類のページが後から来た場合は、書き出したパックに追記し直す
+            previous.result()
+            self._futures.remove(previous)
+            with open(path, "rb") as f:
+                data = f.read()[:-2] + b"," + b",".join(parts) + b"}}"
+        future = self.writer.submit_bytes(path, data)
+        self._written[pack] = future
+        self._futures.append(future)
+
+    def flush(self) -> List[Future]:
+        """残りのパックの書き出しを登録し、これまでに登録した全パックの Future の一覧を返す。"""
+        self._submit()
+        futures, self._futures = self._futures, []
+        return futures
@@ -0,0 +1,102 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from ..core.ids import SIDECAR_SUFFIXES
+from .json_writer import remove_file
+
+try:
+    import brotli
+except ImportError:  # brotli は任意依存（無ければ .gz のみ出力する）
+    brotli = None
+
+# 事前圧縮の対象（テキストの出力）と、圧縮しない小さいファイルの上限
+TEXT_EXTENSIONS = (".json", ".html", ".csv", ".js", ".css", ".svg", ".txt")
+MIN_BYTES = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def _encodings() -> List[Tuple[str, object]]:
+    encodings = [(".gz", lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        encodings.append((".br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY)))
+    return encodings
+
+
+def _remove(outputs, path: str):
+    """圧縮版を削除し、outputs の記録からも外す。"""
+    outputs.forget(path)
+    remove_file(path)
+
+
+def remove_sidecars(outputs):
+    """事前圧縮しないビルドで、同じ出力先に前回作った圧縮版が残らないように削除する。"""
+    for rel in outputs.files():
+        if rel.endswith(TEXT_EXTENSIONS):
+            path = os.path.join(outputs.web_dir, *rel.split("/"))
+            for suffix in SIDECAR_SUFFIXES:
+                _remove(outputs, path + suffix)
+
+
+def precompress(outputs, workers: int = 4, min_bytes: int = MIN_BYTES) -> Dict[str, Dict[str, int]]:
+    """outputs（OutputManifest）に記録済みのテキスト出力の圧縮版（.gz / .br）を隣に書き出す。
+
+    Nginx の gzip_static / brotli_static でそのまま配信するためのもの。
+    前回ビルドから内容が変わっていないファイルは、前回の圧縮版を引き継ぐ（圧縮し直さない）。
+    min_bytes 未満のファイルと、圧縮しても小さくならないファイルには圧縮版を作らない
+    （古い圧縮版が残っていれば削除する）。書き出した圧縮版は outputs に記録する。
+    workers: 圧縮を並行して行うスレッド数（0 なら逐次。zlib / brotli は GIL を解放する）。
+    戻り値: 拡張子ごとの {files, reused, bytes, <encoding>_bytes, <encoding>_saved}
+    （今回の全圧縮版の集計。reused は前回の圧縮版を引き継いだ圧縮版の数）。
+    """
+    encodings = _encodings()
+    # brotli が無い場合、前回 brotli ありで作った .br は古くなるので消す
+    unavailable = [suffix for suffix in SIDECAR_SUFFIXES if suffix not in dict(encodings)]
+    sources = [entry for rel, entry in sorted(outputs.files().items())
+               if rel.endswith(TEXT_EXTENSIONS)]
+
+    def compress(entry) -> List[Tuple[str, int, bool]]:
+        rel = entry["path"]
+        path = os.path.join(outputs.web_dir, *rel.split("/"))
+        sizes = []
+        data = None
+        for suffix, func in encodings:
+            if entry["size"] >= min_bytes:
+                reused = outputs.reuse_derived(rel, rel + suffix)
+                if reused is not None:
+                    sizes.append((suffix, reused, True))
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                packed = func(data)
+                if len(packed) < len(data):
+                    sizes.append((suffix, outputs.write(path + suffix, packed), False))
+                    continue
+            _remove(outputs, path + suffix)
+        for suffix in unavailable:
+            _remove(outputs, path + suffix)
+        return sizes
+
+    if workers > 0:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webmenu-compress") as pool:
+            results = list(pool.map(compress, sources))
+    else:
+        results = [compress(entry) for entry in sources]
+
+    report: Dict[str, Dict[str, int]] = {}
+    for entry, sizes in zip(sources, results):
+        if not sizes:
+            continue
+        ext = os.path.splitext(entry["path"])[1]
+        stats = report.setdefault(ext, {"files": 0, "reused": 0, "bytes": 0})
+        stats["files"] += 1
+        stats["bytes"] += entry["size"]
+        for suffix, size, reused in sizes:
+            stats["reused"] += reused
+            name = suffix.lstrip(".")
+            stats[f"{name}_bytes"] = stats.get(f"{name}_bytes", 0) + size
+            stats[f"{name}_saved"] = stats.get(f"{name}_saved", 0) + entry["size"] - size
+    return report
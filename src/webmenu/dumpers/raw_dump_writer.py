@@ -1,55 +1,66 @@
 import os
-import json
 
+from ..models.record import json_default
+from .json_writer import JsonEmitter, WriterPool
+
+
+def _without_families(payload):
+    # families は sections から作る索引なので raw_dump には出さない
+    return {k: v for k, v in payload.items() if k != "families"}
+
+
+RAW_DUMP_SECTIONS = ("ini", "menudb", "osusume", "datas")
+
+
+def write_raw_dump(raw_dump_dir: str, ini_bundle, menudb, osusume, osusume_ini_bundle, osusume_datas, datas,
+                   sections=RAW_DUMP_SECTIONS, writer=None):
+    """解析結果をそのまま JSON で書き出す。戻り値は (ファイル数, バイト数)。
+
+    sections に含まれないサブディレクトリは出力しない（差分ビルドで引き継いだ場合など）。
+    writer（WriterPool）を渡すと書き込みを並行して行い、すべて書き終えてから戻る。
+    省略時は pretty で逐次書き出す。
+    """
+    writer = writer or WriterPool(JsonEmitter("pretty"), workers=0)
+    futures = []
+
+    def dump(path, payload, **kwargs):
+        futures.append(writer.submit(path, payload, indent=2, **kwargs))
 
-def write_raw_dump(raw_dump_dir: str, ini_bundle, menudb, osusume, osusume_ini_bundle, osusume_datas, datas):
     os.makedirs(raw_dump_dir, exist_ok=True)
 
     # ini
-    ini_dir = os.path.join(raw_dump_dir, "ini")
-    os.makedirs(ini_dir, exist_ok=True)
-    for fname, payload in ini_bundle.items():
-        with open(os.path.join(ini_dir, fname + ".json"), "w", encoding="utf-8") as f:
-            json.dump({"__file": fname, **payload},
-                      f, ensure_ascii=False, indent=2)
+    if "ini" in sections:
+        ini_dir = os.path.join(raw_dump_dir, "ini")
+        os.makedirs(ini_dir, exist_ok=True)
+        for fname, payload in ini_bundle.items():
+            dump(os.path.join(ini_dir, fname + ".json"),
+                 {"__file": fname, **_without_families(payload)})
 
     # menudb (スタブ構成)
-    mdir = os.path.join(raw_dump_dir, "menudb")
-    os.makedirs(mdir, exist_ok=True)
-    with open(os.path.join(mdir, "lmenus.json"), "w", encoding="utf-8") as f:
-        json.dump(menudb.get("lmenus", []), f, ensure_ascii=False, indent=2)
-    with open(os.path.join(mdir, "mmenus.json"), "w", encoding="utf-8") as f:
-        json.dump(menudb.get("mmenus", []), f, ensure_ascii=False, indent=2)
-    with open(os.path.join(mdir, "smenus.json"), "w", encoding="utf-8") as f:
-        json.dump(menudb.get("smenus", []), f, ensure_ascii=False, indent=2)
-    with open(os.path.join(mdir, "item_infos.json"), "w", encoding="utf-8") as f:
-        json.dump(menudb.get("item_infos", []),
-                  f, ensure_ascii=False, indent=2)
-    with open(os.path.join(mdir, "item_cells.json"), "w", encoding="utf-8") as f:
-        json.dump(menudb.get("item_cells", []),
-                  f, ensure_ascii=False, indent=2)
-    with open(os.path.join(mdir, "item_frames.json"), "w", encoding="utf-8") as f:
-        json.dump(menudb.get("item_frames", []),
-                  f, ensure_ascii=False, indent=2)
+    if "menudb" in sections:
+        mdir = os.path.join(raw_dump_dir, "menudb")
+        os.makedirs(mdir, exist_ok=True)
+        for name in ("lmenus", "mmenus", "smenus", "item_infos", "item_cells", "item_frames",
+                     "sub_code_infos", "sub_smenus", "sub_item_cells", "sub_item_frames"):
+            dump(os.path.join(mdir, name + ".json"), menudb.get(name, []),
+                 default=json_default)
 
     # osusume
-    if osusume or osusume_ini_bundle or osusume_datas:
+    if "osusume" in sections and (osusume or osusume_ini_bundle or osusume_datas):
         osusume_dir = os.path.join(raw_dump_dir, "osusume")
         os.makedirs(osusume_dir, exist_ok=True)
-        with open(os.path.join(osusume_dir, "osusume.json"), "w", encoding="utf-8") as f:
-            json.dump(osusume, f, ensure_ascii=False, indent=2)
+        dump(os.path.join(osusume_dir, "osusume.json"), osusume)
         for fname, payload in osusume_ini_bundle.items():
-            with open(os.path.join(osusume_dir, fname + ".json"), "w", encoding="utf-8") as f:
-                json.dump({"__file": fname, **payload},
-                          f, ensure_ascii=False, indent=2)
+            dump(os.path.join(osusume_dir, fname + ".json"),
+                 {"__file": fname, **_without_families(payload)})
         for data_name, data_payload in osusume_datas.items():
-            with open(os.path.join(osusume_dir, data_name + ".json"), "w", encoding="utf-8") as f:
-                json.dump(data_payload, f, ensure_ascii=False, indent=2)
+            dump(os.path.join(osusume_dir, data_name + ".json"), data_payload)
 
     # datas
-    if datas:
+    if "datas" in sections and datas:
         datas_dir = os.path.join(raw_dump_dir, "datas")
         os.makedirs(datas_dir, exist_ok=True)
         for data_name, data_payload in datas.items():
-            with open(os.path.join(datas_dir, data_name + ".json"), "w", encoding="utf-8") as f:
-                json.dump(data_payload, f, ensure_ascii=False, indent=2)
+            dump(os.path.join(datas_dir, data_name + ".json"), data_payload)
+
+    return len(futures), writer.wait(futures)
@@ -3,10 +3,14 @@ import json
 import re
 import csv
 
-def run_guidance_process(target_web_content_dir):
+from ..dumpers.json_writer import remove_file
+
+
+def run_guidance_process(target_web_content_dir, emitter=None):
     """
     指定された web_content ディレクトリを走査し、
     folder_guidance.json と folder_list.csv を出力する
+    emitter（JsonEmitter）を渡すと JSON はその出力形式で書き出す
     """
     small_dir = os.path.join(target_web_content_dir, "small")
     json_output = os.path.join(target_web_content_dir, "folder_guidance.json")
@@ -55,12 +59,17 @@ def run_guidance_process(target_web_content_dir):
                 print(f"Warning: Failed to read {folder_name} ({e})")
 
     # --- Step 2: JSON 出力 ---
-    with open(json_output, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    if emitter is not None:
+        emitter.write(json_output, results, indent=2)
+    else:
+        remove_file(json_output)
+        with open(json_output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
     print(f"Generated: {json_output}")
 
     # --- Step 3: CSV (Excel用) 出力 ---
     # Python 3.8標準のcsvモジュールを使用（BOM付きUTF-8でExcel対応）
+    remove_file(csv_output)
     with open(csv_output, 'w', encoding='utf-8-sig', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(["ID", "フォルダ名", "分類コード", "大分類", "中分類", "小分類", "元ファイル"])
@@ -78,4 +87,4 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         run_guidance_process(sys.argv[1])
     else:
-        print("Usage: python guidance_generator.py <path_to_web_content>")
\ No newline at end of file
+        print("Usage: python -m webmenu.mapping.guidance_generator <path_to_web_content>")
\ No newline at end of file
@@ -1,41 +1,25 @@
-import os
 from typing import List, Dict, Optional
 from ..core.ids import small_id
+from ..core.inventory import SourceInventory, FREE, OSUSUME
 
 
-def _check_is_multi_lang(free_dir: str) -> List[str]:
+def _check_is_multi_lang(inventory: SourceInventory) -> List[str]:
     """
     images ディレクトリ直下に存在し、
     かつ内部にファイルを含むサブディレクトリ名の一覧を返す。
     """
-    image_path = os.path.join(free_dir, "images")
-    result: List[str] = []
-
-    # images 直下を走査
-    for entry in os.listdir(image_path):
-        full_path = os.path.join(image_path, entry)
-
-        # サブディレクトリのみ対象
-        if os.path.isdir(full_path):
-            # サブディレクトリ内にファイルがあるか確認
-            for sub in os.listdir(full_path):
-                sub_path = os.path.join(full_path, sub)
-                if os.path.isfile(sub_path):
-                    result.append(entry)
-                    break  # 同じディレクトリは一度だけ追加
-
-    return result
+    return inventory.lang_dirs()
 
 
 def _get_image_path(
-    free_dir: str,
-    osusume_dir: str,
+    inventory: SourceInventory,
     name: str,
     multi_lang_dirs: Optional[List[str]] = None
 ) -> Dict[str, str]:
     """
     画像パスの map を返す。
     戻り値は常に Dict[str, str]。
+    ファイルの有無はインベントリで判定し、ディスクには問い合わせない。
     """
     if not name:
         return {}
@@ -43,17 +27,14 @@ def _get_image_path(
     result: Dict[str, str] = {}
     multi_lang_dirs = multi_lang_dirs or []
 
-    free_image_base = os.path.join(free_dir, "images")
-    osusume_image_base = os.path.join(osusume_dir, "smenu", "menu", "images")
+    osusume_image_base = "menu/images"
 
     # freeディレクトリから画像を優先的に取得
-    file_path = os.path.join(free_image_base, name)
-    if os.path.isfile(file_path):
+    if inventory.isfile(FREE, name):
         result["default"] = f"free_images/{name}"
 
     # osusumeディレクトリに同名画像が存在する場合は、freeの画像を置き換え
-    file_path = os.path.join(osusume_image_base, name)
-    if os.path.isfile(file_path):
+    if inventory.isfile(OSUSUME, f"{osusume_image_base}/{name}"):
         result["default"] = f"osusume_images/menu/images/{name}"
 
     # ---- 多言語なし ----
@@ -63,14 +44,12 @@ def _get_image_path(
     # ---- 多言語あり ----
     for lang in multi_lang_dirs:
         # osusume を優先
-        file_path = os.path.join(osusume_image_base, lang, name)
-        if os.path.isfile(file_path):
+        if inventory.isfile(OSUSUME, f"{osusume_image_base}/{lang}/{name}"):
             result[lang] = f"osusume_images/menu/images/{lang}/{name}"
             continue
 
         # osusume に無い場合は free を確認
-        file_path = os.path.join(free_image_base, lang, name)
-        if os.path.isfile(file_path):
+        if inventory.isfile(FREE, f"{lang}/{name}"):
             result[lang] = f"free_images/{lang}/{name}"
             continue
 
@@ -88,14 +67,9 @@ def _filename_label(name: str, fallback: str) -> str:
     return base or fallback
 
 
-def make_categories(free_dir: str, osusume_dir: str, menudb, ini_bundle, small_pages, schema_version="0.1"):
+def make_categories(inventory: SourceInventory, menudb, refs, ini_bundle, small_pages, schema_version="0.1"):
     lmenus = menudb.get("lmenus", [])
-    mmenus = menudb.get("mmenus", [])
-    smenus = menudb.get("smenus", [])
-    item_infos = menudb.get("item_infos", [])
-
-    products_by_code = {str(info.get("code")): info.get(
-        "name", "") for info in item_infos}
+    info_by_code = refs.item_info_by_code
 
     small_page_map = {}
     for path, payload in (small_pages or {}).items():
@@ -107,67 +81,57 @@ def make_categories(free_dir: str, osusume_dir: str, menudb, ini_bundle, small_p
                 "payload": payload,
             }
 
-    smenu_offset_index = {
-        sm.get("offset"): idx for idx, sm in enumerate(smenus)}
-
     # 多言語対応画像ディレクトリ一覧を取得
-    multi_lang_dirs = _check_is_multi_lang(free_dir)
+    multi_lang_dirs = _check_is_multi_lang(inventory)
 
     tree = []
     for lmenu in lmenus:
         if not lmenu:
             continue
-        if lmenu.get("property", 0) == 0:
+        if lmenu.property == 0:
             continue
-        l_index = lmenu.get("index") or 0
+        l_index = lmenu.index
         l_id = f"L{l_index:02d}"
-        l_label = _filename_label(lmenu.get("scrBtnImg", ""), l_id)
+        l_label = _filename_label(lmenu.scrBtnImg, l_id)
 
         # 大分類関連画像を取得する
         l_scr_btn_img = _get_image_path(
-            free_dir, osusume_dir, lmenu.get("scrBtnImg", ""), multi_lang_dirs)
+            inventory, lmenu.scrBtnImg, multi_lang_dirs)
         l_frm_back_img = _get_image_path(
-            free_dir, osusume_dir, lmenu.get("lmFrmBackImg", ""), multi_lang_dirs)
+            inventory, lmenu.lmFrmBackImg, multi_lang_dirs)
         l_frm_off_btn_img = _get_image_path(
-            free_dir, osusume_dir, lmenu.get("frmOffBtnImg", ""), multi_lang_dirs)
+            inventory, lmenu.frmOffBtnImg, multi_lang_dirs)
         l_frm_on_btn_img = _get_image_path(
-            free_dir, osusume_dir, lmenu.get("frmOnBtnImg", ""), multi_lang_dirs)
+            inventory, lmenu.frmOnBtnImg, multi_lang_dirs)
         l_m_frm_back_img = _get_image_path(
-            free_dir, osusume_dir, lmenu.get("mmFrmBackImg", ""), multi_lang_dirs)
+            inventory, lmenu.mmFrmBackImg, multi_lang_dirs)
         children = []
-        for mmenu in mmenus:
-            if mmenu.get("l_index") != l_index:
-                continue
-            if mmenu.get("property", 0) == 0:
+        for mmenu in refs.mmenus_by_l.get(l_index, []):
+            if mmenu.property == 0:
                 continue
 
-            m_index = mmenu.get("index") or 0
+            m_index = mmenu.index
             m_id = f"M{l_index:02d}{m_index:02d}"
-            m_label = _filename_label(mmenu.get("btnOnImg", ""), m_id)
+            m_label = _filename_label(mmenu.btnOnImg, m_id)
 
             # 中分類関連画像を取得する
             m_btn_on_img = _get_image_path(
-                free_dir, osusume_dir, mmenu.get("btnOnImg", ""), multi_lang_dirs)
+                inventory, mmenu.btnOnImg, multi_lang_dirs)
             m_btn_off_img = _get_image_path(
-                free_dir, osusume_dir, mmenu.get("btnOffImg", ""), multi_lang_dirs)
+                inventory, mmenu.btnOffImg, multi_lang_dirs)
 
-            sm_addr = mmenu.get("sMenuAddr")
-            start_idx = smenu_offset_index.get(sm_addr)
-            if start_idx is None:
+            rng = refs.smenu_range(l_index, m_index)
+            if rng is None:
                 continue
-            sm_count = max(1, mmenu.get("sMenuNum", 0))
+            sm_count = rng[1]
 
             pages = []
-            for seq in range(sm_count):
-                sm_idx = start_idx + seq
-                if sm_idx >= len(smenus):
-                    break
-                sm = smenus[sm_idx]
+            for seq, sm in enumerate(refs.smenus_in(l_index, m_index)):
                 if not sm:
                     continue
-                if sm.get("showType", 0) != 6 and sm.get("itemNum", 0) == 0:
+                if sm.showType != 6 and sm.itemNum == 0:
                     continue
-                sid = small_id(l_index, m_index, sm.get("index", 0))
+                sid = small_id(l_index, m_index, sm.index)
                 info = small_page_map.get(sid)
                 if not info:
                     continue
@@ -179,7 +143,8 @@ def make_categories(free_dir: str, osusume_dir: str, menudb, ini_bundle, small_p
                     "layout_type", page_meta.get("layout_type", "free"))
                 label = sid
                 for gi in grid_items:
-                    name = products_by_code.get(gi.get("product_code"), "")
+                    product = info_by_code.get(gi.get("product_code"))
+                    name = product.name if product is not None else ""
                     if name:
                         label = name
                         break
@@ -190,7 +155,7 @@ def make_categories(free_dir: str, osusume_dir: str, menudb, ini_bundle, small_p
                     "page_path": info["path"],
                     "background": payload.get("background", ""),
                     "layout_type": layout_type,
-                    "show_type": page_meta.get("show_type", sm.get("showType", 0)),
+                    "show_type": page_meta.get("show_type", sm.showType),
                     "sequence": page_meta.get("sequence", seq + 1),
                     "total_in_group": page_meta.get("total_in_group", sm_count),
                     "meta": page_meta,
@@ -202,7 +167,7 @@ def make_categories(free_dir: str, osusume_dir: str, menudb, ini_bundle, small_p
                     "id": m_id,
                     "label": m_label,
                     "index": m_index,
-                    "property": mmenu.get("property", 0),
+                    "property": mmenu.property,
                     "btn_on_img": m_btn_on_img,
                     "btn_off_img": m_btn_off_img,
                     "pages": pages,
@@ -213,8 +178,8 @@ def make_categories(free_dir: str, osusume_dir: str, menudb, ini_bundle, small_p
                 "id": l_id,
                 "label": l_label,
                 "index": l_index,
-                "property": lmenu.get("property", 0),
-                "free_flag": lmenu.get("freeFlg", 0),
+                "property": lmenu.property,
+                "free_flag": lmenu.freeFlg,
                 "scr_btn_img": l_scr_btn_img,
                 "frm_back_img": l_frm_back_img,
                 "frm_off_btn_img": l_frm_off_btn_img,
@@ -1,38 +1,32 @@
-import re
 from .to_web_categories import _get_image_path, _check_is_multi_lang
 
 
-def make_jump_btns_json(free_dir: str, osusume_dir: str, ini_bundle):
+def make_jump_btns_json(inventory, ini_bundle):
     jumpmenu = (
         ini_bundle
         .get("jumpmenu.ini", {})
-        .get("sections", {})
+        .get("families", {})
         .get("jumpmenu", {})
+        .get("JmpMenu", {})
     )
 
     buttons = {}
 
-    for key, value in jumpmenu.items():
-        if key.startswith("JmpMenu") and key.endswith("No"):
-            idx = int(key.replace("JmpMenu", "").replace("No", ""))
-            menu_no = [int(x) for x in value.split(",")]
-
-            if idx not in buttons:
-                buttons[idx] = {"id": idx}
-
-            buttons[idx]["menuNo"] = menu_no
-
-        elif key.startswith("JmpMenu") and key.endswith("BtnImg"):
-            idx = int(key.replace("JmpMenu", "").replace("BtnImg", ""))
-
-            if idx not in buttons:
-                buttons[idx] = {"id": idx}
-
-            # 多言語対応画像ディレクトリ一覧を取得
-            multi_lang_dirs = _check_is_multi_lang(free_dir)
-            jump_btn = _get_image_path(
-                free_dir, osusume_dir, value, multi_lang_dirs=multi_lang_dirs)
-            buttons[idx]["image"] = jump_btn
+    # 多言語対応画像ディレクトリ一覧を取得
+    multi_lang_dirs = _check_is_multi_lang(inventory)
+
+    # ボタン番号は数値として扱う（JmpMenu01No と JmpMenu1No は同じボタン）
+    for index, fields in jumpmenu.items():
+        idx = int(index)
+        btn = buttons.get(idx, {"id": idx})
+        for field, value in fields.items():
+            if field == "No":
+                btn["menuNo"] = [int(x) for x in value.split(",")]
+            elif field == "BtnImg":
+                btn["image"] = _get_image_path(
+                    inventory, value, multi_lang_dirs=multi_lang_dirs)
+        if len(btn) > 1:
+            buttons[idx] = btn
 
     return {
         "jumpmenu": {
@@ -41,7 +35,7 @@ def make_jump_btns_json(free_dir: str, osusume_dir: str, ini_bundle):
     }
 
 
-def make_checkin_btns_json(free_dir: str, osusume_dir: str, ini_bundle):
+def make_checkin_btns_json(inventory, ini_bundle):
     checkin_hansoku = (
         ini_bundle
         .get("menu.ini", {})
@@ -55,54 +49,51 @@ def make_checkin_btns_json(free_dir: str, osusume_dir: str, ini_bundle):
         "screens": {}
     }
 
-    bg_pattern = re.compile(r"Scr(\d+)BackImgName")
-    btn_pattern = re.compile(r"Scr(\d+)Btn(\d+)(Image|Type|Pos)")
-
     # 多言語対応画像ディレクトリ一覧を取得
-    multi_lang_dirs = _check_is_multi_lang(free_dir)
+    multi_lang_dirs = _check_is_multi_lang(inventory)
 
     screens = {}
+    scr_families = (
+        ini_bundle
+        .get("menu.ini", {})
+        .get("families", {})
+        .get("checkin_hansoku", {})
+        .get("Scr", {})
+    )
 
-    for key, value in checkin_hansoku.items():
-
-        bg_match = bg_pattern.match(key)
-        if bg_match:
-            screen_no = bg_match.group(1)
-            screens.setdefault(screen_no, {})
-            screens[screen_no]["background"] = _get_image_path(
-                free_dir, osusume_dir, value, multi_lang_dirs=multi_lang_dirs)
-            screens[screen_no].setdefault("buttons", [])
-            continue
-
-        btn_match = btn_pattern.match(key)
-        if not btn_match:
-            continue
-
-        screen_no, btn_no, field = btn_match.groups()
-        btn_no = int(btn_no)
-
-        screens.setdefault(screen_no, {})
-        screens[screen_no].setdefault("buttons", [])
-
-        buttons = screens[screen_no]["buttons"]
-        btn = next((b for b in buttons if b["id"] == btn_no), None)
-        if btn is None:
-            btn = {"id": btn_no}
-            buttons.append(btn)
-
-        if field == "Image":
-            btn["image"] = _get_image_path(
-                free_dir, osusume_dir, value, multi_lang_dirs=multi_lang_dirs)
-
-        elif field == "Type":
-            btn["type"] = [int(x) for x in value.split(",")]
-
-        elif field == "Pos":
-            x, y = value.split(",")
-            btn["pos"] = {
-                "x": int(x),
-                "y": int(y)
-            }
+    for screen_no, fields in scr_families.items():
+        screen = {}
+        if "BackImgName" in fields:
+            screen["background"] = _get_image_path(
+                inventory, fields["BackImgName"], multi_lang_dirs=multi_lang_dirs)
+            screen["buttons"] = []
+
+        # 画面番号は書かれた文字列のまま、ボタン番号は数値として扱う
+        buttons = {}
+        for btn_index, btn_fields in fields.get("Btn", {}).items():
+            btn_no = int(btn_index)
+            btn = buttons.get(btn_no, {"id": btn_no})
+            for field, value in btn_fields.items():
+                if field == "Image":
+                    btn["image"] = _get_image_path(
+                        inventory, value, multi_lang_dirs=multi_lang_dirs)
+
+                elif field == "Type":
+                    btn["type"] = [int(x) for x in value.split(",")]
+
+                elif field == "Pos":
+                    x, y = value.split(",")
+                    btn["pos"] = {
+                        "x": int(x),
+                        "y": int(y)
+                    }
+            if len(btn) > 1:
+                buttons[btn_no] = btn
+        if buttons:
+            screen["buttons"] = list(buttons.values())
+
+        if screen:
+            screens[screen_no] = screen
 
     result["screens"] = screens
 
@@ -1,5 +1,5 @@
-from ..core.ids import page_relpath, small_id
-from ..parsers import menudb_reader as mreader
+from ..core.ids import cells_relpath, is_cells_relpath, page_relpath, small_id
+from ..models.item_info import ItemInfo
 from typing import List, Dict, Tuple
 
 ABS_COLS = 40
@@ -61,7 +61,7 @@ def _is_visible_flag(value) -> bool:
     return True
 
 
-def _build_fixed_layout(entry: Dict, info_by_code: Dict[str, Dict]) -> Tuple[List[Dict], Dict]:
+def _build_fixed_layout(entry: Dict, info_by_code: Dict[str, ItemInfo]) -> Tuple[List[Dict], Dict]:
     layout_id = entry.get("layout")
     if layout_id not in _FIXED_LAYOUT_PRESETS:
         return [], {}
@@ -102,8 +102,8 @@ def _build_fixed_layout(entry: Dict, info_by_code: Dict[str, Dict]) -> Tuple[Lis
         if not _is_visible_flag(slot.get("show")):
             continue
         frame_idx = slot.get("frame_index")
-        product_info = info_by_code.get(code) or {}
-        product_detail = dict(product_info) if isinstance(product_info, dict) else {"code": code}
+        product_info = info_by_code.get(code)
+        product_detail = product_info if product_info is not None else {}
         osusume_meta = frames_meta.get(code, {})
 
         cell = pos["cell"][:]
@@ -132,36 +132,41 @@ def _build_fixed_layout(entry: Dict, info_by_code: Dict[str, Dict]) -> Tuple[Lis
     return items, cells_map
 
 
-def _build_iteminfo_map(menudb: Dict):
-    meta = menudb.get("meta", {})
-    base = meta.get("base")
-    stride = meta.get("stride", mreader.ITEM_INFORMATION_SIZE)
-    infos = menudb.get("item_infos", [])
-    if base is None:
-        return {}, 0, 0
-    mapping = {}
-    for info in infos:
-        idx = info.get("index", 0)
-        addr = base + stride * idx
-        mapping[addr] = info
-    return mapping, base, stride
-
-
-def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
-    item_cells = menudb.get("item_cells", [])
-    item_infos = menudb.get("item_infos", [])
-    mmenus = menudb.get("mmenus", [])
-    smenus = menudb.get("smenus", [])
+def page_summary(payload: Dict) -> Dict:
+    """カテゴリツリー（make_categories）が参照する項目だけを残したページ情報。"""
+    summary = {key: payload[key] for key in ("layout_type", "background", "page_meta") if key in payload}
+    summary["grid_items"] = [{"product_code": gi.get("product_code")}
+                             for gi in payload.get("grid_items", [])]
+    return summary
+
 
-    info_by_addr, info_base, stride = _build_iteminfo_map(menudb)
-    counts = menudb.get("meta", {}).get("counts", {})
-    info_by_code = {str(info.get("code")): info for info in item_infos}
+def make_small_pages(menudb, refs, osusume, ini_bundle, schema_version="0.1", manifest=None):
+    """小分類ページを生成する（iter_small_pages の結果をすべてメモリに保持する版）。
 
-    item_frame_size = mreader.ITEM_FRAME_INFORMATION_SIZE * counts.get("ItemFrmNum", 0)
-    item_cell_size = mreader.ITEM_CELL_INFORMATION_SIZE * counts.get("ItemCellNum", 0)
-    item_cell_base = info_base - item_frame_size - item_cell_size
+    戻り値: (ページの相対パス -> payload, cells.json の相対パス -> payload)
+    """
+    pages = {}
+    cell_files = {}
+    for rel_path, payload in iter_small_pages(menudb, refs, osusume, ini_bundle,
+                                              schema_version=schema_version, manifest=manifest):
+        if is_cells_relpath(rel_path):
+            cell_files[rel_path] = payload
+        else:
+            pages[rel_path] = payload
+    return pages, cell_files
+
+
+def iter_small_pages(menudb, refs, osusume, ini_bundle, schema_version="0.1", manifest=None):
+    """小分類ページを 1 ページずつ生成し、(相対パス, payload) を返す。
+
+    セル座標のあるページは、ページの直前に cells.json（is_cells_relpath で判定）を返す。
+    manifest（OsusumeManifest）を渡すと、変更の無いおすすめバリアントから
+    前回生成したページ（page-1.json / cells.json）をそのまま再利用する。
+    """
+    mmenus = menudb.get("mmenus", [])
+    info_by_code = refs.item_info_by_code
+    info_by_addr = refs.item_info_by_addr
 
-    smenu_offset_index = {sm.get("offset"): idx for idx, sm in enumerate(smenus)}
     osusume_entries = []
     if isinstance(osusume, dict):
         osusume_entries = osusume.get("entries", []) or []
@@ -170,33 +175,25 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
         for entry in osusume_entries
     }
 
-    pages = {}
-    cell_files = {}
-
     def attach_cells(sid: str, mapping: Dict, items: List):
         if not mapping:
             for item in items:
                 item["cells_path"] = ""
-            return
-        rel = f"small/{sid}/cells.json"
-        cell_files[rel] = {"cells": mapping}
+            return None
+        rel = cells_relpath(sid)
         for item in items:
             item["cells_path"] = rel
+        return {"cells": mapping}
 
     for mm in mmenus:
-        sm_addr = mm.get("sMenuAddr")
-        start_idx = smenu_offset_index.get(sm_addr)
-        if start_idx is None:
+        rng = refs.smenu_range(mm.l_index, mm.index)
+        if rng is None:
             continue
-        sm_count = max(1, mm.get("sMenuNum", 0))
+        sm_count = rng[1]
 
-        for seq in range(sm_count):
-            sm_idx = start_idx + seq
-            if sm_idx >= len(smenus):
-                break
-            sm = smenus[sm_idx]
-            show_type = sm.get("showType", 0)
-            sid = small_id(mm.get("l_index", 0), mm.get("index", 0), sm.get("index", 0))
+        for seq, sm in enumerate(refs.smenus_in(mm.l_index, mm.index)):
+            show_type = sm.showType
+            sid = small_id(mm.l_index, mm.index, sm.index)
 
             grid_items = []
             cells_map = {}
@@ -206,12 +203,20 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
             layout_flag_value = None
 
             if show_type == 6:
-                entry = osusume_map.get((mm.get("l_index", 0), mm.get("index", 0), seq + 1))
+                entry = osusume_map.get((mm.l_index, mm.index, seq + 1))
                 if entry is None:
-                    entry = osusume_map.get((mm.get("l_index", 0), mm.get("index", 0), 1))
+                    entry = osusume_map.get((mm.l_index, mm.index, 1))
                 if not entry:
                     continue
 
+                reused = manifest.reused_page(entry, sid) if manifest is not None else None
+                if reused is not None:
+                    page_payload, cells_payload = reused
+                    if cells_payload is not None:
+                        yield cells_relpath(sid), cells_payload
+                    yield page_relpath(sid, 1), page_payload
+                    continue
+
                 frames_meta = entry.get("frames") or {}
                 frame_slots = entry.get("frame_slots") or []
                 entry_cells = entry.get("cells") or {}
@@ -256,7 +261,7 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
                             for lang, imgs in multi_lang_images.items()
                         }
                         product_info = info_by_code.get(code)
-                        product_detail = dict(product_info) if isinstance(product_info, dict) else {"code": code}
+                        product_detail = product_info if product_info is not None else {"code": code}
                         osusume_meta = frames_meta.get(code, {})
                         grid_items.append({
                             "product_code": code,
@@ -290,7 +295,7 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
                             for lang, imgs in multi_lang_images.items()
                         }
                         product_info = info_by_code.get(code)
-                        product_detail = dict(product_info) if isinstance(product_info, dict) else {"code": code}
+                        product_detail = product_info if product_info is not None else {"code": code}
                         osusume_meta = frames_meta.get(code, {})
                         grid_items.append({
                             "product_code": code,
@@ -311,47 +316,36 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
                     if layout_mode_value not in _FIXED_LAYOUT_PRESETS:
                         cells_map.update(fixed_cells)
             else:
-                item_addr = sm.get("itemAddr", 0)
-                item_count = sm.get("itemNum", 0)
+                item_addr = sm.itemAddr
+                item_count = sm.itemNum
                 if not item_addr or not item_count:
                     continue
-                if item_addr < item_cell_base:
-                    continue
 
-                start = (item_addr - item_cell_base) // mreader.ITEM_CELL_INFORMATION_SIZE
-                end = start + item_count
-                slice_cells = item_cells[start:end] if 0 <= start < len(item_cells) else []
+                slice_cells = refs.item_cells_at(item_addr, item_count)
                 if not slice_cells:
                     continue
 
                 aggregates = {}
                 for cell in slice_cells:
-                    addr = cell.get("itemInfoAddr", 0)
+                    addr = cell.itemInfoAddr
                     if not addr:
                         continue
                     info = info_by_addr.get(addr)
-                    if not info and info_base and stride:
-                        rel = addr - info_base
-                        if rel >= 0 and rel % stride == 0:
-                            idx = rel // stride
-                            if 0 <= idx < len(item_infos):
-                                info = item_infos[idx]
-                                info_by_addr[addr] = info
                     if not info:
                         continue
-                    code = str(info.get("code"))
+                    code = str(info.code)
+                    x = cell.cellX
+                    y = cell.cellY
                     agg = aggregates.setdefault(code, {
                         "product_code": code,
-                        "minX": cell.get("cellX", 0),
-                        "maxX": cell.get("cellX", 0),
-                        "minY": cell.get("cellY", 0),
-                        "maxY": cell.get("cellY", 0),
-                        "process": cell.get("process", 0),
+                        "minX": x,
+                        "maxX": x,
+                        "minY": y,
+                        "maxY": y,
+                        "process": cell.process,
                         "info": info,
                         "cells": set(),
                     })
-                    x = cell.get("cellX", 0)
-                    y = cell.get("cellY", 0)
                     agg["minX"] = min(agg["minX"], x)
                     agg["maxX"] = max(agg["maxX"], x)
                     agg["minY"] = min(agg["minY"], y)
@@ -363,9 +357,8 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
                     min_y = agg["minY"]
                     span_x = max(1, agg["maxX"] - min_x + 1)
                     span_y = max(1, agg["maxY"] - min_y + 1)
-                    info = agg.get("info") or {}
-                    product_detail = dict(info) if isinstance(info, dict) else {}
-                    img_name = product_detail.get("infoImg", "")
+                    product_detail = agg["info"]
+                    img_name = product_detail.infoImg
                     image_path = f"free_images/{img_name}" if img_name else ""
                     ordered_cells = sorted(agg.get("cells", []), key=lambda c: (c[1], c[0]))
                     cells_map[agg["product_code"]] = ordered_cells
@@ -385,9 +378,9 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
                 continue
 
             grid_items.sort(key=lambda gi: (gi["cell"][1], gi["cell"][0]))
-            attach_cells(sid, cells_map, grid_items)
+            cells_payload = attach_cells(sid, cells_map, grid_items)
 
-            back_img = sm.get("backImg", "")
+            back_img = sm.backImg
             if back_img:
                 back_img = f"free_images/{back_img}"
             if background_override:
@@ -399,19 +392,21 @@ def make_small_pages(menudb, osusume, ini_bundle, schema_version="0.1"):
                 "background": back_img,
                 "grid_items": grid_items,
                 "page_meta": {
-                    "small_index": sm.get("index", 0),
+                    "small_index": sm.index,
                     "sequence": seq + 1,
                     "total_in_group": sm_count,
                     "show_type": show_type,
                     "layout_type": layout_type,
                     "layout_mode": layout_mode_value,
                     "layout_show": layout_flag_value,
-                    "cm_flag": sm.get("cmFlg", 0),
-                    "item_num": sm.get("itemNum", 0),
-                    "back_color": sm.get("backColor", 0),
-                    "source_offset": sm.get("offset", 0),
+                    "cm_flag": sm.cmFlg,
+                    "item_num": sm.itemNum,
+                    "back_color": sm.backColor,
+                    "source_offset": sm.offset,
                 }
             }
-            pages[page_relpath(sid, 1)] = payload
-
-    return pages, cell_files
+            if show_type == 6 and manifest is not None:
+                manifest.record_page(entry, sid)
+            if cells_payload is not None:
+                yield cells_relpath(sid), cells_payload
+            yield page_relpath(sid, 1), payload
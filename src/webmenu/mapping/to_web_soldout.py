@@ -1,5 +1,15 @@
 
-import re
+def _numbered(ini_bundle, section, family):
+    """Name / Name<n> 形式の値を {"1": ..., "<n>": ...} にまとめる（番号なしは "1"、番号は書かれた文字列のまま）。"""
+    menu_ini = ini_bundle.get("menu.ini", {})
+    result = {}
+    if family in menu_ini.get("sections", {}).get(section, {}):
+        result["1"] = menu_ini["sections"][section][family]
+    numbered = menu_ini.get("families", {}).get(section, {}).get(family, {})
+    for index, node in numbered.items():
+        if "" in node:
+            result[index] = node[""]
+    return result
 
 
 def make_soldout_json(ini_bundle):
@@ -24,43 +34,10 @@ def make_soldout_json(ini_bundle):
         .get("hm", {})
     )
     
-    frm_btn_images = {}
-    cell_btn_images = {}
-    sort_soldout_state = {}
-    kt_soldout_state = {}
-    
-    frm_pattern = re.compile(r"^FrmBtnImgName(\d*)$")
-    cell_pattern = re.compile(r"^CellBtnImgName(\d*)$")
-    sort_pattern = re.compile(r"^SortSoldoutState(\d*)$")
-    kt_soldout_pattern = re.compile(r"^SoldOutState(\d*)$")
-    
-    for key, filename in soldout_settings.items():
-        frm_match = frm_pattern.match(key)
-        if frm_match:
-            index = frm_match.group(1)
-            index = index if index else "1"
-            frm_btn_images[index] = filename
-            continue
-        
-        cell_match = cell_pattern.match(key)
-        if cell_match:
-            index = cell_match.group(1)
-            index = index if index else "1"
-            cell_btn_images[index] = filename
-            continue
-    for key, state in osusume_settings.items():
-        sort_match = sort_pattern.match(key)
-        if sort_match:
-            index = sort_match.group(1)
-            index = index if index else "1"
-            sort_soldout_state[index] = state
-            
-    for key, state in kt_settings.items():
-        kt_soldout_match = kt_soldout_pattern.match(key)
-        if kt_soldout_match:
-            index = kt_soldout_match.group(1)
-            index = index if index else "1"
-            kt_soldout_state[index] = state
+    frm_btn_images = _numbered(ini_bundle, "soldout", "FrmBtnImgName")
+    cell_btn_images = _numbered(ini_bundle, "soldout", "CellBtnImgName")
+    sort_soldout_state = _numbered(ini_bundle, "osusume", "SortSoldoutState")
+    kt_soldout_state = _numbered(ini_bundle, "hm", "SoldOutState")
 
     return {
         "backImage": soldout_settings.get("BackImgName", ""),
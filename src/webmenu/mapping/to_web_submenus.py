@@ -0,0 +1,107 @@
+import logging
+from typing import Dict, List
+
+from ..core.ids import sub_id
+from ..models.item_info import SubMenuFlg
+
+
+def _build_sub_page(refs, sub_idx: int) -> Dict:
+    """SUB_SMENU 1ページ分の子商品とリンク先ページを解決する。"""
+    sm = refs.sub_smenus[sub_idx]
+    children = []
+    links = []
+    for cell in refs.sub_item_cells_at(sm.itemAddr, sm.itemNum):
+        # option が SUB_SMENU を指すセルはページ遷移ボタンとして扱う
+        link_idx = refs.sub_smenu_index_by_offset.get(cell.option)
+        if link_idx is not None and link_idx not in links:
+            links.append(link_idx)
+        info = refs.item_info_by_addr.get(cell.itemInfoAddr) if cell.itemInfoAddr else None
+        if info is None:
+            continue
+        children.append({
+            "product_code": str(info.code),
+            "cell": [cell.cellX, cell.cellY],
+            "process": cell.process,
+        })
+
+    back_img = sm.backImg
+    return {
+        "index": sm.index,
+        "show_type": sm.showType,
+        "background": f"free_images/{back_img}" if back_img else "",
+        "children": children,
+        "links": links,
+    }
+
+
+def make_submenu_graph(menudb, refs, schema_version="0.1"):
+    """親商品 → サブメニューページ → 子商品 の解決済みグラフを返す。
+
+    pages は SUB_SMENU ごとに一度だけ解決し、items からは ID で参照する。
+    """
+    sub_codes_by_main: Dict[str, List[Dict]] = {}
+    for sc in menudb.get("sub_code_infos", []):
+        sub_codes_by_main.setdefault(str(sc.mCode), []).append({
+            "code": str(sc.sCode),
+            "lay_code": sc.layCode,
+            "cmd_no": sc.cmdNo,
+        })
+
+    resolved: Dict[int, Dict] = {}
+
+    def resolve(sub_idx: int) -> Dict:
+        page = resolved.get(sub_idx)
+        if page is None:
+            page = resolved[sub_idx] = _build_sub_page(refs, sub_idx)
+        return page
+
+    items = {}
+    for info in menudb.get("item_infos", []):
+        entry = {}
+        start_idx = None
+        if info.subMenuFlg != SubMenuFlg.NONE:
+            start_idx = refs.sub_smenu_index_by_offset.get(info.subMenuAddr)
+        if start_idx is not None:
+            # 先頭ページから option のリンクをたどり、到達順にページを並べる
+            order = [start_idx]
+            for sub_idx in order:
+                for link_idx in resolve(sub_idx)["links"]:
+                    if link_idx not in order:
+                        order.append(link_idx)
+            entry["sub_menu_flg"] = info.subMenuFlg
+            entry["sub_set_num"] = info.subSetNum
+            entry["pages"] = [sub_id(refs.sub_smenus[idx].index) for idx in order]
+
+        # setItemAddr は info と領域が重なるため、ITEM_INFO を指す場合のみ採用する
+        set_info = refs.item_info_by_addr.get(info.setItemAddr) if info.setItemAddr else None
+        if set_info is not None:
+            entry["set_item"] = str(set_info.code)
+
+        if not entry:
+            continue
+        code = str(info.code)
+        if code in items:
+            # 同じ商品コードが重複する場合は先に現れた商品を使う
+            logging.getLogger("webmenu_generator").warning(
+                "submenus: 商品コード %s が重複しているため index=%s を無視します", code, info.index)
+            continue
+        sub_codes = sub_codes_by_main.get(code)
+        if sub_codes:
+            entry["sub_codes"] = sub_codes
+        items[code] = entry
+
+    pages = {}
+    for sub_idx in sorted(resolved):
+        page = resolved[sub_idx]
+        pages[sub_id(page["index"])] = {
+            "show_type": page["show_type"],
+            "background": page["background"],
+            "children": page["children"],
+            "links": [sub_id(refs.sub_smenus[idx].index) for idx in page["links"]],
+        }
+
+    return {
+        "schema_version": schema_version,
+        "items": items,
+        "pages": pages,
+    }
@@ -1,5 +1,6 @@
 
 from enum import IntEnum
+from .record import Record
 class Process(IntEnum):
     SELECT_NO_TEXT = 0
     SELECT_WITH_TEXT = 1
@@ -8,3 +9,11 @@ class Process(IntEnum):
     SOLDOUT_MARK = 4
     VIDEO_INFO = 5
     # ... 他は実装時に拡張
+
+
+class ItemCell(Record):
+    """商品セル表示情報（ITEM_CELL_INFORMATION_SIZE = 52 byte）。"""
+    __slots__ = (
+        "index", "offset", "process", "cellX", "cellY", "text",
+        "fontSize", "textFrame", "option", "itemInfoAddr",
+    )
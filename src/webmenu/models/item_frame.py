@@ -1 +1,14 @@
-class ItemFrame: pass
+from .record import Record
+
+
+class ItemFrame(Record):
+    """商品フレーム表示情報（ITEM_FRAME_INFORMATION_SIZE = 204 byte）。"""
+    __slots__ = (
+        "index", "offset", "process", "cellX", "cellY",
+        "itemImg", "itemImgAddr",
+        "nameText", "nameFontSize", "nameTextColor",
+        "priceText", "priceFontSize", "priceTextColor",
+        "taxPriceText", "taxPriceFontSize", "taxPriceTextColor",
+        "infoText", "infoFontSize", "infoTextColor",
+        "itemInfoAddr",
+    )
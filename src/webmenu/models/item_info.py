@@ -1,5 +1,6 @@
 
 from enum import IntEnum
+from .record import Record
 class SubMenuFlg(IntEnum):
     NONE = 0
     HAS_SUB_PARENT_ORDER_NG = 1
@@ -8,3 +9,13 @@ class SubMenuFlg(IntEnum):
     FAMILY_STYLE = 4
     SUB_LINK = 5
     DUMMY_PARENT = 6
+
+
+class ItemInfo(Record):
+    """商品詳細情報（ITEM_INFORMATION_SIZE = 376 byte）。price は表示用の税込価格。"""
+    __slots__ = (
+        "index", "code", "freeFlg", "soldOutFlg", "minItemNum",
+        "noTaxPrice", "taxPrice", "price", "name",
+        "menuAtt", "subMenuFlg", "subSetNum", "subMenuAddr", "cmdNo", "setItemAddr",
+        "info", "infoImg", "infoImgAddr", "infoComment",
+    )
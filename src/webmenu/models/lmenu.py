@@ -1 +1,13 @@
-class LMenu: pass
+from .record import Record
+
+
+class LMenu(Record):
+    """大分類項目情報（LMENU_INFORMATION_SIZE = 104 byte）。"""
+    __slots__ = (
+        "index", "offset", "property", "freeFlg", "scrToFrmNo",
+        "scrBtnImg", "scrBtnImgAddr",
+        "lmFrmBackImg", "lmFrmBackImgAddr",
+        "frmOffBtnImg", "frmOffBtnImgAddr",
+        "frmOnBtnImg", "frmOnBtnImgAddr",
+        "mmFrmBackImg", "mmFrmBackImgAddr",
+    )
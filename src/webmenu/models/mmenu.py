@@ -1 +1,11 @@
-class MMenu: pass
+from .record import Record
+
+
+class MMenu(Record):
+    """中分類項目情報（MMENU_INFORMATION_SIZE = 52 byte）。"""
+    __slots__ = (
+        "l_index", "index", "offset", "property",
+        "btnOnImg", "btnOnImgAddr",
+        "btnOffImg", "btnOffImgAddr",
+        "sMenuNum", "sMenuAddr",
+    )
@@ -0,0 +1,43 @@
+"""menudb レコードの共通基底クラス。
+
+各テーブルのレコードは __slots__ で項目を宣言するだけでよく、
+__init__ / to_dict / 比較は宣言順（= raw_dump の JSON キー順）から自動生成する。
+JSON への変換は出力直前（json.dump の default=json_default）でのみ行う。
+"""
+from operator import attrgetter
+
+
+class Record:
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = cls.__slots__
+        # dataclasses と同様に、項目ごとの代入を並べた __init__ を生成する
+        body = "".join(f"\n    self.{name} = {name}" for name in fields) or "\n    pass"
+        namespace = {}
+        exec(f"def __init__(self, {', '.join(fields)}):{body}", namespace)
+        cls.__init__ = namespace["__init__"]
+        # 全項目の値をタプルで取り出す（レコードは必ず2項目以上）
+        cls._values = attrgetter(*fields)
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.__slots__, self._values(self)))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values(self) == other._values(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"{type(self).__name__}({args})"
+
+
+def json_default(obj):
+    """json.dump(default=...) 用。レコードを出力境界で dict に変換する。"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -1 +1,9 @@
-class SMenu: pass
+from .record import Record
+
+
+class SMenu(Record):
+    """小分類項目情報（SMENU_INFORMATION_SIZE = 36 byte）。"""
+    __slots__ = (
+        "index", "offset", "showType", "cmFlg", "itemNum", "backColor",
+        "backImg", "backImgAddr", "itemAddr",
+    )
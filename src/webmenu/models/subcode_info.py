@@ -1 +1,6 @@
-class SubcodeInfo: pass
+from .record import Record
+
+
+class SubcodeInfo(Record):
+    """階層コード、指示ナンバー情報（SUBCODE_INFO_SIZE = 16 byte）。"""
+    __slots__ = ("index", "offset", "mCode", "sCode", "layCode", "cmdNo")
@@ -0,0 +1,86 @@
+"""osusume / datas の CSV 共通リーダー。
+
+ファイルは一度だけバイト列で読み込み、そのバッファで文字コードを判定してから
+デコード済みの文字列を直接 csv.reader で解析する。
+区切り文字は csv.Sniffer の代わりに先頭の数行の簡易チェックで決める
+（Sniffer と違い、判定できずに例外になることはない）。
+"""
+import csv
+import io
+from collections import Counter
+from typing import Iterator, List, Sequence, Tuple
+
+DEFAULT_ENCODINGS = ("utf-8-sig", "utf-8", "cp932")
+
+
+def decode_bytes(data: bytes, encodings: Sequence[str] = DEFAULT_ENCODINGS) -> Tuple[str, str]:
+    """候補の文字コードで順にデコードし、(文字列, 文字コード) を返す。"""
+    error = None
+    for enc in encodings:
+        try:
+            return data.decode(enc), enc
+        except UnicodeDecodeError as e:
+            error = e
+    if len(encodings) == 1:
+        raise error
+    raise UnicodeDecodeError("unknown", b"", 0, 1, "Cannot detect encoding")
+
+
+SAMPLE_CHARS = 4096
+SAMPLE_LINES = 10
+
+
+def _sample_lines(text: str, delimiters: str) -> List[str]:
+    """先頭の区切り文字候補を含む行（# で始まるコメント行は除く）。"""
+    lines = []
+    for line in io.StringIO(text[:SAMPLE_CHARS], newline=None):
+        if line.startswith("#") or not any(d in line for d in delimiters):
+            continue
+        lines.append(line)
+        if len(lines) >= SAMPLE_LINES:
+            break
+    return lines
+
+
+def _consistency(lines: List[str], delimiter: str) -> Tuple[int, int]:
+    """(最も多い区切り数で区切られる行数, その区切り数)。各行で区切り数が揃うほど大きい。"""
+    counts = Counter(line.count(delimiter) for line in lines)
+    counts.pop(0, None)
+    if not counts:
+        return 0, 0
+    count, lines_with_count = max(counts.items(), key=lambda item: (item[1], item[0]))
+    return lines_with_count, count
+
+
+def detect_dialect(text: str, delimiters: str = ",\t") -> dict:
+    """先頭の数行で区切り文字を決める。
+
+    各候補について、行ごとの区切り数がどれだけ揃っているかで比べる
+    （同点ならタブ。カンマを含む値があるタブ区切りのファイルを正しく読むため）。
+    候補を含む行が無ければ先頭の候補。
+    csv.Sniffer と同様、区切り文字の直後が常に空白なら skipinitialspace を有効にする。
+    """
+    lines = _sample_lines(text, delimiters)
+    if lines:
+        order = sorted(delimiters, key=lambda d: d != "\t")
+        delimiter = max(order, key=lambda d: _consistency(lines, d))
+    else:
+        delimiter = delimiters[0]
+    count = sum(line.count(delimiter) for line in lines)
+    spaced = sum(line.count(delimiter + " ") for line in lines)
+    return {
+        "delimiter": delimiter,
+        "skipinitialspace": count > 0 and count == spaced,
+    }
+
+
+def read_csv_rows(path: str, encodings: Sequence[str] = DEFAULT_ENCODINGS,
+                  delimiters: str = ",\t") -> Iterator[List[str]]:
+    """CSV ファイルを一度だけ読み込み、行（文字列のリスト）を順に返す。"""
+    with open(path, "rb") as f:
+        data = f.read()
+    text, _ = decode_bytes(data, encodings)
+    if not text:
+        return iter(())
+    # ファイルをテキストモードで開いた場合と同じく改行コードを \n に揃える
+    return csv.reader(io.StringIO(text, newline=None), **detect_dialect(text, delimiters))
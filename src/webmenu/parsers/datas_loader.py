@@ -1,9 +1,14 @@
 import os
-import csv
 from typing import List, Dict
 
+from ..core.parse_cache import cached
+from .csv_reader import read_csv_rows
 
-def read_datas(datas: str):
+# 解析結果の形が変わったら上げる（解析キャッシュのキーに含まれる）
+PARSER_VERSION = 2
+
+
+def read_datas(datas: str, cache=None):
 
     readers = {
         "iteminfoLang": (_read_item_info_language, {"iteminfolang.csv"}),
@@ -21,7 +26,7 @@ def read_datas(datas: str):
             lower = name.lower()
             for key, (reader, filenames) in readers.items():
                 if lower in filenames:
-                    read_result = reader(path)
+                    read_result = cached(cache, key, PARSER_VERSION, [path], reader, path, by_path=False)
                     # 有効なデータがある場合のみ結果に追加
                     if read_result:
                         if key not in result:
@@ -42,7 +47,8 @@ def read_datas(datas: str):
                 lower = fname.lower()
                 for key, (reader, filenames) in readers.items():
                     if lower in filenames:
-                        read_result = reader(fpath)
+                        read_result = cached(cache, key, PARSER_VERSION, [fpath], reader, fpath,
+                                             by_path=False)
                         # 有効なデータがある場合のみ結果に追加
                         if read_result:
                             if key not in result:
@@ -59,36 +65,27 @@ def _read_item_info_language(path: str) -> List[Dict]:
         return items
 
     try:
-        with open(path, "r", encoding="utf-8", errors="strict") as f:
-            sample = f.read(1024)
-            if not sample:
-                return items
-
-            f.seek(0)
-            dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
-            reader = csv.reader(f, dialect)
-
-            for row_idx, row in enumerate(reader):
-                if not row:
-                    continue
+        for row_idx, row in enumerate(read_csv_rows(path, encodings=("utf-8",))):
+            if not row:
+                continue
 
-                if row[0].startswith("#") or row[0] == "ItemCode":
-                    continue
+            if row[0].startswith("#") or row[0] == "ItemCode":
+                continue
 
-                if len(row) < 2:
-                    continue
+            if len(row) < 2:
+                continue
 
-                raw_name = row[1] if row[1] is not None else ""
+            raw_name = row[1] if row[1] is not None else ""
 
-                try:
-                    item_code = int(row[0])
-                except ValueError:
-                    continue
+            try:
+                item_code = int(row[0])
+            except ValueError:
+                continue
 
-                items.append({
-                    "item_code": item_code,
-                    "name": raw_name,
-                })
+            items.append({
+                "item_code": item_code,
+                "name": raw_name,
+            })
 
     except Exception as e:
         print(f"エラー:CSVファイルの読み取りに失敗 | パス：{path} | 例外：{str(e)}")
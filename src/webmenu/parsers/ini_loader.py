@@ -1,7 +1,52 @@
-import os, glob
+import os, glob, re
+import threading
+from collections.abc import Mapping
+
+from ..core.parse_cache import cached
+
+# 解析結果の形が変わったら上げる（解析キャッシュのキーに含まれる）
+PARSER_VERSION = 3
+
+_KEY_TOKEN_RE = re.compile(r"\d+|\D+")
+
+
+def index_numbered_keys(section: dict) -> dict:
+    """番号付きキーをファミリーごとにまとめた索引を作る。
+
+    キーを 名前/番号 の並びに分解し、番号の位置で入れ子にする。
+    末尾が番号で終わるキーの値は "" に入る。番号を含まないキーは対象外。
+    番号はキーに書かれた文字列のまま（Scr01 と Scr1 は別）。数値として扱うかはマッピング側で決める。
+      JmpMenu3No=...       -> {"JmpMenu": {"3": {"No": ...}}}
+      Scr1Btn2Image=...    -> {"Scr": {"1": {"Btn": {"2": {"Image": ...}}}}}
+      FrmBtnImgName02=...  -> {"FrmBtnImgName": {"02": {"": ...}}}
+    """
+    families = {}
+    for key, value in section.items():
+        tokens = _KEY_TOKEN_RE.findall(key)
+        if len(tokens) < 2 or tokens[0].isdigit():
+            continue
+        node = families
+        i = 0
+        while node is not None and i + 1 < len(tokens):
+            node = _child(_child(node, tokens[i]), tokens[i + 1])
+            i += 2
+        leaf = tokens[i] if i < len(tokens) else ""
+        # 同名の入れ子（Scr1Btn と Scr1Btn2Image など）とは衝突させない
+        if node is not None and not isinstance(node.get(leaf), dict):
+            node[leaf] = value
+    return families
+
+
+def _child(node, name):
+    if node is None:
+        return None
+    child = node.setdefault(name, {})
+    return child if isinstance(child, dict) else None
+
 
 def parse_ini_text(text:str):
     # NOTE: PoCではシンプルなINIローダ（重複キーは配列化）
+    # families: セクションごとの番号付きキーの索引（index_numbered_keys）
     data = {"sections":{}}
     cur = None
     for line in text.splitlines():
@@ -23,17 +68,57 @@ def parse_ini_text(text:str):
                     sect[k] = [sect[k], v]
             else:
                 sect[k]=v
+    data["families"] = {
+        name: index_numbered_keys(sect) for name, sect in data["sections"].items()
+    }
     return data
 
-def load_all_ini(config_dir:str):
-    bundle = {}
+def _load_ini_file(path:str, encoding:str):
+    with open(path, "r", encoding=encoding, errors="ignore") as f:
+        text = f.read()
+    return parse_ini_text(text)
+
+class LazyIniBundle(Mapping):
+    """ファイル名 → 解析結果 の読み取り専用マッピング。
+
+    ファイル名の一覧は生成時に確定し、各ファイルは最初に参照された時点で読み込む。
+    マッピング処理が使うのは menu.ini / jumpmenu.ini 程度なので、
+    raw dump を出力しないビルドでは残りの ini を読まずに済む。
+    """
+
+    def __init__(self, paths, encoding: str, cache=None):
+        self._paths = {os.path.basename(path): path for path in paths}
+        self._encoding = encoding
+        self._cache = cache
+        self._loaded = {}
+        # raw dump とマッピングのステージが並行して参照しても一度だけ読み込む
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name in self._loaded:
+            return self._loaded[name]
+        path = self._paths[name]
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = cached(
+                    self._cache, "ini", PARSER_VERSION, [path], _load_ini_file, path,
+                    self._encoding, extra=(self._encoding,), by_path=False)
+        return self._loaded[name]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, name):
+        return name in self._paths
+
+
+def load_all_ini(config_dir:str, cache=None):
     pattern = os.path.join(config_dir, "*.ini")
     
     language_ini_path = os.path.join(config_dir, "language.ini")
     encoding = "utf-8" if os.path.exists(language_ini_path) else "shift_jis"
     
-    for path in glob.glob(pattern):
-        with open(path, "r", encoding=encoding, errors="ignore") as f:
-            text = f.read()
-        bundle[os.path.basename(path)] = parse_ini_text(text)
-    return bundle
+    return LazyIniBundle(glob.glob(pattern), encoding, cache=cache)
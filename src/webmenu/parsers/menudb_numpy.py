@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""menudb.dat の NumPy 解析エンジン。
+
+各固定長ブロック（LMENU / MMENU / SMENU / ITEM_CELL / ITEM_FRAME / ITEM_INFO）を
+ビッグエンディアンの構造化 dtype として定義し、ブロックごとに np.frombuffer で
+一括デコードする（サブメニュー系ブロックも同様）。
+出力は menudb_reader._read_tables と完全に同一。
+"""
+from . import menudb_reader as mr
+from ..models.lmenu import LMenu
+from ..models.mmenu import MMenu
+from ..models.smenus import SMenu
+from ..models.item_cell import ItemCell
+from ..models.item_frame import ItemFrame
+from ..models.item_info import ItemInfo
+from ..models.subcode_info import SubcodeInfo
+
+try:
+    import numpy as np
+except ImportError:  # numpy は任意依存
+    np = None
+
+# フィールド種別: u8 / u32 / i32 / sjis(16byte) / u16(文字数) / name(文字数)
+# u16  : _u16_name 相当（00 00 で切ってからデコード）
+# name : ITEM_INFO 商品名相当（全体をデコードしてから NUL で切る）
+LMENU_FIELDS = [
+    ("property", "u8", 0),
+    ("freeFlg", "u8", 1),
+    ("scrToFrmNo", "u8", 2),
+    ("scrBtnImg", "sjis", 4),
+    ("scrBtnImgAddr", "u32", 20),
+    ("lmFrmBackImg", "sjis", 24),
+    ("lmFrmBackImgAddr", "u32", 40),
+    ("frmOffBtnImg", "sjis", 44),
+    ("frmOffBtnImgAddr", "u32", 60),
+    ("frmOnBtnImg", "sjis", 64),
+    ("frmOnBtnImgAddr", "u32", 80),
+    ("mmFrmBackImg", "sjis", 84),
+    ("mmFrmBackImgAddr", "u32", 100),
+]
+
+MMENU_FIELDS = [
+    ("property", "u8", 0),
+    ("btnOnImg", "sjis", 4),
+    ("btnOnImgAddr", "u32", 20),
+    ("btnOffImg", "sjis", 24),
+    ("btnOffImgAddr", "u32", 40),
+    ("sMenuNum", "u32", 44),
+    ("sMenuAddr", "u32", 48),
+]
+
+SMENU_FIELDS = [
+    ("showType", "u8", 0),
+    ("cmFlg", "u8", 1),
+    ("itemNum", "u32", 4),
+    ("backColor", "u32", 8),
+    ("backImg", "sjis", 12),
+    ("backImgAddr", "u32", 28),
+    ("itemAddr", "u32", 32),
+]
+
+ITEM_CELL_FIELDS = [
+    ("process", "u8", 0),
+    ("cellX", "u8", 1),
+    ("cellY", "u8", 2),
+    ("text", ("u16", 14), 4),
+    ("fontSize", "u8", 36),
+    ("textFrame", "u8", 37),
+    ("option", "u32", 44),
+    ("itemInfoAddr", "u32", 48),
+]
+
+ITEM_FRAME_FIELDS = [
+    ("process", "u8", 0),
+    ("cellX", "u8", 1),
+    ("cellY", "u8", 2),
+    ("itemImg", "sjis", 4),
+    ("itemImgAddr", "u32", 20),
+    ("nameText", ("u16", 32), 24),
+    ("nameFontSize", "u8", 88),
+    ("nameTextColor", "u8", 89),
+    ("priceText", ("u16", 8), 92),
+    ("priceFontSize", "u8", 100),
+    ("priceTextColor", "u8", 101),
+    ("taxPriceText", ("u16", 8), 104),
+    ("taxPriceFontSize", "u8", 112),
+    ("taxPriceTextColor", "u8", 113),
+    ("infoText", ("u16", 32), 116),
+    ("infoFontSize", "u8", 180),
+    ("infoTextColor", "u8", 181),
+    ("itemInfoAddr", "u32", 184),
+]
+
+ITEM_INFO_FIELDS = [
+    ("code", "i32", 0),
+    ("freeFlg", "u8", 4),
+    ("soldOutFlg", "u8", 5),
+    ("minItemNum", "u8", 6),
+    ("noTaxPrice", "i32", 8),
+    ("taxPrice", "i32", 12),
+    ("name", ("name", 32), 16),
+    ("menuAtt", "u8", 80),
+    ("subMenuFlg", "u8", 81),
+    ("subSetNum", "u8", 82),
+    ("subMenuAddr", "u32", 84),
+    ("cmdNo", "u32", 88),
+    ("setItemAddr", "u32", 92),
+    ("info", "u8", 93),
+    ("infoImg", "sjis", 96),
+    ("infoImgAddr", "u32", 112),
+    ("infoComment", ("u16", 128), 116),
+]
+
+SUBCODE_INFO_FIELDS = [
+    ("mCode", "u32", 0),
+    ("sCode", "u32", 4),
+    ("layCode", "u32", 8),
+    ("cmdNo", "u32", 12),
+]
+
+_SCALAR_FORMATS = {"u8": "u1", "u32": ">u4", "i32": ">i4", "sjis": "S16"}
+
+
+def _make_dtype(fields, itemsize):
+    """フィールド定義から（重なりを許す）構造化 dtype を作る。"""
+    formats = []
+    for _, kind, _ in fields:
+        if isinstance(kind, tuple):
+            formats.append((">u2", kind[1]))
+        else:
+            formats.append(_SCALAR_FORMATS[kind])
+    return np.dtype({
+        "names": [name for name, _, _ in fields],
+        "formats": formats,
+        "offsets": [off for _, _, off in fields],
+        "itemsize": itemsize,
+    })
+
+
+def _record_count(buf, base, count, size):
+    """Python 版と同じく、バッファに収まる件数までで打ち切る。"""
+    if base > len(buf):
+        return 0
+    return max(0, min(count, (len(buf) - base) // size))
+
+
+def _decode_sjis(values):
+    """Shift_JIS ファイル名列を一括デコード（同一ファイル名はメモ化）。"""
+    memo = {}
+    out = []
+    for raw in values:
+        text = memo.get(raw)
+        if text is None:
+            text = raw.split(b"\x00", 1)[0].decode("shift_jis", "ignore").strip()
+            memo[raw] = text
+        out.append(text)
+    return out
+
+
+def _decode_u16(units, legacy):
+    """UTF-16BE 固定長文字列列を一括デコードする。
+
+    サロゲートを含まない列は全行を1回の decode で処理し、
+    先頭の 00 00 位置で切り出す。含む場合は legacy で1行ずつ処理する。
+    """
+    n, chars = units.shape
+    if n == 0:
+        return []
+    raw = units.tobytes()
+    surrogate = (units >= 0xD800) & (units <= 0xDFFF)
+    if surrogate.any():
+        width = chars * 2
+        return [legacy(raw[i * width:(i + 1) * width]) for i in range(n)]
+
+    zero = units == 0
+    cuts = np.where(zero.any(axis=1), zero.argmax(axis=1), chars).tolist()
+    text = raw.decode("utf-16-be")
+    return [text[i * chars:i * chars + cut].strip() for i, cut in enumerate(cuts)]
+
+
+def _decode_columns(arr, fields):
+    columns = []
+    for name, kind, _ in fields:
+        col = arr[name]
+        if kind == "sjis":
+            values = _decode_sjis(col.tolist())
+        elif isinstance(kind, tuple):
+            mode, chars = kind
+            legacy = _legacy_name if mode == "name" else _legacy_u16(chars)
+            values = _decode_u16(col, legacy)
+        else:
+            values = col.tolist()
+        columns.append((name, values))
+    return columns
+
+
+def _legacy_u16(chars):
+    return lambda raw: mr._u16_name(raw, 0, chars)
+
+
+def _legacy_name(raw):
+    return raw.decode("utf-16-be", "ignore").split("\x00", 1)[0].strip()
+
+
+def _read_block(buf, base, count, size, fields):
+    n = _record_count(buf, base, count, size)
+    if n == 0:
+        return 0, []
+    arr = np.frombuffer(buf, dtype=_make_dtype(fields, size), count=n, offset=base)
+    return n, _decode_columns(arr, fields)
+
+
+def _to_records(cls, columns):
+    # 列の並びはレコードクラスの __slots__ と同順
+    return [cls(*row) for row in zip(*[values for _, values in columns])]
+
+
+def _indexed_records(cls, buf, base, count, size, fields):
+    """index（1始まり）と offset を先頭に持つテーブルを一括デコードする。"""
+    n, cols = _read_block(buf, base, count, size, fields)
+    return _to_records(cls, [
+        ("index", range(1, n + 1)),
+        ("offset", range(base, base + size * n, size)),
+    ] + cols)
+
+
+def read_tables(buf, L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum,
+                SubCodeInfoNum=0, SubSMenuNum=0, SubItemCellNum=0, SubItemFrmNum=0) -> dict:
+    if np is None:
+        raise ImportError("menudb engine 'numpy' を使うには numpy のインストールが必要です")
+
+    # ===== 大分類 (LMENU) =====
+    lmenu_base = mr.LMENU_INFORMATION
+    size = mr.LMENU_INFORMATION_SIZE
+    n, cols = _read_block(buf, lmenu_base, L, size, LMENU_FIELDS)
+    lmenus = _to_records(LMenu, [
+        ("index", range(1, n + 1)),
+        ("offset", range(lmenu_base, lmenu_base + size * n, size)),
+    ] + cols)
+
+    # ===== 中分類 (MMENU) =====
+    mmenu_base = lmenu_base + size * L
+    size = mr.MMENU_INFORMATION_SIZE
+    n, cols = _read_block(buf, mmenu_base, L * M, size, MMENU_FIELDS)
+    positions = [divmod(idx, M) for idx in range(n)]
+    mmenus = _to_records(MMenu, [
+        ("l_index", [li + 1 for li, _ in positions]),
+        ("index", [mi + 1 for _, mi in positions]),
+        ("offset", range(mmenu_base, mmenu_base + size * n, size)),
+    ] + cols)
+
+    # ===== 小分類 (SMENU) =====
+    smenu_base = mmenu_base + size * L * M
+    size = mr.SMENU_INFORMATION_SIZE
+    smenus = _indexed_records(SMenu, buf, smenu_base, SMenuNum, size, SMENU_FIELDS)
+
+    # ===== 商品セル (ITEM_CELL) =====
+    item_cell_base = smenu_base + size * SMenuNum
+    size = mr.ITEM_CELL_INFORMATION_SIZE
+    item_cells = _indexed_records(ItemCell, buf, item_cell_base, ItemCellNum, size, ITEM_CELL_FIELDS)
+
+    # ===== 商品フレーム (ITEM_FRAME) =====
+    item_frame_base = item_cell_base + size * ItemCellNum
+    size = mr.ITEM_FRAME_INFORMATION_SIZE
+    item_frames = _indexed_records(ItemFrame, buf, item_frame_base, ItemFrmNum, size, ITEM_FRAME_FIELDS)
+
+    # ===== 商品詳細 (ITEM_INFO) =====
+    base = mr._item_info_base(L, M, SMenuNum, ItemCellNum, ItemFrmNum)
+    n, cols = _read_block(buf, base, ItemInfoNum, mr.ITEM_INFORMATION_SIZE, ITEM_INFO_FIELDS)
+    # price は表示用で taxPrice と同値（Java の mPrice = mTaxPrice）
+    ordered = [("index", range(n))]
+    for name, values in cols:
+        ordered.append((name, values))
+        if name == "taxPrice":
+            ordered.append(("price", values))
+    item_infos = _to_records(ItemInfo, ordered)
+
+    # ===== サブメニュー系 (SUB_CODE_INFO / SUB_SMENU / SUB_ITEM_CELL / SUB_ITEM_FRM) =====
+    sub_code_base = base + mr.ITEM_INFORMATION_SIZE * ItemInfoNum
+    sub_smenu_base = sub_code_base + mr.SUBCODE_INFO_SIZE * SubCodeInfoNum
+    sub_item_cell_base = sub_smenu_base + mr.SMENU_INFORMATION_SIZE * SubSMenuNum
+    sub_item_frame_base = sub_item_cell_base + mr.ITEM_CELL_INFORMATION_SIZE * SubItemCellNum
+
+    return {
+        "lmenus": lmenus,
+        "mmenus": mmenus,
+        "smenus": smenus,
+        "item_cells": item_cells,
+        "item_frames": item_frames,
+        "item_infos": item_infos,
+        "sub_code_infos": _indexed_records(
+            SubcodeInfo, buf, sub_code_base, SubCodeInfoNum, mr.SUBCODE_INFO_SIZE, SUBCODE_INFO_FIELDS),
+        "sub_smenus": _indexed_records(
+            SMenu, buf, sub_smenu_base, SubSMenuNum, mr.SMENU_INFORMATION_SIZE, SMENU_FIELDS),
+        "sub_item_cells": _indexed_records(
+            ItemCell, buf, sub_item_cell_base, SubItemCellNum, mr.ITEM_CELL_INFORMATION_SIZE, ITEM_CELL_FIELDS),
+        "sub_item_frames": _indexed_records(
+            ItemFrame, buf, sub_item_frame_base, SubItemFrmNum, mr.ITEM_FRAME_INFORMATION_SIZE, ITEM_FRAME_FIELDS),
+    }
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 import os, struct
 
+from ..models.lmenu import LMenu
+from ..models.mmenu import MMenu
+from ..models.smenus import SMenu
+from ..models.item_cell import ItemCell
+from ..models.item_frame import ItemFrame
+from ..models.item_info import ItemInfo
+from ..models.subcode_info import SubcodeInfo
+
 # ===== Javaの定数をそのまま移植 =====
 
 OFS_LONG = 4
@@ -54,6 +62,17 @@ ITEM_INFORMATION_SIZE       = (
     + (2 * 128)         # infoComment
 )
 # Java定義と一致する 376 バイト
+SUBCODE_INFO_SIZE = 4 + 4 + 4 + 4
+
+# サブメニュー系ブロック（Java 側は未解析）は ITEM_INFO の直後にヘッダの件数順で並ぶ:
+# SUB_CODE_INFO → SUB_SMENU（SMENU と同形式）→ SUB_ITEM_CELL（ITEM_CELL と同形式）
+# → SUB_ITEM_FRM（ITEM_FRAME と同形式）
+
+# read_menudb(engine=...) で選択できる解析エンジン
+MENUDB_ENGINES = ("python", "numpy")
+
+# 解析結果の形が変わったら上げる（解析キャッシュのキーに含まれる）
+PARSER_VERSION = 2
 
 
 def _be_u32(b, off):  # Big-endian uint32 → Python int
@@ -90,7 +109,43 @@ def _sjis_filename(b, off, size=16):
     except UnicodeDecodeError:
         return raw.decode('latin-1', 'ignore').strip()
 
-def read_menudb(path: str) -> dict:
+def _item_info_base(L, M, SMenuNum, ItemCellNum, ItemFrmNum):
+    """Javaの式そのままで ITEM_INFO 配列の先頭(base)を求める。"""
+    return (
+        LMENU_INFORMATION
+        + LMENU_INFORMATION_SIZE * L
+        + MMENU_INFORMATION_SIZE * L * M
+        + SMENU_INFORMATION_SIZE * SMenuNum
+        + ITEM_CELL_INFORMATION_SIZE * ItemCellNum
+        + ITEM_FRAME_INFORMATION_SIZE * ItemFrmNum
+    )
+
+
+SUB_COUNT_KEYS = ("SubCodeInfoNum", "SubSMenuNum", "SubItemCellNum", "SubItemFrmNum")
+
+
+def _read_sub_counts(buf):
+    """サブメニュー系ブロックの件数。ヘッダが短い旧データは 0 件扱い。"""
+    if len(buf) < HEADER_INFORMATION_SUB_ITEM_FRM_NUM + OFS_LONG:
+        return (0, 0, 0, 0)
+    return tuple(_be_u32(buf, off) for off in (
+        HEADER_INFORMATION_SUB_CODE_INFO_NUM,
+        HEADER_INFORMATION_SUB_SMENU_NUM,
+        HEADER_INFORMATION_SUB_ITEM_CELL_NUM,
+        HEADER_INFORMATION_SUB_ITEM_FRM_NUM,
+    ))
+
+
+def read_menudb(path: str, engine: str = "python") -> dict:
+    """menudb.dat を解析する。
+
+    engine="python" は1レコードずつ struct で読む従来実装、
+    engine="numpy" は固定長ブロックを構造化 dtype で一括デコードする実装
+    （出力は同一）。
+    """
+    if engine not in MENUDB_ENGINES:
+        raise ValueError(f"unknown menudb engine: {engine}")
+
     with open(path, "rb") as f:
         buf = f.read()
 
@@ -101,187 +156,17 @@ def read_menudb(path: str) -> dict:
     ItemCellNum = _be_u32(buf, HEADER_INFORMATION_ITEM_CELL_NUM)
     ItemFrmNum  = _be_u32(buf, HEADER_INFORMATION_ITEM_FRM_NUM)
     ItemInfoNum = _be_u32(buf, HEADER_INFORMATION_ITEM_INFO_NUM)
+    sub_counts = _read_sub_counts(buf)
+    base = _item_info_base(L, M, SMenuNum, ItemCellNum, ItemFrmNum)
 
-    buf_view = memoryview(buf)
-
-    # ===== 大分類 (LMENU) =====
-    lmenus = []
-    lmenu_base = LMENU_INFORMATION
-    for i in range(L):
-        off = lmenu_base + LMENU_INFORMATION_SIZE * i
-        if off + LMENU_INFORMATION_SIZE > len(buf):
-            break
-        lmenus.append({
-            "index": i + 1,
-            "offset": off,
-            "property": buf_view[off],
-            "freeFlg": buf_view[off + 1],
-            "scrToFrmNo": buf_view[off + 2],
-            "scrBtnImg": _sjis_filename(buf_view, off + 4),
-            "scrBtnImgAddr": _be_u32(buf_view, off + 20),
-            "lmFrmBackImg": _sjis_filename(buf_view, off + 24),
-            "lmFrmBackImgAddr": _be_u32(buf_view, off + 40),
-            "frmOffBtnImg": _sjis_filename(buf_view, off + 44),
-            "frmOffBtnImgAddr": _be_u32(buf_view, off + 60),
-            "frmOnBtnImg": _sjis_filename(buf_view, off + 64),
-            "frmOnBtnImgAddr": _be_u32(buf_view, off + 80),
-            "mmFrmBackImg": _sjis_filename(buf_view, off + 84),
-            "mmFrmBackImgAddr": _be_u32(buf_view, off + 100),
-        })
-
-    mmenu_base = lmenu_base + LMENU_INFORMATION_SIZE * L
-    mmenus = []
-    total_m = L * M
-    for idx in range(total_m):
-        off = mmenu_base + MMENU_INFORMATION_SIZE * idx
-        if off + MMENU_INFORMATION_SIZE > len(buf):
-            break
-        li, mi = divmod(idx, M)
-        mmenus.append({
-            "l_index": li + 1,
-            "index": mi + 1,
-            "offset": off,
-            "property": buf_view[off],
-            "btnOnImg": _sjis_filename(buf_view, off + 4),
-            "btnOnImgAddr": _be_u32(buf_view, off + 20),
-            "btnOffImg": _sjis_filename(buf_view, off + 24),
-            "btnOffImgAddr": _be_u32(buf_view, off + 40),
-            "sMenuNum": _be_u32(buf_view, off + 44),
-            "sMenuAddr": _be_u32(buf_view, off + 48),
-        })
-
-    smenu_base = mmenu_base + MMENU_INFORMATION_SIZE * L * M
-    smenus = []
-    for si in range(SMenuNum):
-        off = smenu_base + SMENU_INFORMATION_SIZE * si
-        if off + SMENU_INFORMATION_SIZE > len(buf):
-            break
-        smenus.append({
-            "index": si + 1,
-            "offset": off,
-            "showType": buf_view[off],
-            "cmFlg": buf_view[off + 1],
-            "itemNum": _be_u32(buf_view, off + 4),
-            "backColor": _be_u32(buf_view, off + 8),
-            "backImg": _sjis_filename(buf_view, off + 12),
-            "backImgAddr": _be_u32(buf_view, off + 28),
-            "itemAddr": _be_u32(buf_view, off + 32),
-        })
-
-    item_cell_base = smenu_base + SMENU_INFORMATION_SIZE * SMenuNum
-    item_cells = []
-    for ci in range(ItemCellNum):
-        off = item_cell_base + ITEM_CELL_INFORMATION_SIZE * ci
-        if off + ITEM_CELL_INFORMATION_SIZE > len(buf):
-            break
-        item_cells.append({
-            "index": ci + 1,
-            "offset": off,
-            "process": buf_view[off],
-            "cellX": buf_view[off + 1],
-            "cellY": buf_view[off + 2],
-            "text": _u16_name(buf, off + 4, 14),
-            "fontSize": buf_view[off + 36],
-            "textFrame": buf_view[off + 37],
-            "option": _be_u32(buf_view, off + 44),
-            "itemInfoAddr": _be_u32(buf_view, off + 48),
-        })
-
-    item_frame_base = item_cell_base + ITEM_CELL_INFORMATION_SIZE * ItemCellNum
-    item_frames = []
-    for fi in range(ItemFrmNum):
-        off = item_frame_base + ITEM_FRAME_INFORMATION_SIZE * fi
-        if off + ITEM_FRAME_INFORMATION_SIZE > len(buf):
-            break
-        item_frames.append({
-            "index": fi + 1,
-            "offset": off,
-            "process": buf_view[off],
-            "cellX": buf_view[off + 1],
-            "cellY": buf_view[off + 2],
-            "itemImg": _sjis_filename(buf_view, off + 4),
-            "itemImgAddr": _be_u32(buf_view, off + 20),
-            "nameText": _u16_name(buf, off + 24, 32),
-            "nameFontSize": buf_view[off + 88],
-            "nameTextColor": buf_view[off + 89],
-            "priceText": _u16_name(buf, off + 92, 8),
-            "priceFontSize": buf_view[off + 100],
-            "priceTextColor": buf_view[off + 101],
-            "taxPriceText": _u16_name(buf, off + 104, 8),
-            "taxPriceFontSize": buf_view[off + 112],
-            "taxPriceTextColor": buf_view[off + 113],
-            "infoText": _u16_name(buf, off + 116, 32),
-            "infoFontSize": buf_view[off + 180],
-            "infoTextColor": buf_view[off + 181],
-            "itemInfoAddr": _be_u32(buf_view, off + 184),
-        })
-
-    # ===== Javaの式そのままで ITEM_INFO 配列の先頭(base) =====
-    base = (
-        LMENU_INFORMATION
-        + LMENU_INFORMATION_SIZE * L
-        + MMENU_INFORMATION_SIZE * L * M
-        + SMENU_INFORMATION_SIZE * SMenuNum
-        + ITEM_CELL_INFORMATION_SIZE * ItemCellNum
-        + ITEM_FRAME_INFORMATION_SIZE * ItemFrmNum
-    )
-
-    item_infos = []
-    for i in range(ItemInfoNum):
-        off = base + ITEM_INFORMATION_SIZE * i
-        if off + ITEM_INFORMATION_SIZE > len(buf):
-            break
-
-        code = _be_i32(buf, off)
-        free_flg = buf_view[off + 4]
-        sold_out_flg = buf_view[off + 5]
-        min_item_num = buf_view[off + 6]
-        no_tax_price = _be_i32(buf, off + 8)
-        tax_price = _be_i32(buf, off + 12)
-        name = buf_view[off + 16: off + 16 + 64].tobytes().decode('utf-16-be', 'ignore').split('\x00', 1)[0].strip()
-
-        menu_att = buf_view[off + 80]
-        sub_menu_flg = buf_view[off + 81]
-        sub_set_num = buf_view[off + 82]
-        sub_menu_addr = _be_u32(buf_view, off + 84)
-        cmd_no = _be_u32(buf_view, off + 88)
-        set_item_addr = _be_u32(buf_view, off + 92)
-        info = buf_view[off + 93]
-        info_img_raw = buf_view[off + 96: off + 96 + 16].tobytes()
-        info_img = info_img_raw.split(b'\x00', 1)[0].decode('shift_jis', 'ignore').strip()
-        info_img_addr = _be_u32(buf_view, off + 112)
-        info_comment = _u16_name(buf, off + 116, 128)
-
-        item_infos.append({
-            "index": i,
-            "code": code,
-            "freeFlg": free_flg,
-            "soldOutFlg": sold_out_flg,
-            "minItemNum": min_item_num,
-            "noTaxPrice": no_tax_price,
-            "taxPrice": tax_price,
-            "price": tax_price,
-            "name": name,
-            "menuAtt": menu_att,
-            "subMenuFlg": sub_menu_flg,
-            "subSetNum": sub_set_num,
-            "subMenuAddr": sub_menu_addr,
-            "cmdNo": cmd_no,
-            "setItemAddr": set_item_addr,
-            "info": info,
-            "infoImg": info_img,
-            "infoImgAddr": info_img_addr,
-            "infoComment": info_comment,
-        })
-
+    if engine == "numpy":
+        from .menudb_numpy import read_tables
+        tables = read_tables(buf, L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum, *sub_counts)
+    else:
+        tables = _read_tables(buf, L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum, *sub_counts)
 
     return {
-        "lmenus": lmenus,
-        "mmenus": mmenus,
-        "smenus": smenus,
-        "item_cells": item_cells,
-        "item_frames": item_frames,
-        "item_infos": item_infos,
+        **tables,
         "meta": {
             "path": os.path.abspath(path),
             "counts": {
@@ -289,10 +174,190 @@ def read_menudb(path: str) -> dict:
                 "SMenuNum": SMenuNum,
                 "ItemCellNum": ItemCellNum,
                 "ItemFrmNum": ItemFrmNum,
-                "ItemInfoNum": ItemInfoNum
+                "ItemInfoNum": ItemInfoNum,
+                **dict(zip(SUB_COUNT_KEYS, sub_counts)),
             },
             "base": base,
             "stride": ITEM_INFORMATION_SIZE,
             "endian": "BE",
         }
     }
+
+
+# ===== 1レコード分のデコード（read_menudb / MenuDbView 共通） =====
+# 各テーブルのレコードは models/ の __slots__ クラスで返す。
+# buf は bytes または mmap（インデックスで int、スライスで bytes を返すもの）
+
+def _decode_lmenu(buf, i, off):
+    return LMenu(
+        index=i + 1,
+        offset=off,
+        property=buf[off],
+        freeFlg=buf[off + 1],
+        scrToFrmNo=buf[off + 2],
+        scrBtnImg=_sjis_filename(buf, off + 4),
+        scrBtnImgAddr=_be_u32(buf, off + 20),
+        lmFrmBackImg=_sjis_filename(buf, off + 24),
+        lmFrmBackImgAddr=_be_u32(buf, off + 40),
+        frmOffBtnImg=_sjis_filename(buf, off + 44),
+        frmOffBtnImgAddr=_be_u32(buf, off + 60),
+        frmOnBtnImg=_sjis_filename(buf, off + 64),
+        frmOnBtnImgAddr=_be_u32(buf, off + 80),
+        mmFrmBackImg=_sjis_filename(buf, off + 84),
+        mmFrmBackImgAddr=_be_u32(buf, off + 100),
+    )
+
+
+def _decode_mmenu(buf, idx, off, M):
+    li, mi = divmod(idx, M)
+    return MMenu(
+        l_index=li + 1,
+        index=mi + 1,
+        offset=off,
+        property=buf[off],
+        btnOnImg=_sjis_filename(buf, off + 4),
+        btnOnImgAddr=_be_u32(buf, off + 20),
+        btnOffImg=_sjis_filename(buf, off + 24),
+        btnOffImgAddr=_be_u32(buf, off + 40),
+        sMenuNum=_be_u32(buf, off + 44),
+        sMenuAddr=_be_u32(buf, off + 48),
+    )
+
+
+def _decode_smenu(buf, si, off):
+    return SMenu(
+        index=si + 1,
+        offset=off,
+        showType=buf[off],
+        cmFlg=buf[off + 1],
+        itemNum=_be_u32(buf, off + 4),
+        backColor=_be_u32(buf, off + 8),
+        backImg=_sjis_filename(buf, off + 12),
+        backImgAddr=_be_u32(buf, off + 28),
+        itemAddr=_be_u32(buf, off + 32),
+    )
+
+
+def _decode_item_cell(buf, ci, off):
+    return ItemCell(
+        index=ci + 1,
+        offset=off,
+        process=buf[off],
+        cellX=buf[off + 1],
+        cellY=buf[off + 2],
+        text=_u16_name(buf, off + 4, 14),
+        fontSize=buf[off + 36],
+        textFrame=buf[off + 37],
+        option=_be_u32(buf, off + 44),
+        itemInfoAddr=_be_u32(buf, off + 48),
+    )
+
+
+def _decode_item_frame(buf, fi, off):
+    return ItemFrame(
+        index=fi + 1,
+        offset=off,
+        process=buf[off],
+        cellX=buf[off + 1],
+        cellY=buf[off + 2],
+        itemImg=_sjis_filename(buf, off + 4),
+        itemImgAddr=_be_u32(buf, off + 20),
+        nameText=_u16_name(buf, off + 24, 32),
+        nameFontSize=buf[off + 88],
+        nameTextColor=buf[off + 89],
+        priceText=_u16_name(buf, off + 92, 8),
+        priceFontSize=buf[off + 100],
+        priceTextColor=buf[off + 101],
+        taxPriceText=_u16_name(buf, off + 104, 8),
+        taxPriceFontSize=buf[off + 112],
+        taxPriceTextColor=buf[off + 113],
+        infoText=_u16_name(buf, off + 116, 32),
+        infoFontSize=buf[off + 180],
+        infoTextColor=buf[off + 181],
+        itemInfoAddr=_be_u32(buf, off + 184),
+    )
+
+
+def _decode_item_info(buf, i, off):
+    tax_price = _be_i32(buf, off + 12)
+    name = bytes(buf[off + 16: off + 16 + 64]).decode('utf-16-be', 'ignore').split('\x00', 1)[0].strip()
+    info_img_raw = bytes(buf[off + 96: off + 96 + 16])
+    return ItemInfo(
+        index=i,
+        code=_be_i32(buf, off),
+        freeFlg=buf[off + 4],
+        soldOutFlg=buf[off + 5],
+        minItemNum=buf[off + 6],
+        noTaxPrice=_be_i32(buf, off + 8),
+        taxPrice=tax_price,
+        price=tax_price,
+        name=name,
+        menuAtt=buf[off + 80],
+        subMenuFlg=buf[off + 81],
+        subSetNum=buf[off + 82],
+        subMenuAddr=_be_u32(buf, off + 84),
+        cmdNo=_be_u32(buf, off + 88),
+        setItemAddr=_be_u32(buf, off + 92),
+        info=buf[off + 93],
+        infoImg=info_img_raw.split(b'\x00', 1)[0].decode('shift_jis', 'ignore').strip(),
+        infoImgAddr=_be_u32(buf, off + 112),
+        infoComment=_u16_name(buf, off + 116, 128),
+    )
+
+
+def _decode_subcode_info(buf, i, off):
+    return SubcodeInfo(
+        index=i + 1,
+        offset=off,
+        mCode=_be_u32(buf, off),
+        sCode=_be_u32(buf, off + 4),
+        layCode=_be_u32(buf, off + 8),
+        cmdNo=_be_u32(buf, off + 12),
+    )
+
+
+def _table_layout(L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum,
+                  SubCodeInfoNum=0, SubSMenuNum=0, SubItemCellNum=0, SubItemFrmNum=0):
+    """各テーブルの (名前, 先頭オフセット, 件数, 構造体サイズ, デコーダ) を返す。"""
+    lmenu_base = LMENU_INFORMATION
+    mmenu_base = lmenu_base + LMENU_INFORMATION_SIZE * L
+    smenu_base = mmenu_base + MMENU_INFORMATION_SIZE * L * M
+    item_cell_base = smenu_base + SMENU_INFORMATION_SIZE * SMenuNum
+    item_frame_base = item_cell_base + ITEM_CELL_INFORMATION_SIZE * ItemCellNum
+    item_info_base = _item_info_base(L, M, SMenuNum, ItemCellNum, ItemFrmNum)
+    sub_code_base = item_info_base + ITEM_INFORMATION_SIZE * ItemInfoNum
+    sub_smenu_base = sub_code_base + SUBCODE_INFO_SIZE * SubCodeInfoNum
+    sub_item_cell_base = sub_smenu_base + SMENU_INFORMATION_SIZE * SubSMenuNum
+    sub_item_frame_base = sub_item_cell_base + ITEM_CELL_INFORMATION_SIZE * SubItemCellNum
+
+    def decode_mmenu(buf, idx, off):
+        return _decode_mmenu(buf, idx, off, M)
+
+    return [
+        ("lmenus", lmenu_base, L, LMENU_INFORMATION_SIZE, _decode_lmenu),
+        ("mmenus", mmenu_base, L * M, MMENU_INFORMATION_SIZE, decode_mmenu),
+        ("smenus", smenu_base, SMenuNum, SMENU_INFORMATION_SIZE, _decode_smenu),
+        ("item_cells", item_cell_base, ItemCellNum, ITEM_CELL_INFORMATION_SIZE, _decode_item_cell),
+        ("item_frames", item_frame_base, ItemFrmNum, ITEM_FRAME_INFORMATION_SIZE, _decode_item_frame),
+        ("item_infos", item_info_base, ItemInfoNum, ITEM_INFORMATION_SIZE, _decode_item_info),
+        ("sub_code_infos", sub_code_base, SubCodeInfoNum, SUBCODE_INFO_SIZE, _decode_subcode_info),
+        ("sub_smenus", sub_smenu_base, SubSMenuNum, SMENU_INFORMATION_SIZE, _decode_smenu),
+        ("sub_item_cells", sub_item_cell_base, SubItemCellNum, ITEM_CELL_INFORMATION_SIZE, _decode_item_cell),
+        ("sub_item_frames", sub_item_frame_base, SubItemFrmNum, ITEM_FRAME_INFORMATION_SIZE, _decode_item_frame),
+    ]
+
+
+def _read_tables(buf, L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum,
+                 SubCodeInfoNum=0, SubSMenuNum=0, SubItemCellNum=0, SubItemFrmNum=0) -> dict:
+    tables = {}
+    for name, base, count, size, decode in _table_layout(
+            L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum,
+            SubCodeInfoNum, SubSMenuNum, SubItemCellNum, SubItemFrmNum):
+        records = []
+        for i in range(count):
+            off = base + size * i
+            if off + size > len(buf):
+                break
+            records.append(decode(buf, i, off))
+        tables[name] = records
+    return tables
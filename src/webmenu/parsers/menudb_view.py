@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""menudb.dat の遅延ビュー。
+
+ファイルを mmap し、各テーブル（lmenus / mmenus / smenus / item_cells /
+item_frames / item_infos / sub_*）をインデックスされた時点で1レコードずつデコードする。
+デコード結果はキャッシュされ、内容は read_menudb の出力と同一。
+少数の商品だけ参照するマッピング／QA ツール向け。
+"""
+import mmap
+import os
+from collections.abc import Sequence
+
+from . import menudb_reader as mr
+
+# 件数の読み取りに必要なヘッダの長さ（サブメニュー系の件数は無くてもよい）
+MIN_HEADER_SIZE = mr.HEADER_INFORMATION_ITEM_INFO_NUM + mr.OFS_LONG
+
+
+class LazyRecords(Sequence):
+    """固定長レコード列を mmap 上から必要時にだけデコードするシーケンス。"""
+
+    def __init__(self, buf, base: int, count: int, size: int, decode):
+        self._buf = buf
+        self.base = base
+        self.size = size
+        self._decode = decode
+        # read_menudb と同様、ファイルに収まる件数までで打ち切る
+        fit = (len(buf) - base) // size if base <= len(buf) else 0
+        self._count = max(0, min(count, fit))
+        self._cache = [None] * self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        record = self._cache[index]
+        if record is None:
+            record = self._decode(self._buf, index, self.base + self.size * index)
+            self._cache[index] = record
+        return record
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def index_of_offset(self, offset: int):
+        """レコード先頭オフセット（アドレス）からインデックスを求める。範囲外は None。"""
+        rel = offset - self.base
+        if rel < 0 or rel % self.size:
+            return None
+        idx = rel // self.size
+        return idx if idx < self._count else None
+
+    def at_offset(self, offset: int):
+        """レコード先頭オフセット（アドレス）からレコードを返す。範囲外は None。"""
+        idx = self.index_of_offset(offset)
+        return None if idx is None else self[idx]
+
+
+class MenuDbView:
+    """menudb.dat を mmap した読み取り専用ビュー。
+
+    menudb.get("item_infos") のように read_menudb の戻り値と同じキーで
+    参照できるため、dict を受け取るマッピング関数にもそのまま渡せる。
+    """
+
+    TABLES = ("lmenus", "mmenus", "smenus", "item_cells", "item_frames", "item_infos",
+              "sub_code_infos", "sub_smenus", "sub_item_cells", "sub_item_frames")
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < MIN_HEADER_SIZE:
+            self._file.close()
+            raise ValueError(f"menudb file is too short ({size} bytes, header needs "
+                             f"{MIN_HEADER_SIZE}): {self.path}")
+        self._buf = buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # ===== ヘッダの件数をJavaと同じ方法で読む（BE相当） =====
+        L = buf[mr.HEADER_INFORMATION_LMENU_MAX]
+        M = buf[mr.HEADER_INFORMATION_MMENU_MAX]
+        SMenuNum = mr._be_u32(buf, mr.HEADER_INFORMATION_SMENU_NUM)
+        ItemCellNum = mr._be_u32(buf, mr.HEADER_INFORMATION_ITEM_CELL_NUM)
+        ItemFrmNum = mr._be_u32(buf, mr.HEADER_INFORMATION_ITEM_FRM_NUM)
+        ItemInfoNum = mr._be_u32(buf, mr.HEADER_INFORMATION_ITEM_INFO_NUM)
+        sub_counts = mr._read_sub_counts(buf)
+
+        for name, base, count, size, decode in mr._table_layout(
+                L, M, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum, *sub_counts):
+            setattr(self, name, LazyRecords(buf, base, count, size, decode))
+
+        self.meta = {
+            "path": self.path,
+            "counts": {
+                "L": L, "M": M,
+                "SMenuNum": SMenuNum,
+                "ItemCellNum": ItemCellNum,
+                "ItemFrmNum": ItemFrmNum,
+                "ItemInfoNum": ItemInfoNum,
+                **dict(zip(mr.SUB_COUNT_KEYS, sub_counts)),
+            },
+            "base": self.item_infos.base,
+            "stride": mr.ITEM_INFORMATION_SIZE,
+            "endian": "BE",
+        }
+
+    # --- read_menudb の dict 互換アクセス ---
+    def __getitem__(self, key):
+        if key == "meta":
+            return self.meta
+        if key in self.TABLES:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def item_info_by_addr(self, addr: int):
+        """ITEM_INFO のアドレス（ファイル先頭からのオフセット）から商品詳細を返す。"""
+        return self.item_infos.at_offset(addr)
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
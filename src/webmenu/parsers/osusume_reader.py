@@ -1,28 +1,20 @@
 import os
 import csv
 import re
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+from ..core.inventory import SourceInventory, OSUSUME
+from ..core.parse_cache import cached
+from .csv_reader import read_csv_rows
+
+# 解析結果の形が変わったら上げる（解析キャッシュのキーに含まれる）
+PARSER_VERSION = 2
 
 IMAGE_EXTS = (".jpg", ".jpeg", ".png")
 FRAME_INDEX_RE = re.compile(r"(\d{2})$")
 FIXED_LAYOUT_IDS = {1, 2, 3, 4, 6, 8, 9, 10, 12, 24}
 
-# 読み込むファイルの文字コード判定
-def detect_encoding(path: str) -> str:
-    encodings = ["utf-8-sig", "utf-8", "cp932"]
-
-    for enc in encodings:
-        try:
-            with open(path, "r", encoding=enc, errors="strict") as f:
-                # 実際に全部読んで確認
-                for _ in f:
-                    pass
-            return enc
-        except UnicodeDecodeError:
-            continue
-
-    raise UnicodeDecodeError("unknown", b"", 0, 1, "Cannot detect encoding")
-    
 def _read_frameinf(path: str):
     frames_by_section = {}
     layout_meta: Dict[str, str] = {}
@@ -84,27 +76,21 @@ def _read_frameinf(path: str):
     return frames_by_code, layout_meta, slots
 
 
-def _scan_images(entry_dir: str, l_name: str, m_name: str, v_name: str):
+def _scan_images(entry_dir: str, l_name: str, m_name: str, v_name: str,
+                 files: List[Tuple[str, str]]):
+    """files: インベントリから得た (ディレクトリの実パス, ファイル名) の一覧。"""
     frame_images: Dict[str, Dict[int, str]] = {}
     other_images: List[str] = []
 
-    # ディレクトリが存在しない場合は空を返す
-    if not os.path.isdir(entry_dir):
-        return frame_images, other_images
-
     all_image_files = []
 
-    for root, dirs, files in os.walk(entry_dir):
-        for fname in files:
-            lower = fname.lower()
-            if lower in {".ds_store", "thumbs.db"}:
-                continue
-            if not lower.endswith(IMAGE_EXTS):
-                continue
-
-            path = os.path.join(root, fname)
-            if os.path.isfile(path):
-                all_image_files.append((root, fname, path))
+    for root, fname in files:
+        lower = fname.lower()
+        if lower in {".ds_store", "thumbs.db"}:
+            continue
+        if not lower.endswith(IMAGE_EXTS):
+            continue
+        all_image_files.append((root, fname, os.path.join(root, fname)))
 
     has_fixed = any(
         len(os.path.splitext(fname)[0]) == 8 and os.path.splitext(
@@ -125,8 +111,8 @@ def _scan_images(entry_dir: str, l_name: str, m_name: str, v_name: str):
     else:
         layout_type = None
 
-    # entry_dir 以下のすべてのファイルを再帰的に走査
-    # os.walk を使用することで en-US などの言語サブディレクトリも含める
+    # entry_dir 以下のすべてのファイルを対象にする
+    # en-US などの言語サブディレクトリも含める
 
     for root, fname, path in sorted(all_image_files):
         rel_root = os.path.relpath(root, entry_dir).replace(os.sep, "/")
@@ -188,29 +174,21 @@ def _read_lname(path: str) -> List[Dict]:
     if not os.path.isfile(path):
         return result
 
-    # 事前文字コードチェック
-    encoding = detect_encoding(path)
-    with open(path, "r", encoding=encoding, errors="strict") as f:
-        sample = f.read(1024)
-        f.seek(0)
-        dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
-        reader = csv.reader(f, dialect)
-
-        for row in reader:
-            if not row or len(row) < 2:
-                continue
+    for row in read_csv_rows(path):
+        if not row or len(row) < 2:
+            continue
 
-            try:
-                index = int(row[0])
-            except ValueError:
-                continue
+        try:
+            index = int(row[0])
+        except ValueError:
+            continue
 
-            name = row[1]
+        name = row[1]
 
-            result.append({
-                "index": index,
-                "name": name
-            })
+        result.append({
+            "index": index,
+            "name": name
+        })
 
     result.sort(key=lambda x: x["index"])
 
@@ -223,31 +201,23 @@ def _read_mname(path: str) -> List[Dict]:
     if not os.path.isfile(path):
         return result
 
-    # 事前文字コードチェック
-    encoding = detect_encoding(path)
-    with open(path, "r", encoding=encoding, errors="strict") as f:
-        sample = f.read(1024)
-        f.seek(0)
-        dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
-        reader = csv.reader(f, dialect)
-
-        for row in reader:
-            if not row or len(row) < 3:
-                continue
+    for row in read_csv_rows(path):
+        if not row or len(row) < 3:
+            continue
 
-            try:
-                lindex = int(row[0])
-                mindex = int(row[1])
-            except ValueError:
-                continue
+        try:
+            lindex = int(row[0])
+            mindex = int(row[1])
+        except ValueError:
+            continue
 
-            name = row[2]
+        name = row[2]
 
-            result.append({
-                "lindex": lindex,
-                "mindex": mindex,
-                "name": name
-            })
+        result.append({
+            "lindex": lindex,
+            "mindex": mindex,
+            "name": name
+        })
 
     result.sort(key=lambda x: (x["lindex"], x["mindex"]))
 
@@ -260,126 +230,156 @@ def _read_iteminfo_mdel(path: str) -> List[Dict]:
     if not os.path.isfile(path):
         return items
 
-    # 事前文字コードチェック
-    encoding = detect_encoding(path)
-    with open(path, "r", encoding=encoding, errors="strict") as f:
-        sample = f.read(1024)
-        f.seek(0)
-        dialect = csv.Sniffer().sniff(sample, delimiters=",\t")
-        reader = csv.reader(f, dialect)
-
-        for row in reader:
-            if not row:
-                continue
+    for row in read_csv_rows(path):
+        if not row:
+            continue
 
-            if row[0].startswith("#") or row[0] == "ItemCode":
-                continue
+        if row[0].startswith("#") or row[0] == "ItemCode":
+            continue
 
-            if len(row) < 5:
-                continue
+        if len(row) < 5:
+            continue
 
-            items.append({
-                "item_code": int(row[0]),
-                "name": row[1].strip(),
-                "price": int(row[2]),
-                "tax_price": int(row[3]),
-                "master_price": int(row[4]),
-            })
+        items.append({
+            "item_code": int(row[0]),
+            "name": row[1].strip(),
+            "price": int(row[2]),
+            "tax_price": int(row[3]),
+            "master_price": int(row[4]),
+        })
 
     return items
 
 
-def read_osusume(root: str) -> Dict:
+def _variant_files(inventory: SourceInventory, entry_dir: str, rel: str) -> List[Tuple[str, str]]:
+    """entry_dir 以下の全ファイルを (ディレクトリの実パス, ファイル名) で返す（os.walk 相当）。"""
+    files = []
+    for sub, dirs, names in inventory.walk(OSUSUME, rel):
+        root = os.path.join(entry_dir, *sub.split("/")) if sub else entry_dir
+        files.extend((root, name) for name in names)
+    return sorted(files)
+
+
+def _read_variant(entry_dir: str, l_name: str, m_name: str, v_name: str,
+                  files: List[Tuple[str, str]]) -> Dict:
+    frame_path = os.path.join(entry_dir, "frameinf.ini")
+    cells_path = os.path.join(entry_dir, "itemcell.csv")
+    frames, layout_meta, slots = _read_frameinf(frame_path)
+    cells = _read_itemcells(cells_path)
+    frame_images, other_images = _scan_images(
+        entry_dir, l_name, m_name, v_name, files)
+
+    layout_id = layout_meta.get("layout") if layout_meta else None
+    try:
+        layout_id = int(layout_id)
+    except (TypeError, ValueError):
+        layout_id = None
+    layout_show = layout_meta.get("show")
+
+    # デフォルトのフレーム画像（default 言語）を格納する辞書
+    entry_frame_images = {}
+
+    # すべての言語のフレーム画像を格納する辞書
+    multi_lang_images = {}
+
+    if layout_id in FIXED_LAYOUT_IDS:
+        entry_frame_images = frame_images.get("default", {})
+        multi_lang_images = frame_images.copy()
+    else:
+        entry_frame_images = {}
+        multi_lang_images = {}
+
+    background = ""
+    if layout_id in FIXED_LAYOUT_IDS:
+        if other_images:
+            background = other_images[0]
+    else:
+        if other_images:
+            background = other_images[0]
+        elif frame_images:
+            first_key = sorted(frame_images.keys())[0]
+            background = frame_images[first_key]
+        entry_frame_images = {}
+
+    return {
+        "l_index": int(l_name),
+        "m_index": int(m_name),
+        "variant": int(v_name),
+        "background": background,
+        "cells": cells,
+        "frames": frames,
+        "frame_slots": slots,
+        "layout": layout_id,
+        "layout_show": layout_show,
+        "frame_images": entry_frame_images,
+        "multi_lang_images": multi_lang_images,
+        "dir": entry_dir,
+    }
+
+
+def read_osusume(root: str, cache=None, inventory: Optional[SourceInventory] = None,
+                 jobs: int = 1, manifest=None) -> Dict:
+    """smenu/<L>/<M>/<V> のおすすめページを読み込む。
+
+    jobs > 1 の場合はバリアントごとにスレッドプールで並列に読み込む
+    （待ち時間の大半はファイル I/O）。結果は常に L/M/V の昇順で、逐次読み込みと同一。
+    manifest（OsusumeManifest）を渡すと、前回ビルドから変更の無いバリアントは
+    前回の解析結果を再利用する。
+    """
     base = os.path.join(root, "smenu")
     entries = []
     by_key = {}
 
-    if not os.path.isdir(base):
+    if inventory is None:
+        inventory = SourceInventory(osusume_dir=root)
+    if not inventory.isdir(OSUSUME):
         return {"root": root, "entries": entries, "by_key": by_key}
 
-    for l_name in sorted(os.listdir(base)):
+    tasks = []
+    for l_name in sorted(inventory.subdirs(OSUSUME)):
         if not l_name.isdigit():
             continue
-        l_idx = int(l_name)
         l_dir = os.path.join(base, l_name)
-        if not os.path.isdir(l_dir):
-            continue
 
-        for m_name in sorted(os.listdir(l_dir)):
+        for m_name in sorted(inventory.subdirs(OSUSUME, l_name)):
             if not m_name.isdigit():
                 continue
-            m_idx = int(m_name)
             m_dir = os.path.join(l_dir, m_name)
-            if not os.path.isdir(m_dir):
-                continue
 
-            for v_name in sorted(os.listdir(m_dir)):
+            for v_name in sorted(inventory.subdirs(OSUSUME, f"{l_name}/{m_name}")):
                 if not v_name.isdigit():
                     continue
-                v_idx = int(v_name)
                 entry_dir = os.path.join(m_dir, v_name)
-                if not os.path.isdir(entry_dir):
-                    continue
-
-                frame_path = os.path.join(entry_dir, "frameinf.ini")
-                cells_path = os.path.join(entry_dir, "itemcell.csv")
-                frames, layout_meta, slots = _read_frameinf(frame_path)
-                cells = _read_itemcells(cells_path)
-                frame_images, other_images = _scan_images(
-                    entry_dir, l_name, m_name, v_name)
-
-                layout_id = layout_meta.get("layout") if layout_meta else None
-                try:
-                    layout_id = int(layout_id)
-                except (TypeError, ValueError):
-                    layout_id = None
-                layout_show = layout_meta.get("show")
-
-                # デフォルトのフレーム画像（default 言語）を格納する辞書
-                entry_frame_images = {}
-
-                # すべての言語のフレーム画像を格納する辞書
-                multi_lang_images = {}
-
-                if layout_id in FIXED_LAYOUT_IDS:
-                    entry_frame_images = frame_images.get("default", {})
-                    multi_lang_images = frame_images.copy()
-                else:
-                    entry_frame_images = {}
-                    multi_lang_images = {}
-
-                background = ""
-                if layout_id in FIXED_LAYOUT_IDS:
-                    if other_images:
-                        background = other_images[0]
-                else:
-                    if other_images:
-                        background = other_images[0]
-                    elif frame_images:
-                        first_key = sorted(frame_images.keys())[0]
-                        background = frame_images[first_key]
-                    entry_frame_images = {}
-
-                entry = {
-                    "l_index": l_idx,
-                    "m_index": m_idx,
-                    "variant": v_idx,
-                    "background": background,
-                    "cells": cells,
-                    "frames": frames,
-                    "frame_slots": slots,
-                    "layout": layout_id,
-                    "layout_show": layout_show,
-                    "frame_images": entry_frame_images,
-                    "multi_lang_images": multi_lang_images,
-                    "dir": entry_dir,
-                }
-                entries.append(entry)
+                rel = f"{l_name}/{m_name}/{v_name}"
+                files = _variant_files(inventory, entry_dir, rel)
+                tasks.append((rel, entry_dir, l_name, m_name, v_name, files))
+
+    def read_task(task):
+        rel, entry_dir, l_name, m_name, v_name, files = task
+        entry = None
+        if manifest is not None:
+            entry = manifest.reusable_entry(inventory, rel)
+        if entry is None:
+            sources = [os.path.join(entry_dir, "frameinf.ini"),
+                       os.path.join(entry_dir, "itemcell.csv")]
+            entry = cached(
+                cache, "osusume_variant", PARSER_VERSION, sources,
+                _read_variant, entry_dir, l_name, m_name, v_name, files, extra=(files,))
+        if manifest is not None:
+            manifest.record_entry(rel, entry)
+        return entry
+
+    if jobs > 1 and len(tasks) > 1:
+        # map は投入順に結果を返すため、並列でも並びは逐次と同じ
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            entries = list(pool.map(read_task, tasks))
+    else:
+        entries = [read_task(task) for task in tasks]
 
     return {"root": root, "entries": entries}
 
 
-def read_osusume_datas(root: str):
+def read_osusume_datas(root: str, cache=None):
     base = os.path.join(root, "smenu", "menu", "datas")
 
     readers = {
@@ -400,7 +400,7 @@ def read_osusume_datas(root: str):
             lower = name.lower()
             for key, (reader, filenames) in readers.items():
                 if lower in filenames:
-                    read_result = reader(path)
+                    read_result = cached(cache, key, PARSER_VERSION, [path], reader, path, by_path=False)
                     # 有効なデータがある場合のみ結果に追加
                     if read_result:
                         if key not in result:
@@ -421,7 +421,8 @@ def read_osusume_datas(root: str):
                 lower = fname.lower()
                 for key, (reader, filenames) in readers.items():
                     if lower in filenames:
-                        read_result = reader(fpath)
+                        read_result = cached(cache, key, PARSER_VERSION, [fpath], reader, fpath,
+                                             by_path=False)
                         # 有効なデータがある場合のみ結果に追加
                         if read_result:
                             if key not in result:
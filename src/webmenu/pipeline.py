@@ -15,14 +15,18 @@ import shutil
 
 # 自作モジュール
 from .parsers.ini_loader import load_all_ini
+from .parsers.ini_loader import PARSER_VERSION as INI_PARSER_VERSION
 from .parsers.menudb_reader import read_menudb
+from .parsers.menudb_reader import PARSER_VERSION as MENUDB_PARSER_VERSION
 from .parsers.osusume_reader import read_osusume
 from .parsers.osusume_reader import read_osusume_datas
 from .parsers.datas_loader import read_datas
-from .dumpers.raw_dump_writer import write_raw_dump
+from .parsers.datas_loader import PARSER_VERSION as DATAS_PARSER_VERSION
+from .dumpers.raw_dump_writer import write_raw_dump, RAW_DUMP_SECTIONS
 from .mapping.to_web_products import make_products
 from .mapping.to_web_categories import make_categories
-from .mapping.to_web_small_pages import make_small_pages
+from .mapping.to_web_small_pages import iter_small_pages, page_summary
+from .mapping.to_web_submenus import make_submenu_graph
 from .mapping.to_web_soldout import make_soldout_json
 from .mapping.to_web_jump_btns import make_jump_btns_json, make_checkin_btns_json
 from .mapping.guidance_generator import run_guidance_process
@@ -32,10 +36,42 @@ from .dumpers.assets_exporter import export_assets
 from .dumpers.assets_exporter import export_soldout_assets
 from .dumpers.assets_exporter import export_jump_btn_assets
 from .dumpers.assets_exporter import export_checkin_btn_assets
-from typing import Set
+from .models.item_info import ItemInfo
+from .models.record import json_default
+from .core.parse_cache import ParseCache, cached
+from .core.refs import RefTable
+from .core.ids import is_cells_relpath, is_sidecar_relpath
+from .core.inventory import SourceInventory
+from .core.osusume_manifest import OsusumeManifest, find_previous, mapping_digest
+from .core.stages import Stage, run_stages
+from .core.build_profile import BuildProfile, record_count
+from .core.incremental import IncrementalBuild, MENUDB, CONFIG, DATAS, OSUSUME_GROUP, IMAGES
+from .core.output_manifest import OutputManifest
+from .dumpers.json_writer import JsonEmitter, WriterPool
+from .dumpers.page_packs import PagePacks
+from .dumpers.precompress import precompress, remove_sidecars
+from .parsers.osusume_reader import PARSER_VERSION as OSUSUME_PARSER_VERSION
+from typing import Dict, List, Optional, Sequence, Set
 
 ASSET_PREFIX_FREE = "free_images/"
 
+# 差分ビルド（--incremental-from）で出力ごとに依存する入力グループ
+PROCESSED_INPUTS = {
+    "menudb.json": (MENUDB, CONFIG),
+    "categories.json": (MENUDB, CONFIG, OSUSUME_GROUP, IMAGES),
+    "submenus.json": (MENUDB,),
+    "soldout.json": (CONFIG,),
+    "jumpmenu.json": (CONFIG, IMAGES),
+    "checkin_hansoku.json": (CONFIG, IMAGES),
+}
+SMALL_PAGE_INPUTS = (MENUDB, CONFIG, OSUSUME_GROUP)
+RAW_DUMP_INPUTS = {
+    "ini": (CONFIG,),
+    "menudb": (MENUDB,),
+    "osusume": (OSUSUME_GROUP,),
+    "datas": (DATAS,),
+}
+
 # ------------------------------------------------------------
 # 共通ログ作成処理
 #  ・ファイル + コンソールの両方へ出力
@@ -138,31 +174,40 @@ def _normalize_asset_path(name: str) -> str:
 def collect_required_assets(small_pages: dict) -> Set[str]:
     assets: Set[str] = set()
     for payload in small_pages.values():
-        if not isinstance(payload, dict):
+        collect_page_assets(payload, assets)
+    return assets
+
+
+def collect_page_assets(payload: dict, assets: Set[str]) -> Set[str]:
+    """1 ページ分の必要アセットを assets に追加する（ページを書き出しながら集める用）。"""
+    if not isinstance(payload, dict):
+        return assets
+    bg = _normalize_asset_path(payload.get("background", ""))
+    if bg:
+        assets.add(bg)
+    for item in payload.get("grid_items", []):
+        if not isinstance(item, dict):
             continue
-        bg = _normalize_asset_path(payload.get("background", ""))
-        if bg:
-            assets.add(bg)
-        for item in payload.get("grid_items", []):
-            if not isinstance(item, dict):
-                continue
-            img = _normalize_asset_path(item.get("image", ""))
-            if img:
-                assets.add(img)
-            detail = item.get("product_detail") or {}
+        img = _normalize_asset_path(item.get("image", ""))
+        if img:
+            assets.add(img)
+        detail = item.get("product_detail") or {}
+        if isinstance(detail, ItemInfo):
+            info_img = _normalize_asset_path(detail.infoImg)
+        else:
             info_img = _normalize_asset_path(detail.get("infoImg", ""))
-            if info_img:
-                if "/" in info_img:
-                    assets.add(info_img)
-                else:
-                    assets.add(f"{ASSET_PREFIX_FREE}{info_img}")
-
-            # multi_lang_images
-            multi_lang_images = item.get("multi_lang_images") or {}
-            for lang, path in multi_lang_images.items():
-                path = _normalize_asset_path(path)
-                if path:
-                    assets.add(path)
+        if info_img:
+            if "/" in info_img:
+                assets.add(info_img)
+            else:
+                assets.add(f"{ASSET_PREFIX_FREE}{info_img}")
+
+        # multi_lang_images
+        multi_lang_images = item.get("multi_lang_images") or {}
+        for lang, path in multi_lang_images.items():
+            path = _normalize_asset_path(path)
+            if path:
+                assets.add(path)
     return assets
 
 
@@ -205,173 +250,427 @@ def collect_category_assets(categories: dict) -> Set[str]:
     return assets
 
 
-def generate_dir_to_json(processed_dump_dir: str, raw_dump_dir: str, web_dir: str):
-    dir_mapping = [
-        ("processed_dump", processed_dump_dir),
-        ("raw_dump/osusume", os.path.join(raw_dump_dir, "osusume")),
-        ("raw_dump/ini", os.path.join(raw_dump_dir, "ini")),
-        ("raw_dump/menudb", os.path.join(raw_dump_dir, "menudb"))
-    ]
+# ------------------------------------------------------------
+# フォルダ構成情報（dir_info.json）
+# 出力マニフェストに記録済みのファイルから作る（ディレクトリは読み直さない）
+# ------------------------------------------------------------
+DIR_INFO_KEYS = ("processed_dump", "raw_dump/osusume", "raw_dump/ini", "raw_dump/menudb")
 
-    dir_info = {key: [] for key, _ in dir_mapping}
 
-    for json_key, target_dir in dir_mapping:
-        if not os.path.exists(target_dir):
+def make_dir_info(files) -> Dict[str, List[str]]:
+    """files: web_content 相対パスの一覧。DIR_INFO_KEYS 直下のファイル名をキーごとに返す（圧縮版は除く）。"""
+    dir_info = {key: [] for key in DIR_INFO_KEYS}
+    for rel in files:
+        if is_sidecar_relpath(rel):
             continue
-
-        for entry in os.listdir(target_dir):
-            entry_full_path = os.path.join(target_dir, entry)
-            if os.path.isfile(entry_full_path):
-                dir_info[json_key].append(entry)
-
+        directory, _, name = rel.rpartition("/")
+        if directory in dir_info:
+            dir_info[directory].append(name)
+    for names in dir_info.values():
+        names.sort()
     return dir_info
 
 
-# ------------------------------------------------------------
-# パイプライン実行
-# メニュー関連データを読み込んで加工し、Web向けに出力する一連の処理
-# args: コマンドライン引数オブジェクト
-# ------------------------------------------------------------
-def run_pipeline(args):
-    logger = setup_logger()
-    logger.info("WebMenuGenerate 処理を開始します。")
+def _output_version(args) -> str:
+    """出力内容に影響するスキーマ・解析バージョン（異なる前回ビルドからは引き継がない）。"""
+    return "/".join(str(v) for v in (
+        args.schema_version, MENUDB_PARSER_VERSION, OSUSUME_PARSER_VERSION,
+        INI_PARSER_VERSION, DATAS_PARSER_VERSION, args.output_format))
 
-    try:
-        # ★ここから下、関数内に「import json, os」は置かない！
-        ref = args.ref or datetime.datetime.now().strftime("%Y%m%d-%H%M%S-000000")
-        out_root = os.path.join(args.out, "builds", ref)
-        web_dir = os.path.join(out_root, "web_content")
-        raw_dump_dir = os.path.join(web_dir, "raw_dump")
-        processed_dump_dir = os.path.join(web_dir, "processed_dump")
 
-        os.makedirs(raw_dump_dir, exist_ok=True)
-        os.makedirs(web_dir, exist_ok=True)
-        os.makedirs(processed_dump_dir, exist_ok=True)
+def _previous_build(args) -> Optional[str]:
+    """比較対象の前回ビルド（--incremental-from、無ければ builds/ 配下の直近のビルド）。"""
+    if args.incremental_from:
+        return os.path.join(args.out, "builds", args.incremental_from)
+    return find_previous(os.path.join(args.out, "builds"))
+
 
-        # Parse legacy
+# ------------------------------------------------------------
+# パイプラインのステージ定義
+# 各ステージの入力・出力を宣言し、run_stages が依存順に実行する
+# （--jobs 1 では下記の宣言順に逐次実行する）
+# 件数などのカウンタは profile.count で実行中のステージに加算する
+# （出力ファイル数は outputs.tally で、実際に書き込んだ・前回から引き継いだ・変更なしを分けて数える）
+# ------------------------------------------------------------
+def build_stages(args, logger: logging.Logger, out_root: str,
+                 profile: BuildProfile, cache=None,
+                 inventory: Optional[SourceInventory] = None,
+                 writer: Optional[WriterPool] = None,
+                 outputs: Optional[OutputManifest] = None) -> List[Stage]:
+    web_dir = os.path.join(out_root, "web_content")
+    raw_dump_dir = os.path.join(web_dir, "raw_dump")
+    processed_dump_dir = os.path.join(web_dir, "processed_dump")
+    menudb_path = os.path.join(args.free, "datas", "menudb.dat")
+    incremental_dir = (os.path.join(args.out, "builds", args.incremental_from)
+                       if args.incremental_from else None)
+    # JSON の出力はすべて writer（の emitter）を通す（compact: 詰めた書式 / pretty: 従来の書式）
+    # 各ステージは自分の書き込みが終わるのを待ってから完了する
+    # 出力したファイルはすべて outputs（build_manifest.json）に記録する
+    outputs = outputs or OutputManifest(web_dir, _previous_build(args))
+    writer = writer or WriterPool(JsonEmitter(args.output_format), workers=0,
+                                  write_file=outputs.write)
+
+    # --- Parse legacy（各パーサーは互いに独立） ---
+    def open_cache():
         logger.info("設定ファイルの読み込みを開始します。")
-        ini_bundle = load_all_ini(os.path.join(args.free, "config"))
-        menudb_path = os.path.join(args.free, "datas", "menudb.dat")
-        menudb = read_menudb(menudb_path)
-        osusume = read_osusume(args.osusume)
-        osusume_ini_bundle = load_all_ini(
-            os.path.join(args.osusume, "smenu", "menu", "datas"))
-        osusume_datas = read_osusume_datas(args.osusume)
-        datas = read_datas(os.path.join(args.free, "datas"))
-
-        # Raw dump
+        if cache is not None:
+            return cache
+        if args.cache_dir:
+            return ParseCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+        return None
+
+    def parse_ini(cache):
+        return load_all_ini(os.path.join(args.free, "config"), cache=cache)
+
+    def parse_menudb(cache):
+        menudb = cached(cache, "menudb", MENUDB_PARSER_VERSION, [menudb_path],
+                        read_menudb, menudb_path, args.menudb_engine, by_path=False)
+        # キャッシュは内容ハッシュだけで共有するので、meta.path は今回のパスにする
+        menudb = dict(menudb, meta=dict(menudb["meta"], path=os.path.abspath(menudb_path)))
+        profile.count(records_parsed=record_count(menudb))
+        return menudb
+
+    def scan_inventory():
+        # 画像・おすすめ素材の有無は一度の走査で把握し、以降はディスクに問い合わせない
+        if inventory is not None:
+            return inventory
+        return SourceInventory(args.free, args.osusume)
+
+    def fingerprint_inputs(inventory):
+        # 入力のフィンガープリントを前回ビルドと比較し、変わっていない出力は引き継ぐ
+        incremental = IncrementalBuild(
+            out_root, _output_version(args), args.free, inventory, previous_dir=incremental_dir)
+        if incremental_dir and incremental.previous_dir is None:
+            logger.warning("前回ビルドの入力情報を利用できないため全件生成します: %s", incremental_dir)
+        logger.info("差分ビルド: %s", incremental.summary(linked=False))
+        return incremental
+
+    def load_manifest():
+        # 前回ビルドのマニフェストと比較し、変更の無いおすすめバリアントは再利用する
+        return OsusumeManifest(
+            args.osusume,
+            mapping_digest(menudb_path, args.schema_version, OSUSUME_PARSER_VERSION),
+            previous_dir=_previous_build(args))
+
+    def parse_osusume(cache, inventory, manifest):
+        osusume = read_osusume(args.osusume, cache=cache, inventory=inventory,
+                               jobs=args.jobs, manifest=manifest)
+        profile.count(records_parsed=len(osusume.get("entries", [])))
+        return osusume
+
+    def parse_osusume_ini(cache):
+        return load_all_ini(
+            os.path.join(args.osusume, "smenu", "menu", "datas"), cache=cache)
+
+    def parse_osusume_datas(cache):
+        osusume_datas = read_osusume_datas(args.osusume, cache=cache)
+        profile.count(records_parsed=record_count(osusume_datas))
+        return osusume_datas
+
+    def parse_datas(cache):
+        datas = read_datas(os.path.join(args.free, "datas"), cache=cache)
+        profile.count(records_parsed=record_count(datas))
+        return datas
+
+    def prune_cache(cache):
+        if cache is not None:
+            cache.prune()
+            logger.info("解析キャッシュ: %s", cache.summary())
+
+    def build_refs(menudb):
+        # 参照テーブル（アドレス／オフセット索引）は解析直後に一度だけ構築する
+        return RefTable.from_menudb(menudb)
+
+    # --- Raw dump（ini は参照された時点で読み込まれるため、スキップ時は大半の ini を読まない） ---
+    def raw_dump(ini_bundle, menudb, osusume, osusume_ini_bundle, osusume_datas, datas, incremental):
+        if args.skip_raw_dump:
+            logger.info("Raw dump の出力をスキップします。")
+            return
         logger.info("Raw dump の出力処理を開始します。")
+        sections = []
+        for name in RAW_DUMP_SECTIONS:
+            if incremental.link_tree(f"web_content/raw_dump/{name}", RAW_DUMP_INPUTS[name]):
+                outputs.record_tree(os.path.join(raw_dump_dir, name))
+            else:
+                sections.append(name)
         write_raw_dump(raw_dump_dir, ini_bundle, menudb, osusume,
-                       osusume_ini_bundle, osusume_datas, datas)
+                       osusume_ini_bundle, osusume_datas, datas,
+                       sections=sections, writer=writer)
+        profile.count(**outputs.tally("raw_dump"))
 
-        # Mapping to web_content
+    # --- Mapping to web_content ---
+    def map_products(menudb, ini_bundle):
         logger.info("Web 向け JSON データの生成処理を開始します。")
-        products = make_products(
-            menudb, ini_bundle, schema_version=args.schema_version)
-        small_pages, cell_files = make_small_pages(
-            menudb,
-            osusume,
-            ini_bundle,
-            schema_version=args.schema_version
-        )
-        categories = make_categories(
-            args.free, args.osusume, menudb, ini_bundle, small_pages, schema_version=args.schema_version)
-        soldout = make_soldout_json(ini_bundle)
-        jump_btn = make_jump_btns_json(args.free, args.osusume, ini_bundle)
-        checkin_btn = make_checkin_btns_json(
-            args.free, args.osusume, ini_bundle)
-
-        # Emit web_content
+        return make_products(menudb, ini_bundle, schema_version=args.schema_version)
+
+    def emit_small_pages(menudb, refs, osusume, ini_bundle, manifest, incremental):
+        # ページは 1 件ずつ生成してすぐ書き出し、カテゴリツリーと素材収集に必要な
+        # 要約（page_index）と必要アセット（page_assets）だけを残す
+        page_index = {}
+        page_assets: Set[str] = set()
+        writes = []
+        # --page-packs: 大分類ごとのパック（packs/L<nn>.json）にも同じバイト列を入れる
+        packs = PagePacks(web_dir, writer, args.schema_version) if args.page_packs else None
+        for rel_path, payload in iter_small_pages(menudb, refs, osusume, ini_bundle,
+                                                  schema_version=args.schema_version,
+                                                  manifest=manifest):
+            if not is_cells_relpath(rel_path):
+                page_index[rel_path] = page_summary(payload)
+                collect_page_assets(payload, page_assets)
+                profile.count(pages_emitted=1)
+            linked = incremental.link_forward(f"web_content/{rel_path}", SMALL_PAGE_INPUTS)
+            if linked:
+                outputs.record(os.path.join(web_dir, rel_path))
+                if packs is None:
+                    continue
+            data = writer.emitter.dumps(payload, default=json_default, indent=2)
+            if packs is not None:
+                packs.add(rel_path, data)
+            if not linked:
+                writes.append(writer.submit_bytes(os.path.join(web_dir, rel_path), data))
+        if packs is not None:
+            writes.extend(packs.flush())
+        writer.wait(writes)
+        profile.count(**outputs.tally("small", "packs"))
+        manifest.save(out_root)
+        logger.info("おすすめ差分ビルド: %s", manifest.summary())
+        return page_index, page_assets
+
+    def map_categories(inventory, menudb, refs, ini_bundle, page_index):
+        return make_categories(
+            inventory, menudb, refs, ini_bundle, page_index, schema_version=args.schema_version)
+
+    def map_submenus(menudb, refs):
+        return make_submenu_graph(menudb, refs, schema_version=args.schema_version)
+
+    # --- Emit web_content ---
+    def emit_processed(products, categories, submenus, soldout, jump_btn, checkin_btn, incremental):
         logger.info("Web 向け JSON ファイルの出力を開始します。")
-        with open(os.path.join(processed_dump_dir, "menudb.json"), "w", encoding="utf-8") as f:
-            json.dump(products, f, ensure_ascii=False, indent=2)
-        with open(os.path.join(processed_dump_dir, "categories.json"), "w", encoding="utf-8") as f:
-            json.dump(categories, f, ensure_ascii=False, indent=2)
-        with open(os.path.join(processed_dump_dir, "soldout.json"), "w", encoding="utf-8") as f:
-            json.dump(soldout, f, ensure_ascii=False, indent=2)
-        with open(os.path.join(processed_dump_dir, "jumpmenu.json"), "w", encoding="utf-8") as f:
-            json.dump(jump_btn, f, ensure_ascii=False, indent=2)
-        with open(os.path.join(processed_dump_dir, "checkin_hansoku.json"), "w", encoding="utf-8") as f:
-            json.dump(checkin_btn, f, ensure_ascii=False, indent=2)
-
-        for rel_path, payload in small_pages.items():
-            p = os.path.join(web_dir, rel_path)
-            os.makedirs(os.path.dirname(p), exist_ok=True)
-            with open(p, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-        for rel_path, cells_payload in cell_files.items():
-            p = os.path.join(web_dir, rel_path)
-            os.makedirs(os.path.dirname(p), exist_ok=True)
-            with open(p, "w", encoding="utf-8") as f:
-                json.dump(cells_payload, f, ensure_ascii=False, indent=2)
-
-        # フォルダ構成情報のJSON出力
+        writes = []
+        for name, payload, kwargs in (
+            ("menudb.json", products, {"indent": 2}),
+            ("categories.json", categories, {"indent": 2}),
+            ("submenus.json", submenus, {"indent": 2}),
+            ("soldout.json", soldout, {"indent": 2}),
+            ("jumpmenu.json", jump_btn, {"indent": 2}),
+            ("checkin_hansoku.json", checkin_btn, {"indent": 2}),
+        ):
+            if incremental.link_forward(f"web_content/processed_dump/{name}", PROCESSED_INPUTS[name]):
+                outputs.record(os.path.join(processed_dump_dir, name))
+                continue
+            writes.append(writer.submit(os.path.join(processed_dump_dir, name), payload, **kwargs))
+        writer.wait(writes)
+        profile.count(**outputs.tally("processed_dump"))
+
+    # フォルダ構成情報のJSON出力（raw_dump / processed_dump の出力が記録済みになってから）
+    def emit_dir_info():
         logger.info("フォルダ構成情報のJSON出力処理を開始します。")
-        dir_info = generate_dir_to_json(
-            processed_dump_dir, raw_dump_dir, web_dir)
-        with open(os.path.join(web_dir, "dir_info.json"), "w", encoding="utf-8") as f:
-            json.dump(dir_info, f, ensure_ascii=False, indent=2)
+        dir_info = make_dir_info(outputs.files())
+        writer.submit(os.path.join(web_dir, "dir_info.json"), dir_info, indent=2).result()
+        profile.count(**outputs.tally("dir_info.json"))
 
+    def export_all_assets(inventory, page_assets, categories, soldout, jump_btn, checkin_btn,
+                          incremental):
         logger.info("画像素材ファイルの出力処理を開始します。")
-        required_assets = collect_required_assets(small_pages)
+        required_assets = page_assets
         categories_assets = collect_category_assets(categories)
 
         assets_dir = os.path.join(web_dir, "assets")
 
-        if not args.skip_assets:
-            if os.path.isdir(assets_dir):
-                shutil.rmtree(assets_dir)
-            os.makedirs(assets_dir, exist_ok=True)
-
-            export_assets(
-                args.free,
-                args.osusume,
-                assets_dir,
-                required_assets=required_assets
-            )
-            export_assets(
-                args.free,
-                args.osusume,
-                assets_dir,
-                required_assets=categories_assets
-            )
-            export_soldout_assets(
-                args.free,
-                assets_dir,
-                soldout
-            )
-            export_jump_btn_assets(
-                args.free,
-                args.osusume,
-                assets_dir,
-                jump_btn
-            )
-            export_checkin_btn_assets(
-                args.free,
-                args.osusume,
-                assets_dir,
-                checkin_btn
-            )
+        if args.skip_assets:
+            return
+        if os.path.isdir(assets_dir):
+            shutil.rmtree(assets_dir)
+        os.makedirs(assets_dir, exist_ok=True)
+
+        # 元ファイルが前回から変わっていない素材は前回ビルドから引き継ぐ
+        def copy_file(src_path, dst_path):
+            linked = incremental.copy_asset(src_path, dst_path)
+            outputs.record(dst_path)
+            return linked
+
+        for copied, skipped, linked in (
+            export_assets(inventory, assets_dir, required_assets=required_assets,
+                          copy_file=copy_file),
+            export_assets(inventory, assets_dir, required_assets=categories_assets,
+                          copy_file=copy_file),
+            export_soldout_assets(inventory, assets_dir, soldout, copy_file=copy_file),
+            export_jump_btn_assets(inventory, assets_dir, jump_btn, copy_file=copy_file),
+            export_checkin_btn_assets(inventory, assets_dir, checkin_btn, copy_file=copy_file),
+        ):
+            profile.count(assets_copied=copied, assets_linked=linked, assets_skipped=skipped)
 
+    def emit_index_html():
         logger.info("index.html の生成処理を開始します。")
-        write_index_html(web_dir, show_dev_ui=args.show_dev_ui)
+        index_path = os.path.join(web_dir, "index.html")
+        write_index_html(web_dir, show_dev_ui=args.show_dev_ui, page_packs=args.page_packs)
+        outputs.record(index_path)
+        profile.count(**outputs.tally("index.html"))
+
+    def validate():
         validate_all(web_dir, processed_dump_dir)
 
-        # --- フォルダ内部のガイダンス処理を実施 ---
+    # --- フォルダ内部のガイダンス処理を実施 ---
+    def guidance():
         logger.info("案内図（guidance）の自動生成を開始します。")
         try:
             # 既存変数 web_dir をそのまま渡す
-            run_guidance_process(web_dir)
+            run_guidance_process(web_dir, emitter=writer.emitter)
             logger.info("案内図の生成に成功しました。")
         except Exception as e:
-            logger.warning(f"案内図の生成中にエラーが発生しましたが、処理を続行します: {e}")        
+            logger.warning(f"案内図の生成中にエラーが発生しましたが、処理を続行します: {e}")
+        names = ("folder_guidance.json", "folder_list.csv")
+        for name in names:
+            path = os.path.join(web_dir, name)
+            if os.path.isfile(path):
+                outputs.record(path)
+        profile.count(**outputs.tally(*names))
+
+    # --- 事前圧縮（--precompress）: テキスト出力の .gz / .br を隣に置く ---
+    def precompress_outputs():
+        if not args.precompress:
+            # 古い圧縮版が残っていると Nginx が古い内容を返すので消しておく
+            remove_sidecars(outputs)
+            return
+        logger.info("出力ファイルの事前圧縮を開始します。")
+        report = precompress(outputs, workers=args.writers)
+        for ext, stats in sorted(report.items()):
+            encoded = " ".join(
+                f"{name}={stats[name + '_bytes']}B(-{stats[name + '_saved']}B)"
+                for name in ("gz", "br") if name + "_bytes" in stats)
+            logger.info("事前圧縮 %s: ファイル数=%d 引き継ぎ=%d 元=%dB %s",
+                        ext, stats["files"], stats["reused"], stats["bytes"], encoded)
+            profile.count(bytes_saved=sum(v for k, v in stats.items() if k.endswith("_saved")))
+        # 圧縮し直した圧縮版と、前回の圧縮版を引き継いだ（そのまま残した）ものを分けて数える
+        sidecars = outputs.tally(sidecars=True)
+        profile.count(files_compressed=sidecars["files_written"],
+                      files_compressed_reused=sidecars["files_linked"] + sidecars["files_kept"],
+                      bytes_written=sidecars["bytes_written"])
+
+    # --- 出力マニフェスト（web_content の全出力のパス・サイズ・sha256） ---
+    def emit_build_manifest():
+        written = outputs.save(writer.emitter)
+        if written:
+            profile.count(files_written=1, bytes_written=written)
+        else:
+            profile.count(files_kept=1)
+        logger.info("出力マニフェスト: %s", outputs.summary())
+
+    return [
+        Stage("cache", open_cache, outputs=["cache"]),
+        Stage("ini", parse_ini, ["cache"], ["ini_bundle"]),
+        Stage("menudb", parse_menudb, ["cache"], ["menudb"]),
+        Stage("inventory", scan_inventory, outputs=["inventory"]),
+        Stage("incremental", fingerprint_inputs, ["inventory"], ["incremental"]),
+        Stage("manifest", load_manifest, outputs=["manifest"]),
+        Stage("osusume", parse_osusume, ["cache", "inventory", "manifest"], ["osusume"]),
+        Stage("osusume_ini", parse_osusume_ini, ["cache"], ["osusume_ini_bundle"]),
+        Stage("osusume_datas", parse_osusume_datas, ["cache"], ["osusume_datas"]),
+        Stage("datas", parse_datas, ["cache"], ["datas"]),
+        Stage("prune_cache", prune_cache, ["cache"],
+              after=["ini", "menudb", "osusume", "osusume_ini", "osusume_datas", "datas"]),
+        Stage("refs", build_refs, ["menudb"], ["refs"]),
+        Stage("raw_dump", raw_dump,
+              ["ini_bundle", "menudb", "osusume", "osusume_ini_bundle", "osusume_datas", "datas",
+               "incremental"]),
+        Stage("products", map_products, ["menudb", "ini_bundle"], ["products"]),
+        Stage("small_pages", emit_small_pages,
+              ["menudb", "refs", "osusume", "ini_bundle", "manifest", "incremental"],
+              ["page_index", "page_assets"]),
+        Stage("categories", map_categories,
+              ["inventory", "menudb", "refs", "ini_bundle", "page_index"], ["categories"]),
+        Stage("submenus", map_submenus, ["menudb", "refs"], ["submenus"]),
+        Stage("soldout", make_soldout_json, ["ini_bundle"], ["soldout"]),
+        Stage("jump_btns", make_jump_btns_json, ["inventory", "ini_bundle"], ["jump_btn"]),
+        Stage("checkin_btns", make_checkin_btns_json, ["inventory", "ini_bundle"], ["checkin_btn"]),
+        Stage("emit_processed", emit_processed,
+              ["products", "categories", "submenus", "soldout", "jump_btn", "checkin_btn",
+               "incremental"]),
+        Stage("dir_info", emit_dir_info, after=["raw_dump", "emit_processed"]),
+        Stage("assets", export_all_assets,
+              ["inventory", "page_assets", "categories", "soldout", "jump_btn", "checkin_btn",
+               "incremental"]),
+        Stage("index_html", emit_index_html),
+        Stage("validate", validate, after=["emit_processed", "index_html"]),
+        Stage("guidance", guidance, after=["small_pages"]),
+        Stage("precompress", precompress_outputs,
+              after=["raw_dump", "small_pages", "emit_processed", "dir_info", "assets",
+                     "index_html", "guidance"]),
+        Stage("build_manifest", emit_build_manifest, after=["precompress"]),
+    ]
+
+
+# ------------------------------------------------------------
+# ステージの実行
+# out_root（builds/{ref}）にステージを実行して出力し、各ステージの出力値を返す
+# cache / inventory: 呼び出し側（BuildSession）が保持している解析キャッシュ・インベントリ
+# initial / names: 保持している出力値を渡し、names のステージだけを実行する（出力のみのやり直し用）
+# ------------------------------------------------------------
+def execute_build(args, logger: logging.Logger, out_root: str, cache=None,
+                  inventory: Optional[SourceInventory] = None,
+                  initial: Optional[Dict] = None,
+                  names: Optional[Sequence[str]] = None) -> Dict:
+    web_dir = os.path.join(out_root, "web_content")
+    os.makedirs(os.path.join(web_dir, "raw_dump"), exist_ok=True)
+    os.makedirs(os.path.join(web_dir, "processed_dump"), exist_ok=True)
+
+    if args.incremental_from and args.incremental_from == os.path.basename(out_root):
+        raise ValueError("--incremental-from には今回と異なるビルドの ref を指定してください。")
+    # 独立したステージは --jobs の数だけ並行して実行する（1 なら宣言順に逐次実行）
+    profile = BuildProfile(jobs=args.jobs)
+    # 前回ビルドの build_manifest.json と内容が同じ出力は書き込まずに引き継ぐ
+    outputs = OutputManifest(web_dir, _previous_build(args))
+    # JSON の書き込みは全ステージで共有する書き込みプールで並行して行う（--writers）
+    with WriterPool(JsonEmitter(args.output_format), workers=args.writers,
+                    write_file=outputs.write) as writer:
+        stages = build_stages(args, logger, out_root, profile, cache=cache, inventory=inventory,
+                              writer=writer, outputs=outputs)
+        if names is not None:
+            stages = [stage for stage in stages if stage.name in names]
+            # 実行するステージが作り直す値は initial から外す
+            produced = {value for stage in stages for value in stage.outputs}
+            initial = {k: v for k, v in (initial or {}).items() if k not in produced}
+        values = run_stages(stages, jobs=args.jobs, initial=initial, profile=profile)
+
+    # 次回の差分ビルド用に入力のフィンガープリントを残す
+    incremental = values["incremental"]
+    incremental.save()
+    logger.info("差分ビルド: %s", incremental.summary())
+
+    # ステージ別の時間・メモリ・件数を build_profile.json に残す
+    report = profile.save(out_root, [stage.name for stage in stages])
+    logger.info("ビルドプロファイル: %s", BuildProfile.summary(report))
+    return values
+
+
+def log_build_error(logger: logging.Logger, args, e: Exception):
+    logger.error("WebMenuGenerate 処理中にエラーが発生しました。")
+    logger.error("エラー種別: %s", type(e).__name__)
+    logger.error("エラーメッセージ: %s", str(e))
+    logger.error("入力パラメータ: ref=%s, out=%s, free=%s, osusume=%s, schema_version=%s",
+                 args.ref, args.out, args.free, args.osusume, args.schema_version)
+    logger.exception("スタックトレース詳細")
+
+
+# ------------------------------------------------------------
+# パイプライン実行（一回限りのビルド）
+# メニュー関連データを読み込んで加工し、Web向けに出力する一連の処理
+# 複数回ビルドする場合は解析結果を保持する BuildSession（session.py）を使う
+# args: コマンドライン引数オブジェクト
+# 戻り値: ビルドディレクトリ（builds/{ref}）のパス
+# ------------------------------------------------------------
+def run_pipeline(args, cache=None, inventory: Optional[SourceInventory] = None):
+    logger = setup_logger()
+    logger.info("WebMenuGenerate 処理を開始します。")
+
+    try:
+        # ★ここから下、関数内に「import json, os」は置かない！
+        ref = args.ref or datetime.datetime.now().strftime("%Y%m%d-%H%M%S-000000")
+        out_root = os.path.join(args.out, "builds", ref)
+        execute_build(args, logger, out_root, cache=cache, inventory=inventory)
         logger.info(f"WebMenuGenerate 処理が正常に完了いたしました。出力先: {out_root}")
+        return out_root
 
     except Exception as e:
-        logger.error("WebMenuGenerate 処理中にエラーが発生しました。")
-        logger.error("エラー種別: %s", type(e).__name__)
-        logger.error("エラーメッセージ: %s", str(e))
-        logger.error("入力パラメータ: ref=%s, out=%s, free=%s, osusume=%s, schema_version=%s",
-                     args.ref, args.out, args.free, args.osusume, args.schema_version)
-        logger.exception("スタックトレース詳細")
+        log_build_error(logger, args, e)
         raise
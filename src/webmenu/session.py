@@ -0,0 +1,182 @@
+# ============================================================
+# プロセス内で繰り返しビルドするための API（webmenu.BuildSession）
+# - 解析結果（MemoryParseCache）・入力インベントリ・直近ビルドの出力値を保持
+# - 変わっていない入力は再解析せず、ビルドのたびに import・ロガー設定もやり直さない
+# - CLI の generate / watch もこのクラスを経由してビルドする
+# ============================================================
+import argparse
+import datetime
+import os
+from typing import Dict, Optional, Tuple
+
+from .pipeline import execute_build, log_build_error, setup_logger
+from .core.inventory import FREE, OSUSUME, SourceInventory
+from .core.parse_cache import MemoryParseCache, ParseCache
+
+# build() の options で指定できる項目と既定値（CLI のビルドオプションと同じ名前）
+BUILD_OPTIONS = {
+    "schema_version": "0.1",
+    "skip_assets": False,
+    "skip_raw_dump": False,
+    "show_dev_ui": False,
+    "menudb_engine": "python",
+    "jobs": 1,
+    "incremental_from": "",
+    "output_format": "compact",
+    "writers": 4,
+    "page_packs": False,
+    "precompress": False,
+}
+
+# emit() で実行するステージ（解析は行わず、保持している出力値を書き出す。
+# 小分類ページは保持しないので、保持している解析結果から生成し直しながら書き出す）
+EMIT_STAGES = ("incremental", "raw_dump", "small_pages", "emit_processed", "dir_info",
+               "assets", "index_html", "validate", "guidance", "precompress",
+               "build_manifest")
+
+
+# ------------------------------------------------------------
+# 入力の変更検知用シグネチャ（相対パス -> (サイズ, 更新日時)）
+# 画像・おすすめはインベントリの走査結果を使う
+# ------------------------------------------------------------
+def source_signature(free_dir: str, inventory: SourceInventory) -> Dict[str, Tuple[int, int]]:
+    signature = {}
+    for root in (FREE, OSUSUME):
+        for sub, _, files in inventory.walk(root):
+            for name in files:
+                rel = f"{sub}/{name}" if sub else name
+                st = inventory.stat(root, rel)
+                if st is not None:
+                    signature[f"{root}/{rel}"] = (st.st_size, st.st_mtime_ns)
+    for name in ("config", "datas"):
+        top = os.path.join(free_dir, name)
+        for dirpath, _, files in os.walk(top):
+            for fname in files:
+                path = os.path.join(dirpath, fname)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                rel = os.path.relpath(path, top).replace(os.sep, "/")
+                signature[f"{name}/{rel}"] = (st.st_size, st.st_mtime_ns)
+    return signature
+
+
+def _changed_count(old: Optional[Dict], new: Dict) -> int:
+    if old is None:
+        return len(new)
+    return sum(1 for k in old.keys() | new.keys() if old.get(k) != new.get(k))
+
+
+class BuildSession:
+    """free / osusume / 出力先ごとのビルドセッション。
+
+    session = BuildSession("dataSrc/free", "dataSrc/osusume", "outroot")
+    session.build("20250917-dev", {"jobs": 4})
+    session.refresh_inputs()            # 入力を再走査（変更ファイル数を返す）
+    session.build("20250917-dev2", {"incremental_from": session.last_ref})
+    session.emit("preview/build")       # 直近ビルドの出力値を別ディレクトリへ書き出す
+
+    解析結果はファイルのパス・サイズ・更新日時をキーに保持するので、変わっていない入力は
+    次のビルドで再解析しない。インベントリは refresh_inputs() を呼ぶまで更新しない。
+    スレッドセーフではない（build / emit は同時に呼ばないこと）。
+    """
+
+    def __init__(self, free: str, osusume: str, out: str, cache_dir: str = "",
+                 cache_max_mb: int = 512, logger=None):
+        self.free = free
+        self.osusume = osusume
+        self.out = out
+        self.logger = logger or setup_logger()
+        disk = ParseCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024) if cache_dir else None
+        self.cache = MemoryParseCache(disk)
+        self.inventory: Optional[SourceInventory] = None
+        self.signature: Optional[Dict[str, Tuple[int, int]]] = None
+        # 直近のビルドで使った入力のシグネチャ（失敗したビルドも含む）
+        self.built_signature: Optional[Dict[str, Tuple[int, int]]] = None
+        # 直近に成功したビルドの ref・ディレクトリ・全ステージの出力値（解析結果・変換結果）
+        self.last_ref = ""
+        self.last_out_root = ""
+        self.results: Dict = {}
+        self._options: Optional[argparse.Namespace] = None
+
+    @classmethod
+    def from_args(cls, args, logger=None) -> "BuildSession":
+        """CLI の引数（generate / watch）からセッションを作る。"""
+        return cls(args.free, args.osusume, args.out, cache_dir=args.cache_dir,
+                   cache_max_mb=args.cache_max_mb, logger=logger)
+
+    def refresh_inputs(self) -> int:
+        """入力ディレクトリを再走査し、前回の走査から変わったファイル数を返す（初回は全件数）。"""
+        inventory = SourceInventory(self.free, self.osusume)
+        signature = source_signature(self.free, inventory)
+        changed = _changed_count(self.signature, signature)
+        self.inventory, self.signature = inventory, signature
+        return changed
+
+    def pending_changes(self) -> int:
+        """直近のビルド以降に変わったファイル数（refresh_inputs の走査結果で比較する）。"""
+        if self.signature is None:
+            self.refresh_inputs()
+        return _changed_count(self.built_signature, self.signature)
+
+    def _namespace(self, ref: str, options) -> argparse.Namespace:
+        if options is None:
+            options = {}
+        elif isinstance(options, dict):
+            unknown = set(options) - set(BUILD_OPTIONS)
+            if unknown:
+                raise ValueError(f"unknown build options: {', '.join(sorted(unknown))}")
+        else:
+            # CLI の引数オブジェクト（監視用などビルド以外の項目は無視する）
+            options = vars(options)
+        values = {key: options.get(key, default) for key, default in BUILD_OPTIONS.items()}
+        values.update(free=self.free, osusume=self.osusume, out=self.out, ref=ref)
+        return argparse.Namespace(**values)
+
+    def build(self, ref: str = "", options=None) -> str:
+        """builds/{ref} にビルドし、ビルドディレクトリのパスを返す。
+
+        options は BUILD_OPTIONS の項目を持つ dict（または CLI の引数オブジェクト）。
+        ref を省略すると日時から作る。
+        """
+        ref = ref or datetime.datetime.now().strftime("%Y%m%d-%H%M%S-000000")
+        args = self._namespace(ref, options)
+        if self.inventory is None:
+            self.refresh_inputs()
+        out_root = os.path.join(self.out, "builds", ref)
+        self.built_signature = self.signature
+        # 前回の変換結果は今回のビルドで作り直すので先に手放す
+        self.results = {}
+        self.logger.info("WebMenuGenerate 処理を開始します。")
+        try:
+            values = execute_build(args, self.logger, out_root,
+                                   cache=self.cache, inventory=self.inventory)
+        except Exception as e:
+            log_build_error(self.logger, args, e)
+            raise
+        self.results = values
+        self.last_ref, self.last_out_root = ref, out_root
+        self._options = args
+        self.logger.info(f"WebMenuGenerate 処理が正常に完了いたしました。出力先: {out_root}")
+        return out_root
+
+    def emit(self, target: str) -> str:
+        """直近のビルドの出力値を target（ビルドディレクトリと同じ構成）に書き出す。
+
+        解析はやり直さない（小分類ページのみ生成し直す）。書き出した target のパスを返す。
+        """
+        if not self.results:
+            raise RuntimeError("emit の前に build を完了してください。")
+        args = argparse.Namespace(**vars(self._options))
+        args.incremental_from = ""
+        self.logger.info("ビルド結果の出力を開始します: %s", target)
+        try:
+            execute_build(args, self.logger, target, cache=self.cache,
+                          inventory=self.results["inventory"], initial=self.results,
+                          names=EMIT_STAGES)
+        except Exception as e:
+            log_build_error(self.logger, args, e)
+            raise
+        self.logger.info("ビルド結果を出力しました: %s", target)
+        return target
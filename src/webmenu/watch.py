@@ -0,0 +1,96 @@
+# ============================================================
+# 常駐ビルド（webmenu watch）
+# - dataSrc/free・dataSrc/osusume をポーリングで監視
+# - 変更があれば前回ビルドを引き継いで再ビルド（--incremental-from 相当）
+# - 解析結果・インベントリは BuildSession としてプロセス内に保持
+# - 状態・結果は状態ファイル（JSON）で通知する
+# ============================================================
+import datetime
+import os
+import shutil
+import time
+from typing import List, Optional
+
+from .core.status_file import now, write_status
+from .session import BuildSession
+
+STATUS_FILE = "watch_status.json"
+
+
+def _new_ref(out: str) -> str:
+    base = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-watch")
+    ref, n = base, 1
+    while os.path.exists(os.path.join(out, "builds", ref)):
+        n += 1
+        ref = f"{base}{n}"
+    return ref
+
+
+# ------------------------------------------------------------
+# 常駐ループ
+# args: watch サブコマンドの引数（generate と同じビルドオプション + 監視オプション）
+# max_builds: テスト・検証用（指定回数ビルドしたら終了）
+# ------------------------------------------------------------
+def run_watch(args, max_builds: Optional[int] = None):
+    session = BuildSession.from_args(args)
+    logger = session.logger
+    status_path = args.status_file or os.path.join(args.out, STATUS_FILE)
+    # state: watching（待機中）/ building（ビルド中）/ stopped
+    # last: 直近のビルド結果（result は done / error）
+    status = {"pid": os.getpid(), "state": "watching", "builds": 0, "last": None}
+    watch_refs: List[str] = []
+
+    logger.info("監視を開始します。free=%s osusume=%s 間隔=%ss", args.free, args.osusume, args.interval)
+    write_status(status_path, status)
+    try:
+        while max_builds is None or status["builds"] < max_builds:
+            session.refresh_inputs()
+            if not session.pending_changes():
+                time.sleep(args.interval)
+                continue
+
+            # 展開途中のファイルを拾わないよう、一定間隔変化が無くなるまで待つ
+            time.sleep(args.interval)
+            if session.refresh_inputs():
+                continue
+
+            changed = session.pending_changes()
+            ref = _new_ref(args.out)
+            args.ref = ref
+            args.incremental_from = session.last_ref
+            last = {"ref": ref, "result": None, "changed_files": changed,
+                    "started_at": now(), "finished_at": None, "duration_s": None,
+                    "out_root": None, "error": None}
+            status.update(state="building", current=last)
+            write_status(status_path, status)
+            logger.info("入力の変更を検知しました（%d ファイル）。ビルドを開始します: %s", changed, ref)
+
+            start = time.perf_counter()
+            try:
+                out_root = session.build(ref, args)
+            except Exception as e:
+                # 失敗したビルドは引き継ぎ元にしない（入力が変わるまで再試行しない）
+                last.update(result="error", error=f"{type(e).__name__}: {e}")
+            else:
+                watch_refs.append(ref)
+                last.update(result="done", out_root=out_root)
+                _remove_old_builds(args.out, watch_refs, args.keep_builds, logger)
+            last.update(finished_at=now(), duration_s=round(time.perf_counter() - start, 3))
+            status["builds"] += 1
+            status.pop("current", None)
+            status.update(state="watching", last=last)
+            write_status(status_path, status)
+            logger.info("解析キャッシュ: %s", session.cache.summary())
+    except KeyboardInterrupt:
+        logger.info("監視を終了します。")
+    status.pop("current", None)
+    status["state"] = "stopped"
+    write_status(status_path, status)
+
+
+def _remove_old_builds(out: str, watch_refs: List[str], keep: int, logger):
+    """watch が作ったビルドのうち古いものを削除する（keep 件を残す。0 以下なら削除しない）。"""
+    while keep > 0 and len(watch_refs) > keep:
+        ref = watch_refs.pop(0)
+        shutil.rmtree(os.path.join(out, "builds", ref), ignore_errors=True)
+        logger.info("古いビルドを削除しました: %s", ref)
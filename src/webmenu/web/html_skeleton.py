@@ -1,6 +1,8 @@
 from pathlib import Path
 from textwrap import dedent
 
+from ..dumpers.json_writer import write_bytes
+
 _HTML_BEFORE_STYLE = """<!DOCTYPE html>
 <html lang="ja">
 <head>
@@ -287,7 +289,9 @@ const CANVAS_WIDTH = 1000;
 const CANVAS_HEIGHT = 533;
 const ABS_COLS = 40;
 const ABS_ROWS = 20;
-const cache = { products: null, categories: null, cells: new Map(), soldout_settings: null };
+const cache = { products: null, categories: null, cells: new Map(), soldout_settings: null, packs: new Map(), submenus: null };
+// --page-packs でビルドした場合は小分類ページ・セル座標を大分類ごとのパックから読む
+const PAGE_PACKS = __PAGE_PACKS__;
 
 // 現在の言語設定を維持する
 let currentLangPath = "default";
@@ -314,6 +318,30 @@ async function fetchJson(path) {
   return res.json();
 }
 
+// 大分類のページパック（packs/L<nn>.json）を一度だけ取得する（取得できなければ null）
+function ensurePack(packPath) {
+  if (!cache.packs.has(packPath)) {
+    cache.packs.set(packPath, fetchJson(`./${packPath}`).catch(err => {
+      console.warn(`pack ${packPath} を取得できません:`, err);
+      return null;
+    }));
+  }
+  return cache.packs.get(packPath);
+}
+
+// small/ 配下の JSON を取得する（パックがあればパックから、無ければ個別ファイルから）
+async function fetchPageJson(path) {
+  const m = PAGE_PACKS ? path.match(/^small[/]sm-([0-9]{2})/) : null;
+  if (m) {
+    const pack = await ensurePack(`packs/L${m[1]}.json`);
+    const data = pack?.files?.[path];
+    if (data) {
+      return data;
+    }
+  }
+  return fetchJson(`./${path}`);
+}
+
 async function ensureProducts() {
   if (cache.products) {
     return cache.products;
@@ -339,7 +367,7 @@ async function ensureCells(path) {
   if (cache.cells.has(path)) {
     return cache.cells.get(path);
   }
-  const data = await fetchJson(`./${path}`);
+  const data = await fetchPageJson(path);
   cache.cells.set(path, data);
   return data;
 }
@@ -354,6 +382,32 @@ async function ensureSoldoutSettings() {
   return soldout_settings;
 }
 
+// サブメニュー（processed_dump/submenus.json）を一度だけ取得する
+async function ensureSubmenus() {
+  if (!cache.submenus) {
+    cache.submenus = fetchJson('./processed_dump/submenus.json').catch(err => {
+      console.warn('submenus.json を取得できません:', err);
+      cache.submenus = null;
+      return { items: {}, pages: {} };
+    });
+  }
+  return cache.submenus;
+}
+
+// 商品のサブメニューを返す（無ければ null）
+// pages は到達順のページ（{id, show_type, background, children, links}）
+async function getSubmenu(productCode) {
+  const submenus = await ensureSubmenus();
+  const item = submenus.items?.[String(productCode)];
+  if (!item) {
+    return null;
+  }
+  const pages = (item.pages || [])
+    .filter(id => submenus.pages?.[id])
+    .map(id => ({ id, ...submenus.pages[id] }));
+  return { ...item, pages };
+}
+
 function applyBackground(canvasEl, page) {
   const bg = page.background ? `url(./assets/${page.background})` : 'none';
   canvasEl.style.backgroundImage = bg;
@@ -643,8 +697,12 @@ async function run() {
   }
 
   try {
-    const productMap = await ensureProducts();
-    const page = await fetchJson(`./small/${sid}/page-1.json`);
+    // 商品・ページ・品切れ設定は並行して取得する
+    const [productMap, page, soldout_settings] = await Promise.all([
+      ensureProducts(),
+      fetchPageJson(`small/${sid}/page-1.json`),
+      ensureSoldoutSettings(),
+    ]);
 
     const uniquePaths = Array.from(new Set((page.grid_items || []).map(it => it.cells_path).filter(Boolean)));
     const cellsData = {};
@@ -655,7 +713,6 @@ async function run() {
     applyBackground(canvas, page);
     const layout = layoutCanvas(page.grid_items || []);
     const layoutType = page.layout_type || page.page_meta?.layout_type || 'free';
-    const soldout_settings = await ensureSoldoutSettings();
     renderTiles(grid, page.grid_items || [], productMap, layout, cellsData, layoutType, soldout_settings);
 
     log.textContent = `Loaded ${sid} (items: ${page.grid_items?.length || 0}, layout: ${page.layout_type})`;
@@ -781,7 +838,7 @@ async function refreshAllImages() {
     }
         
     const productMap = await ensureProducts();
-    const page = await fetchJson(`./small/${sid}/page-1.json`);
+    const page = await fetchPageJson(`small/${sid}/page-1.json`);
     const gridItems = page.grid_items || [];
     
     const imgs = document.querySelectorAll('img[data-code]');
@@ -1078,12 +1135,13 @@ def _build_css(show_dev_ui: bool) -> str:
     return "\n\n".join(parts) + "\n"
 
 
-def build_index_html(show_dev_ui: bool = False) -> str:
+def build_index_html(show_dev_ui: bool = False, page_packs: bool = False) -> str:
     css = _build_css(show_dev_ui)
-    return "".join([_HTML_BEFORE_STYLE, css, _HTML_AFTER_STYLE])
+    script = _HTML_AFTER_STYLE.replace("__PAGE_PACKS__", "true" if page_packs else "false")
+    return "".join([_HTML_BEFORE_STYLE, css, script])
 
 
-def write_index_html(web_dir: str, show_dev_ui: bool = False) -> None:
+def write_index_html(web_dir: str, show_dev_ui: bool = False, page_packs: bool = False) -> None:
     p = Path(web_dir) / "index.html"
     p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(build_index_html(show_dev_ui), encoding="utf-8")
+    write_bytes(str(p), build_index_html(show_dev_ui, page_packs).encode("utf-8"))
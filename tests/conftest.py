@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# パッケージ未インストールでも src/ から import できるようにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from legacy_data import make_legacy_source  # noqa: E402
+
+
+@pytest.fixture
+def legacy_src(tmp_path):
+    """tmp_path に生成したレガシーデータの (free, osusume)。"""
+    return make_legacy_source(str(tmp_path / "src"))
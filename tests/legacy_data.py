@@ -0,0 +1,221 @@
+"""テスト用の小さなレガシーデータ（free / osusume）を生成する。
+
+menudb.dat は menudb_reader のオフセット定義から組み立て、
+free/config・datas・images と osusume のバリアントを最小構成で置く。
+"""
+import os
+import struct
+
+from webmenu.parsers import menudb_reader as R
+
+
+MENU_INI = """; comment
+[soldout]
+BackImgName=soldback.png
+FrmBtnImgName=sold1.png
+FrmBtnImgName2=sold2.png
+CellBtnImgName=cell1.png
+[osusume]
+UseItemSort=1
+SortHideFrame=0
+SortSoldoutState=1
+SortSoldoutState2=0
+[hm]
+SoldOutState=1
+SoldOutState3=2
+[checkin_hansoku]
+UseCheckinHansoku=1
+LockScr=0
+Scr1BackImgName=ck_back.png
+Scr1Btn1Image=ck_b1.png
+Scr1Btn1Type=1,2
+Scr1Btn1Pos=10,20
+Scr1Btn2Image=ck_b2.png
+Scr1Btn2Pos=30,40
+Scr2Btn1Type=3
+[dup]
+Key=a
+Key=b
+Key=c
+"""
+
+JUMPMENU_INI = """[jumpmenu]
+JmpMenu1No=1,2
+JmpMenu1BtnImg=jmp1.png
+JmpMenu2BtnImg=jmp2.png
+JmpMenu2No=3
+"""
+
+
+def sj(s, n=16):
+    b = s.encode("shift_jis")[:n]
+    return b + b"\0" * (n - len(b))
+
+
+def u16(s, n):
+    b = s.encode("utf-16-be")[: n * 2]
+    return b + b"\0" * (n * 2 - len(b))
+
+
+def build_menudb(scale: int = 1) -> bytes:
+    """L3 x M2（各 M に小分類 2 件、L2/M1 はおすすめ）の menudb.dat。"""
+    L, M = 3, 2
+    # 各 (L, M) に小分類 2 件。L2/M1 は showType 6（おすすめ）
+    sm_specs = []
+    for l in range(L):
+        for m in range(M):
+            for s in range(2):
+                st = 6 if (l == 1 and m == 0) else 0
+                sm_specs.append((l, m, s, st))
+    SMenuNum = len(sm_specs)
+    ItemInfoNum = 40 * scale
+    cells_per_sm = 6
+    ItemCellNum = SMenuNum * cells_per_sm * scale
+    ItemFrmNum = 3
+    SubCodeNum, SubSmNum, SubCellNum, SubFrmNum = 2, 2, 4, 0
+
+    lbase = R.LMENU_INFORMATION
+    mbase = lbase + R.LMENU_INFORMATION_SIZE * L
+    smbase = mbase + R.MMENU_INFORMATION_SIZE * L * M
+    cbase = smbase + R.SMENU_INFORMATION_SIZE * SMenuNum
+    fbase = cbase + R.ITEM_CELL_INFORMATION_SIZE * ItemCellNum
+    ibase = fbase + R.ITEM_FRAME_INFORMATION_SIZE * ItemFrmNum
+    subcode_base = ibase + R.ITEM_INFORMATION_SIZE * ItemInfoNum
+    subsm_base = subcode_base + 16 * SubCodeNum
+    subcell_base = subsm_base + R.SMENU_INFORMATION_SIZE * SubSmNum
+    end = subcell_base + R.ITEM_CELL_INFORMATION_SIZE * SubCellNum
+
+    buf = bytearray(end)
+    struct.pack_into(">I", buf, 0, end)
+    buf[4] = L; buf[5] = M; buf[6] = 40; buf[7] = 20
+    struct.pack_into(">IIIIIIII", buf, 8, SMenuNum, ItemCellNum, ItemFrmNum, ItemInfoNum,
+                     SubCodeNum, SubSmNum, SubCellNum, SubFrmNum)
+    for l in range(L):
+        off = lbase + R.LMENU_INFORMATION_SIZE * l
+        buf[off] = 1 if l != 2 or True else 0; buf[off + 1] = l % 2; buf[off + 2] = 1
+        buf[off + 4:off + 20] = sj(f"L{l+1}.png"); struct.pack_into(">I", buf, off + 20, 7)
+        buf[off + 24:off + 40] = sj(f"LB{l+1}.png")
+        buf[off + 44:off + 60] = sj("off.png"); buf[off + 64:off + 80] = sj("on.png")
+        buf[off + 84:off + 100] = sj("" if l else "mmback.png")
+    for l in range(L):
+        for m in range(M):
+            off = mbase + R.MMENU_INFORMATION_SIZE * (l * M + m)
+            buf[off] = 0 if (l == 2 and m == 1) else 1
+            buf[off + 4:off + 20] = sj(f"M{l+1}{m+1}on.png")
+            buf[off + 24:off + 40] = sj(f"M{l+1}{m+1}off.png")
+            struct.pack_into(">I", buf, off + 44, 2)
+            first = sm_specs.index((l, m, 0, sm_specs[(l * M + m) * 2][3]))
+            struct.pack_into(">I", buf, off + 48, smbase + R.SMENU_INFORMATION_SIZE * first)
+    ci = 0
+    for si, (l, m, s, st) in enumerate(sm_specs):
+        off = smbase + R.SMENU_INFORMATION_SIZE * si
+        buf[off] = st; buf[off + 1] = s
+        n = cells_per_sm * scale
+        struct.pack_into(">I", buf, off + 4, n if st == 0 else 0)
+        struct.pack_into(">I", buf, off + 8, 0xffc0c0c0)
+        buf[off + 12:off + 28] = sj(f"bk{si}.jpg" if si % 3 else "")
+        struct.pack_into(">I", buf, off + 32, cbase + R.ITEM_CELL_INFORMATION_SIZE * ci)
+        for k in range(n):
+            coff = cbase + R.ITEM_CELL_INFORMATION_SIZE * ci
+            buf[coff] = k % 3; buf[coff + 1] = 1 + (k % 4) * 2; buf[coff + 2] = 1 + (k // 4) % 200
+            buf[coff + 4:coff + 36] = u16(f"セル{ci}" if k % 2 else "", 16)
+            buf[coff + 36] = 15; buf[coff + 37] = k % 2
+            struct.pack_into(">I", buf, coff + 44, 0)
+            item = (ci // 2) % ItemInfoNum
+            addr = ibase + R.ITEM_INFORMATION_SIZE * item if k != 5 else 0
+            struct.pack_into(">I", buf, coff + 48, addr)
+            ci += 1
+    for fi in range(ItemFrmNum):
+        off = fbase + R.ITEM_FRAME_INFORMATION_SIZE * fi
+        buf[off] = 1; buf[off + 1] = fi; buf[off + 2] = fi
+        buf[off + 4:off + 20] = sj(f"fr{fi}.png")
+        buf[off + 24:off + 88] = u16(f"フレーム{fi}", 32)
+        buf[off + 92:off + 108] = u16("100", 8)
+        buf[off + 104:off + 120] = u16("110", 8)
+        buf[off + 116:off + 180] = u16("説明", 32)
+        struct.pack_into(">I", buf, off + 184, ibase)
+    for ii in range(ItemInfoNum):
+        off = ibase + R.ITEM_INFORMATION_SIZE * ii
+        struct.pack_into(">i", buf, off, 101 + 2 * ii)
+        buf[off + 4] = ii % 2; buf[off + 5] = ii % 3 == 0; buf[off + 6] = 1
+        struct.pack_into(">ii", buf, off + 8, 100 + ii, 110 + ii)
+        buf[off + 16:off + 80] = u16(f" 商品{ii}　エビ " if ii % 5 else "", 32)
+        buf[off + 80] = ii % 4; buf[off + 81] = 2 if ii in (0, 3) else 0; buf[off + 82] = 1 if ii == 0 else 0
+        if ii == 0:
+            struct.pack_into(">I", buf, off + 84, subsm_base)
+        if ii == 3:
+            struct.pack_into(">I", buf, off + 84, subsm_base + R.SMENU_INFORMATION_SIZE)
+        struct.pack_into(">I", buf, off + 88, ii)
+        if ii == 1:
+            struct.pack_into(">I", buf, off + 92, ibase + R.ITEM_INFORMATION_SIZE * 2)
+        buf[off + 96:off + 112] = sj(f"i{ii}.jpg" if ii % 2 else ("画像.jpg" if ii == 4 else ""))
+        buf[off + 116:off + 116 + 256] = u16(f"コメント{ii}" * (ii % 7), 128)
+    for k in range(SubCodeNum):
+        struct.pack_into(">IIII", buf, subcode_base + 16 * k, 101, 103 + 2 * k, k, k)
+    for k in range(SubSmNum):
+        off = subsm_base + R.SMENU_INFORMATION_SIZE * k
+        struct.pack_into(">I", buf, off + 4, 2)
+        struct.pack_into(">I", buf, off + 32, subcell_base + R.ITEM_CELL_INFORMATION_SIZE * 2 * k)
+    for k in range(SubCellNum):
+        off = subcell_base + R.ITEM_CELL_INFORMATION_SIZE * k
+        buf[off] = 0; buf[off + 1] = k; buf[off + 2] = 1
+        struct.pack_into(">I", buf, off + 48, ibase + R.ITEM_INFORMATION_SIZE * (5 + k))
+    return bytes(buf)
+
+
+def write_text(path, text, enc="shift_jis"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding=enc, newline="") as f:
+        f.write(text)
+
+
+def write_bytes(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def make_legacy_source(root: str, scale: int = 1):
+    """root/free と root/osusume を作り、(free, osusume) のパスを返す。"""
+    free = os.path.join(root, "free")
+    osu = os.path.join(root, "osusume")
+    write_bytes(os.path.join(free, "datas", "menudb.dat"), build_menudb(scale))
+    write_text(f"{free}/config/menu.ini", MENU_INI)
+    write_text(f"{free}/config/jumpmenu.ini", JUMPMENU_INI)
+    write_text(f"{free}/config/other.ini", "[x]\nA=日本語\n")
+    for name in ["L1.png", "L2.png", "LB1.png", "on.png", "M11on.png", "M21off.png", "i1.jpg", "i3.jpg", "画像.jpg",
+                 "bk1.jpg", "bk2.jpg", "soldback.png", "sold1.png", "jmp1.png", "ck_back.png", "ck_b1.png", "mmback.png"]:
+        write_bytes(f"{free}/images/{name}", b"\x89PNG" + name.encode() * 50)
+    for name in ["L1.png", "jmp1.png", "ck_b1.png", "sold1.png"]:
+        write_bytes(f"{free}/images/en-US/{name}", b"EN" + name.encode() * 30)
+    for name in ["L2.png", "jmp2.png"]:
+        write_bytes(f"{osu}/smenu/menu/images/{name}", b"OS" + name.encode() * 30)
+    write_bytes(f"{osu}/smenu/menu/images/en-US/L1.png", b"OSEN" * 30)
+    write_text(f"{free}/datas/iteminfoLang.csv", "ItemCode,Name\n101,エビ\n103,特大エビ\nx,bad\n", "utf-8")
+    write_text(f"{free}/datas/en-US/iteminfoLang.csv", "#c\n101\tShrimp\n103\tBig, shrimp\n", "utf-8")
+
+    # おすすめ（L2/M1 は固定レイアウトと itemcell の 2 バリアント、L3/M1 は 1 バリアント）
+    def variant(l, m, v, fixed):
+        d = f"{osu}/smenu/{l:02d}/{m:02d}/{v:02d}"
+        os.makedirs(d + "/en-US", exist_ok=True)
+        if fixed:
+            write_text(d + "/frameinf.ini", "[layout]\nlayout=4\nshow=1\n[frame01]\nitemcode=0101\ntanka=100\ntext1str=あ\n[frame02]\nitemcode=103\nshow=0\n[frame03]\nitemcode=105\n[frame04]\nitemcode=\n")
+            for i in range(1, 4):
+                write_bytes(f"{d}/0101010{i}.png", b"F" * 40)
+                write_bytes(f"{d}/en-US/0101010{i}.png", b"FE" * 40)
+            write_bytes(f"{d}/back.jpg", b"B" * 40)
+        else:
+            write_text(d + "/frameinf.ini", "[layout]\nlayout=0\n[frame01]\nitemcode=107\n[frame02]\nitemcode=109\n")
+            write_text(d + "/itemcell.csv", "a,b,c,d,1,1,107\na,b,c,d,2,1,107\na,b,c,d,1,2,109\na,b,c,d,x,1,109\na,b,c,d,3,3,111\n")
+            write_bytes(f"{d}/010101.png", b"G" * 40)
+            write_bytes(f"{d}/Thumbs.db", b"T")
+
+    variant(2, 1, 1, True)
+    variant(2, 1, 2, False)
+    variant(3, 1, 1, False)
+    write_text(f"{osu}/smenu/menu/datas/lname.csv", "1,肉\n2,魚\n", "cp932")
+    write_text(f"{osu}/smenu/menu/datas/mname.csv", "1,1,牛\n1,2,豚\n", "utf-8-sig")
+    write_text(f"{osu}/smenu/menu/datas/en-US/lname.csv", "1,Meat\n2,Fish\n", "utf-8")
+    write_text(f"{osu}/smenu/menu/datas/iteminfo_mdel.csv", "ItemCode,Name,P,T,M\n101, エビ ,100,110,100\n", "cp932")
+    write_text(f"{osu}/smenu/menu/datas/smenu.ini", "[a]\nb=c\n")
+    return free, osu
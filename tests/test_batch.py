@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+
+import pytest
+
+from webmenu import batch
+
+_build_store = batch.build_store
+
+
+def _dying_build_store(entry, *args):
+    # ワーカープロセスの異常終了（OOM などで強制終了された場合）を再現する
+    if entry["store_id"] == "b":
+        os._exit(1)
+    return _build_store(entry, *args)
+
+
+def test_worker_crash_is_recorded_and_summary_is_written(tmp_path, legacy_src, monkeypatch):
+    free, osusume = legacy_src
+    manifest = tmp_path / "stores.json"
+    manifest.write_text(json.dumps([
+        {"store_id": store_id, "free": free, "osusume": osusume, "out": str(tmp_path / store_id)}
+        for store_id in ("a", "b")]), encoding="utf-8")
+    log_dir = tmp_path / "logs"
+    args = argparse.Namespace(manifest=str(manifest), workers=1, ref="r1", log_dir=str(log_dir),
+                              cache_dir="", cache_max_mb=0, skip_assets=True)
+    monkeypatch.setattr(batch, "build_store", _dying_build_store)
+
+    summary = batch.run_batch(args)
+
+    assert [status["store_id"] for status in summary["results"]] == ["a", "b"]
+    failed = summary["results"][1]
+    assert failed["result"] == "error"
+    assert "BrokenProcessPool" in failed["error"]
+    assert summary["done"] + summary["error"] == 2
+    with open(log_dir / batch.SUMMARY_FILE, encoding="utf-8") as f:
+        assert json.load(f) == summary
+    with open(log_dir / "b.json", encoding="utf-8") as f:
+        assert json.load(f) == failed
+
+
+def test_manifest_rejects_entries_building_the_same_out_and_ref(tmp_path):
+    manifest = tmp_path / "stores.json"
+
+    def load(stores, default_ref="r1"):
+        manifest.write_text(json.dumps(stores), encoding="utf-8")
+        return batch.load_manifest(str(manifest), default_ref)
+
+    store = {"free": "free", "osusume": "osusume", "out": "out"}
+    with pytest.raises(ValueError, match="same out and ref as store_id 'a'"):
+        load([dict(store, store_id="a"), dict(store, store_id="b", out="./out/")])
+    # 個別の ref がバッチ共通の ref と同じ場合も同じビルド先になる
+    with pytest.raises(ValueError, match="same out and ref"):
+        load([dict(store, store_id="a"), dict(store, store_id="b", ref="r1")])
+    entries = load([dict(store, store_id="a"), dict(store, store_id="b", ref="r2"),
+                    dict(store, store_id="c", out="out2")])
+    assert [e["store_id"] for e in entries] == ["a", "b", "c"]
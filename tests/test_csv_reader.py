@@ -0,0 +1,40 @@
+import pytest
+
+from webmenu.parsers.csv_reader import decode_bytes, detect_dialect, read_csv_rows
+
+
+@pytest.mark.parametrize("text, delimiter, skip", [
+    ("a,b,c\n1,2,3\n", ",", False),
+    ("a, b\n1, 2\n", ",", True),
+    ("101\tShrimp\n103\tBig, shrimp\n", "\t", False),
+    # 同数ならタブ（カンマを含む値があるタブ区切り）
+    ("#c\n103\tBig, shrimp\n", "\t", False),
+    # 行ごとの区切り数が揃っている方を選ぶ
+    ("1\tA, B, C\n2\tD\n3\tE, F\n", "\t", False),
+    ("a,b\tc,d\n1,2,3\n4,5,6\n", ",", False),
+    ("single\n", ",", False),
+    ("", ",", False),
+])
+def test_detect_dialect(text, delimiter, skip):
+    assert detect_dialect(text) == {"delimiter": delimiter, "skipinitialspace": skip}
+
+
+def test_decode_bytes_tries_each_encoding():
+    assert decode_bytes(b"\xef\xbb\xbf" + "あ".encode("utf-8")) == ("あ", "utf-8-sig")
+    assert decode_bytes("エビ".encode("cp932")) == ("エビ", "cp932")
+    with pytest.raises(UnicodeDecodeError):
+        decode_bytes(b"\xff\xfe\x00", ("utf-8", "ascii"))
+    with pytest.raises(UnicodeDecodeError):
+        decode_bytes(b"\xff", ("utf-8",))
+
+
+def test_read_csv_rows(tmp_path):
+    path = tmp_path / "iteminfoLang.csv"
+    path.write_bytes("#c\r\n103\tBig, shrimp\r\n105\t\"Q\"\r\n".encode("cp932"))
+    assert list(read_csv_rows(str(path))) == [["#c"], ["103", "Big, shrimp"], ["105", "Q"]]
+
+    path.write_bytes("ItemCode, Name\n101, エビ\n".encode("utf-8-sig"))
+    assert list(read_csv_rows(str(path))) == [["ItemCode", "Name"], ["101", "エビ"]]
+
+    path.write_bytes(b"")
+    assert list(read_csv_rows(str(path))) == []
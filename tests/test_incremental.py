@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from webmenu.core.incremental import (
+    ALL_GROUPS, CONFIG, DATAS, IMAGES, MENUDB, OSUSUME_GROUP, IncrementalBuild)
+from webmenu.core.inventory import SourceInventory
+from webmenu.pipeline import PROCESSED_INPUTS, RAW_DUMP_INPUTS, SMALL_PAGE_INPUTS
+
+SMALL_PAGE = "web_content/small/sm-0201011/page.json"
+ASSETS = ("L1.png", "bk1.jpg")
+
+
+def _write(path, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _append(path, data: bytes):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _previous_build(root, free, osusume, version="v1"):
+    """前回ビルド相当（build_inputs.json と各出力・素材）を作る。"""
+    incremental = IncrementalBuild(root, version, free, SourceInventory(free, osusume))
+    incremental.save()
+    for name in PROCESSED_INPUTS:
+        _write(os.path.join(root, "web_content", "processed_dump", name), name.encode())
+    for name in RAW_DUMP_INPUTS:
+        _write(os.path.join(root, "web_content", "raw_dump", name, "a", "x.json"), name.encode())
+    _write(os.path.join(root, *SMALL_PAGE.split("/")), b"page")
+    for name in ASSETS:
+        _write(os.path.join(root, "web_content", "assets", "free_images", name), name.encode())
+    return incremental
+
+
+def _current(root, free, osusume, previous, version="v1"):
+    return IncrementalBuild(root, version, free, SourceInventory(free, osusume), previous_dir=previous)
+
+
+def _linked(current, rel):
+    return os.path.samefile(os.path.join(current.out_root, *rel.split("/")),
+                            os.path.join(current.previous_dir, *rel.split("/")))
+
+
+def _copy_assets(current, free):
+    for name in ASSETS:
+        current.copy_asset(os.path.join(free, "images", name),
+                           os.path.join(current.out_root, "web_content", "assets", "free_images", name))
+
+
+CHANGES = {
+    MENUDB: ("free", "datas/menudb.dat"),
+    CONFIG: ("free", "config/other.ini"),
+    DATAS: ("free", "datas/iteminfoLang.csv"),
+    OSUSUME_GROUP: ("osusume", "smenu/02/01/02/itemcell.csv"),
+    IMAGES: ("free", "images/L1.png"),
+}
+
+
+@pytest.mark.parametrize("group", ALL_GROUPS)
+def test_only_outputs_of_the_changed_group_are_regenerated(tmp_path, legacy_src, group):
+    free, osusume = legacy_src
+    previous = str(tmp_path / "r1")
+    _previous_build(previous, free, osusume)
+    root, rel = CHANGES[group]
+    _append(os.path.join(free if root == "free" else osusume, *rel.split("/")), b"\n")
+
+    current = _current(str(tmp_path / "r2"), free, osusume, previous)
+    assert current.changed == {group}
+
+    for name, groups in PROCESSED_INPUTS.items():
+        rel = f"web_content/processed_dump/{name}"
+        assert current.link_forward(rel, groups) == (group not in groups), name
+        if group not in groups:
+            assert _linked(current, rel)
+    assert current.link_forward(SMALL_PAGE, SMALL_PAGE_INPUTS) == (group not in SMALL_PAGE_INPUTS)
+    for name, groups in RAW_DUMP_INPUTS.items():
+        rel = f"web_content/raw_dump/{name}"
+        assert current.link_tree(rel, groups) == (group not in groups), name
+        if group not in groups:
+            assert _linked(current, f"{rel}/a/x.json")
+
+    # 素材は元ファイル単位（変更した L1.png だけコピーし直す）
+    _copy_assets(current, free)
+    assert _linked(current, "web_content/assets/free_images/bk1.jpg")
+    assert _linked(current, "web_content/assets/free_images/L1.png") == (group != IMAGES)
+
+
+def _touch(paths):
+    for path in paths:
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_mtime_only_change_is_detected_by_hash(tmp_path, legacy_src):
+    free, osusume = legacy_src
+    previous = str(tmp_path / "r1")
+    _previous_build(previous, free, osusume)
+    touched = [os.path.join(free, "images", "L1.png"),
+               os.path.join(osusume, "smenu", "02", "01", "02", "itemcell.csv"),
+               os.path.join(free, "config", "menu.ini")]
+    _touch(touched)
+
+    # config などは常にハッシュを持つので更新日時だけの変更は変更とみなさない。
+    # 画像・おすすめは前回のハッシュが無いので変更扱い（今回ハッシュを記録する）
+    current = _current(str(tmp_path / "r2"), free, osusume, previous)
+    assert current.changed == {IMAGES, OSUSUME_GROUP}
+    assert current.groups[IMAGES]["L1.png"][2]
+    assert current.groups[IMAGES]["bk1.jpg"][2] == ""
+    assert current.groups[OSUSUME_GROUP]["02/01/02/itemcell.csv"][2]
+    assert current.groups[OSUSUME_GROUP]["02/01/01/frameinf.ini"][2] == ""
+    assert all(entry[2] for entry in current.groups[CONFIG].values())
+    _copy_assets(current, free)
+    assert _linked(current, "web_content/assets/free_images/bk1.jpg")
+    assert not _linked(current, "web_content/assets/free_images/L1.png")
+    current.save()
+
+    # 次のビルドでは記録したハッシュで比較し、内容が同じなら引き継ぐ
+    _touch(touched)
+    after = _current(str(tmp_path / "r3"), free, osusume, current.out_root)
+    assert after.changed == set()
+    _copy_assets(after, free)
+    assert _linked(after, "web_content/assets/free_images/L1.png")
+
+    # 同じサイズで内容が変わった場合はハッシュで変更とみなす
+    with open(touched[0], "r+b") as f:
+        f.write(b"X")
+    after = _current(str(tmp_path / "r4"), free, osusume, current.out_root)
+    assert after.changed == {IMAGES}
+
+
+def test_version_mismatch_regenerates_everything(tmp_path, legacy_src):
+    free, osusume = legacy_src
+    previous = str(tmp_path / "r1")
+    _previous_build(previous, free, osusume)
+
+    current = _current(str(tmp_path / "r2"), free, osusume, previous, version="v2")
+    assert current.previous_dir is None
+    assert current.changed == set(ALL_GROUPS)
+    assert not current.link_forward("web_content/processed_dump/soldout.json", PROCESSED_INPUTS["soldout.json"])
+    assert not current.link_tree("web_content/raw_dump/ini", RAW_DUMP_INPUTS["ini"])
+    _copy_assets(current, free)
+    asset = os.path.join(current.out_root, "web_content", "assets", "free_images", "L1.png")
+    assert not os.path.samefile(asset, os.path.join(previous, "web_content", "assets", "free_images", "L1.png"))
+    assert current.linked == 0
@@ -0,0 +1,39 @@
+from webmenu.core.inventory import SourceInventory
+from webmenu.mapping.to_web_jump_btns import make_checkin_btns_json, make_jump_btns_json
+from webmenu.mapping.to_web_soldout import make_soldout_json
+from webmenu.parsers.ini_loader import parse_ini_text
+
+MENU_INI = """[soldout]
+FrmBtnImgName=sold1.png
+FrmBtnImgName02=sold2.png
+CellBtnImgName3=cell3.png
+[checkin_hansoku]
+Scr01BackImgName=back1.png
+Scr01Btn01Type=1,2
+Scr01Btn1Pos=10,20
+Scr2Btn2Type=3
+"""
+
+JUMPMENU_INI = """[jumpmenu]
+JmpMenu01No=1,2
+JmpMenu2No=3
+JmpMenu1BtnImg=
+"""
+
+
+def test_zero_padded_numbers_keep_their_keys():
+    bundle = {"menu.ini": parse_ini_text(MENU_INI), "jumpmenu.ini": parse_ini_text(JUMPMENU_INI)}
+    assert bundle["menu.ini"]["families"]["soldout"]["FrmBtnImgName"] == {"02": {"": "sold2.png"}}
+
+    soldout = make_soldout_json(bundle)
+    assert soldout["frm_btn_images"] == {"1": "sold1.png", "02": "sold2.png"}
+    assert soldout["cell_btn_images"] == {"3": "cell3.png"}
+
+    # 画面番号は書かれた文字列のまま、ボタン番号は数値（01 と 1 は同じボタン）
+    screens = make_checkin_btns_json(SourceInventory(), bundle)["checkin_hansoku"]["screens"]
+    assert list(screens) == ["01", "2"]
+    assert screens["01"]["buttons"] == [{"id": 1, "type": [1, 2], "pos": {"x": 10, "y": 20}}]
+    assert screens["2"]["buttons"] == [{"id": 2, "type": [3]}]
+
+    buttons = make_jump_btns_json(SourceInventory(), bundle)["jumpmenu"]["buttons"]
+    assert buttons == [{"id": 1, "menuNo": [1, 2], "image": {}}, {"id": 2, "menuNo": [3]}]
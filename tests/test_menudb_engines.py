@@ -0,0 +1,77 @@
+import pytest
+
+from legacy_data import build_menudb
+from webmenu.parsers import menudb_reader as R
+from webmenu.parsers.menudb_reader import read_menudb
+
+pytest.importorskip("numpy")
+
+
+def _header_counts(data: bytes):
+    L, M = data[R.HEADER_INFORMATION_LMENU_MAX], data[R.HEADER_INFORMATION_MMENU_MAX]
+    smenus = R._be_u32(data, R.HEADER_INFORMATION_SMENU_NUM)
+    cells = R._be_u32(data, R.HEADER_INFORMATION_ITEM_CELL_NUM)
+    frames = R._be_u32(data, R.HEADER_INFORMATION_ITEM_FRM_NUM)
+    return L, M, smenus, cells, frames
+
+
+def _item_info_offset(data: bytes, i: int) -> int:
+    return R._item_info_base(*_header_counts(data)) + R.ITEM_INFORMATION_SIZE * i
+
+
+def _cell_offset(data: bytes, i: int) -> int:
+    L, M, smenus, _, _ = _header_counts(data)
+    return (R.LMENU_INFORMATION + R.LMENU_INFORMATION_SIZE * L + R.MMENU_INFORMATION_SIZE * L * M
+            + R.SMENU_INFORMATION_SIZE * smenus + R.ITEM_CELL_INFORMATION_SIZE * i)
+
+
+def _assert_same(tmp_path, data: bytes):
+    path = tmp_path / "menudb.dat"
+    path.write_bytes(data)
+    python = read_menudb(str(path), "python")
+    numpy = read_menudb(str(path), "numpy")
+    assert numpy.keys() == python.keys()
+    for name in python:
+        assert numpy[name] == python[name], name
+    return python
+
+
+@pytest.mark.parametrize("scale", [1, 3])
+def test_numpy_engine_matches_python(tmp_path, scale):
+    result = _assert_same(tmp_path, build_menudb(scale))
+    assert len(result["item_infos"]) == 40 * scale
+    assert result["sub_code_infos"]
+
+
+@pytest.mark.parametrize("where", ["item_info", "cell", "sub_block"])
+def test_numpy_engine_matches_python_on_truncated_file(tmp_path, where):
+    data = build_menudb()
+    cut = {
+        "item_info": _item_info_offset(data, 7) + R.ITEM_INFORMATION_SIZE // 2,
+        "cell": _cell_offset(data, 10) + 5,
+        "sub_block": len(data) - 3,
+    }[where]
+    result = _assert_same(tmp_path, data[:cut])
+    if where == "item_info":
+        assert len(result["item_infos"]) == 7
+        assert result["sub_code_infos"] == []
+
+
+def test_numpy_engine_matches_python_on_lone_surrogates(tmp_path):
+    data = bytearray(build_menudb())
+    size = len(data)
+    # 商品名: 孤立した上位・下位サロゲート / 欄の末尾で途切れたサロゲート / 正しいサロゲートペア
+    off = _item_info_offset(data, 1) + 16
+    data[off:off + 8] = b"\xd8\x00\x00A\xdc\x00\x00B"
+    off = _item_info_offset(data, 2) + 16
+    data[off:off + 64] = b"\x30\x42" * 31 + b"\xd8\x3d"
+    off = _item_info_offset(data, 4) + 16
+    data[off:off + 8] = b"\x00A\xd8\x3d\xde\x00\x00\x00"
+    # セル名の孤立サロゲート・ファイル名の不正な Shift_JIS
+    off = _cell_offset(data, 1) + 4
+    data[off:off + 4] = b"\xdb\xff\x00C"
+    off = _item_info_offset(data, 3) + 96
+    data[off:off + 4] = b"\x81\xff\x82a"
+    assert len(data) == size
+    result = _assert_same(tmp_path, bytes(data))
+    assert result["item_infos"][4].name == "A\U0001f600"
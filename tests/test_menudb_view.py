@@ -0,0 +1,50 @@
+import pytest
+
+from legacy_data import build_menudb
+from webmenu.core.refs import RefTable
+from webmenu.mapping.to_web_small_pages import iter_small_pages
+from webmenu.parsers.ini_loader import load_all_ini
+from webmenu.parsers.menudb_reader import read_menudb
+from webmenu.parsers.menudb_view import MIN_HEADER_SIZE, MenuDbView
+from webmenu.parsers.osusume_reader import read_osusume
+
+
+@pytest.mark.parametrize("cut", [None, -3, 5000])
+def test_view_matches_read_menudb(tmp_path, cut):
+    path = tmp_path / "menudb.dat"
+    path.write_bytes(build_menudb(2)[:cut])
+    expected = read_menudb(str(path))
+    with MenuDbView(str(path)) as view:
+        for name in MenuDbView.TABLES:
+            table = view[name]
+            assert len(table) == len(expected[name]), name
+            assert list(table) == expected[name], name
+            # 逆順にアクセスしても同じレコード（キャッシュの有無で変わらない）
+            assert [table[i] for i in reversed(range(len(table)))] == expected[name][::-1], name
+        assert view["meta"] == expected["meta"]
+        assert view.get("missing") is None
+
+
+def test_view_can_be_passed_to_the_mappers(legacy_src):
+    free, osusume_dir = legacy_src
+    path = f"{free}/datas/menudb.dat"
+    menudb = read_menudb(path)
+    osusume = read_osusume(osusume_dir)
+    ini_bundle = load_all_ini(f"{free}/config")
+    expected_refs = RefTable.from_menudb(menudb)
+    expected = list(iter_small_pages(menudb, expected_refs, osusume, ini_bundle))
+    assert expected
+
+    with MenuDbView(path) as view:
+        refs = RefTable.from_menudb(view)
+        assert refs.item_info_by_code == expected_refs.item_info_by_code
+        assert refs.item_info_by_addr == expected_refs.item_info_by_addr
+        assert list(iter_small_pages(view, refs, osusume, ini_bundle)) == expected
+
+
+@pytest.mark.parametrize("size", [0, MIN_HEADER_SIZE - 1])
+def test_short_file_raises_a_clear_error(tmp_path, size):
+    path = tmp_path / "menudb.dat"
+    path.write_bytes(build_menudb()[:size])
+    with pytest.raises(ValueError, match="too short"):
+        MenuDbView(str(path))
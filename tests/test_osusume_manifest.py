@@ -0,0 +1,44 @@
+import os
+
+from webmenu import BuildSession
+
+
+def _small_pages(out_root):
+    small = os.path.join(out_root, "web_content", "small")
+    pages = {}
+    for dirpath, _, files in os.walk(small):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                pages[os.path.relpath(path, small)] = f.read()
+    return pages
+
+
+def test_unchanged_variants_are_reused(tmp_path, legacy_src):
+    free, osusume = legacy_src
+    session = BuildSession(free, osusume, str(tmp_path / "out"))
+    session.build("r1", {"skip_assets": True})
+    assert session.results["manifest"].rebuilt == 3
+
+    # 更新日時だけの変化は変更とみなさない
+    frameinf = os.path.join(osusume, "smenu", "02", "01", "01", "frameinf.ini")
+    os.utime(frameinf, (1, 1))
+    session.refresh_inputs()
+    session.build("r2", {"skip_assets": True})
+    manifest = session.results["manifest"]
+    assert (manifest.reused, manifest.rebuilt) == (3, 0)
+    assert manifest.pages_reused > 0
+
+    # 1 バリアントだけ変更すると、そのバリアントだけ読み直す
+    itemcell = os.path.join(osusume, "smenu", "02", "01", "02", "itemcell.csv")
+    with open(itemcell, "a", encoding="shift_jis") as f:
+        f.write("a,b,c,d,4,4,111\n")
+    session.refresh_inputs()
+    r3 = session.build("r3", {"skip_assets": True})
+    manifest = session.results["manifest"]
+    assert (manifest.reused, manifest.rebuilt) == (2, 1)
+
+    # 再利用したページも含め、前回ビルドなしで作った結果と同じ
+    fresh = BuildSession(free, osusume, str(tmp_path / "fresh")).build("r3", {"skip_assets": True})
+    assert _small_pages(r3) == _small_pages(fresh)
+    assert _small_pages(r3) != _small_pages(os.path.join(str(tmp_path / "out"), "builds", "r1"))
@@ -0,0 +1,29 @@
+import os
+import shutil
+
+import pytest
+
+from webmenu.core.parse_cache import ParseCache
+from webmenu.parsers.osusume_reader import read_osusume
+
+
+@pytest.mark.parametrize("jobs", [2, 4, 8])
+def test_parallel_read_matches_serial(tmp_path, legacy_src, jobs):
+    _, osusume = legacy_src
+    # 完了順がばらつくようにバリアントを増やす
+    for v in range(3, 12):
+        shutil.copytree(os.path.join(osusume, "smenu", "02", "01", "02"),
+                        os.path.join(osusume, "smenu", "02", "01", f"{v:02d}"))
+    serial = read_osusume(osusume, jobs=1)
+    assert serial["entries"]
+    assert read_osusume(osusume, jobs=jobs) == serial
+
+
+def test_parallel_read_with_cache_matches_serial(tmp_path, legacy_src):
+    _, osusume = legacy_src
+    serial = read_osusume(osusume, jobs=1)
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert read_osusume(osusume, cache=cache, jobs=4) == serial
+    # 2 回目はキャッシュから（並列でも結果・順序は同じ）
+    assert read_osusume(osusume, cache=cache, jobs=4) == serial
+    assert cache.hits > 0
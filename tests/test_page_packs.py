@@ -0,0 +1,55 @@
+import json
+import os
+
+from webmenu.dumpers.json_writer import JsonEmitter, WriterPool, write_bytes
+from webmenu.dumpers.page_packs import PagePacks
+
+from test_pipeline import build, read_bytes
+
+
+def _packs(tmp_path):
+    written = []
+
+    def write_file(path, data):
+        written.append(os.path.relpath(path, str(tmp_path)).replace(os.sep, "/"))
+        return write_bytes(path, data)
+
+    writer = WriterPool(JsonEmitter("compact"), workers=0, write_file=write_file)
+    return PagePacks(str(tmp_path), writer), written
+
+
+def test_pack_is_written_when_the_large_category_changes(tmp_path):
+    packs, written = _packs(tmp_path)
+    packs.add("small/sm-0101001/page-1.json", b'{"a":1}')
+    packs.add("small/sm-0101001/cells.json", b"[]")
+    assert written == []
+    packs.add("small/sm-0201001/page-1.json", b'{"b":2}')
+    assert written == ["packs/L01.json"]
+
+    # 書き出し済みの大分類のページが後から来た場合も、パックにすべて入る
+    packs.add("small/sm-0102001/page-1.json", b'{"c":3}')
+    futures = packs.flush()
+    assert written == ["packs/L01.json", "packs/L02.json", "packs/L01.json"]
+    assert len(futures) == 2
+    pack = json.loads(read_bytes(tmp_path / "packs" / "L01.json"))
+    assert pack == {"schema_version": "0.1", "large": "L01", "files": {
+        "small/sm-0101001/page-1.json": {"a": 1},
+        "small/sm-0101001/cells.json": [],
+        "small/sm-0102001/page-1.json": {"c": 3}}}
+
+
+def test_packs_hold_the_same_pages_as_the_individual_files(tmp_path, legacy_src):
+    web_dir = os.path.join(build(legacy_src, tmp_path / "out", page_packs=True), "web_content")
+    names = sorted(os.listdir(os.path.join(web_dir, "packs")))
+    assert names
+    packed = {}
+    for name in names:
+        pack = json.loads(read_bytes(os.path.join(web_dir, "packs", name)))
+        assert pack["large"] == os.path.splitext(name)[0]
+        packed.update(pack["files"])
+    pages = {}
+    for dirpath, _, files in os.walk(os.path.join(web_dir, "small")):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            pages[os.path.relpath(path, web_dir).replace(os.sep, "/")] = json.loads(read_bytes(path))
+    assert packed == pages
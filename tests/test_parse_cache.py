@@ -0,0 +1,116 @@
+import os
+
+from webmenu.core.parse_cache import MemoryParseCache, ParseCache, cached
+from webmenu.parsers.menudb_reader import read_menudb
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _write(path, data: bytes, mtime_ns=None):
+    with open(path, "wb") as f:
+        f.write(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_parse_cache_hits_until_content_or_version_changes(tmp_path):
+    src = str(tmp_path / "a.dat")
+    _write(src, b"one")
+    cache = ParseCache(str(tmp_path / "cache"))
+    parse = Counter()
+
+    assert cache.get_or_parse("k", 1, [src], parse, src) == b"one"
+    assert cache.get_or_parse("k", 1, [src], parse, src) == b"one"
+    assert parse.calls == 1
+
+    _write(src, b"two")
+    assert cache.get_or_parse("k", 1, [src], parse, src) == b"two"
+    assert parse.calls == 2
+
+    # パーサーバージョン・付加情報が変わると再解析する
+    assert cache.get_or_parse("k", 2, [src], parse, src) == b"two"
+    assert cache.get_or_parse("k", 2, [src], parse, src, extra=("x",)) == b"two"
+    assert parse.calls == 4
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_parse_cache_by_path_false_shares_identical_content(tmp_path):
+    a, b = str(tmp_path / "a.dat"), str(tmp_path / "b.dat")
+    _write(a, b"same")
+    _write(b, b"same")
+    cache = ParseCache(str(tmp_path / "cache"))
+    parse = Counter()
+
+    cache.get_or_parse("k", 1, [a], parse, a, by_path=False)
+    cache.get_or_parse("k", 1, [b], parse, b, by_path=False)
+    assert parse.calls == 1
+    cache.get_or_parse("k", 1, [b], parse, b)
+    assert parse.calls == 2
+
+
+def test_parse_cache_reparses_corrupt_entry_and_prunes_oldest(tmp_path):
+    src = str(tmp_path / "a.dat")
+    _write(src, b"x" * 100)
+    cache_dir = tmp_path / "cache"
+    cache = ParseCache(str(cache_dir), max_bytes=0)
+    parse = Counter()
+    cache.get_or_parse("k", 1, [src], parse, src)
+    (entry,) = list(cache_dir.iterdir())
+    entry.write_bytes(b"not a pickle")
+
+    assert cache.get_or_parse("k", 1, [src], parse, src) == b"x" * 100
+    assert parse.calls == 2
+    cache.prune()
+    assert list(cache_dir.iterdir()) == []
+    assert cache.evicted == 1
+
+
+def test_memory_cache_invalidates_on_stat_change(tmp_path):
+    src = str(tmp_path / "a.dat")
+    _write(src, b"one", mtime_ns=1_000_000_000)
+    disk = ParseCache(str(tmp_path / "cache"))
+    cache = MemoryParseCache(disk)
+    parse = Counter()
+
+    cached(cache, "k", 1, [src], parse, src)
+    cached(cache, "k", 1, [src], parse, src)
+    assert (cache.hits, disk.misses) == (1, 1)
+
+    # 同じサイズでも更新日時が変われば読み直す（内容が同じならディスクキャッシュに当たる）
+    _write(src, b"one", mtime_ns=2_000_000_000)
+    cached(cache, "k", 1, [src], parse, src)
+    assert (cache.misses, disk.hits, parse.calls) == (2, 1, 1)
+    _write(src, b"two", mtime_ns=3_000_000_000)
+    assert cached(cache, "k", 1, [src], parse, src) == b"two"
+    assert parse.calls == 2
+
+    # 直近 2 回のビルドで使われていないエントリは破棄する
+    cache.prune()
+    cache.prune()
+    cache.prune()
+    assert cache.evicted == 3
+
+
+def test_cached_menudb_follows_file_changes(tmp_path, legacy_src):
+    free, _ = legacy_src
+    path = os.path.join(free, "datas", "menudb.dat")
+    cache = ParseCache(str(tmp_path / "cache"))
+    first = cached(cache, "menudb", 1, [path], read_menudb, path)
+    assert cached(cache, "menudb", 1, [path], read_menudb, path)["item_infos"] == first["item_infos"]
+
+    with open(path, "r+b") as f:
+        data = bytearray(f.read())
+        data[4] = 2  # 大分類数 3 → 2
+        f.seek(0)
+        f.write(data)
+    changed = cached(cache, "menudb", 1, [path], read_menudb, path)
+    assert len(changed["lmenus"]) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+
+from webmenu import BuildSession
+
+
+def build(legacy_src, out, ref="r1", **options):
+    free, osusume = legacy_src
+    return BuildSession(free, osusume, str(out)).build(ref, options)
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_pretty_output_indents_every_processed_dump_file(tmp_path, legacy_src):
+    out_root = build(legacy_src, tmp_path / "out", output_format="pretty", skip_assets=True)
+    processed = os.path.join(out_root, "web_content", "processed_dump")
+    for name in sorted(os.listdir(processed)):
+        assert read_bytes(os.path.join(processed, name)).startswith(b"{\n  "), name
+
+    out_root = build(legacy_src, tmp_path / "compact", skip_assets=True)
+    submenus = read_bytes(os.path.join(out_root, "web_content", "processed_dump", "submenus.json"))
+    assert b"\n" not in submenus
+
+
+def tree_bytes(top, exclude=("build_profile.json", "build_inputs.json")):
+    files = {}
+    for dirpath, _, names in os.walk(top):
+        for name in names:
+            if name not in exclude:
+                path = os.path.join(dirpath, name)
+                files[os.path.relpath(path, top)] = read_bytes(path)
+    return files
+
+
+def test_parallel_stages_write_the_same_output_as_serial(tmp_path, legacy_src):
+    serial = build(legacy_src, tmp_path / "jobs1", jobs=1, writers=0, page_packs=True)
+    expected = tree_bytes(serial)
+    assert "web_content/build_manifest.json" in expected
+    for jobs in (4, 8):
+        out_root = build(legacy_src, tmp_path / f"jobs{jobs}", jobs=jobs, writers=jobs, page_packs=True)
+        assert tree_bytes(out_root) == expected, jobs
+
+
+def test_rebuilding_a_ref_leaves_the_linked_previous_build_intact(tmp_path, legacy_src):
+    out = tmp_path / "out"
+    first = build(legacy_src, out, ref="a")
+    first_web = os.path.join(first, "web_content")
+    expected = tree_bytes(first_web)
+    second = build(legacy_src, out, ref="b")
+    index_html = os.path.join("web_content", "index.html")
+    assert os.path.samefile(os.path.join(first, index_html), os.path.join(second, index_html))
+
+    # 前回ビルドとハードリンクを共有している出力を書き換えても、前回ビルドは変わらない
+    build(legacy_src, out, ref="b", show_dev_ui=True)
+    assert read_bytes(os.path.join(second, index_html)) != expected["index.html"]
+    assert tree_bytes(first_web) == expected
+    manifest = json.loads(expected["build_manifest.json"])
+    for entry in manifest["files"]:
+        data = expected[entry["path"].replace("/", os.sep)]
+        assert hashlib.sha256(data).hexdigest() == entry["sha256"], entry["path"]
+
+
+def test_precompress_sidecars_stay_out_of_linked_trees_and_the_manifest(tmp_path, legacy_src):
+    out = tmp_path / "out"
+    first = build(legacy_src, out, ref="a", precompress=True)
+    raw_dump = os.path.join(first, "web_content", "raw_dump")
+    assert any(name.endswith(".gz") for _, _, names in os.walk(raw_dump) for name in names)
+
+    def check(out_root, precompress):
+        web_dir = os.path.join(out_root, "web_content")
+        on_disk = {rel.replace(os.sep, "/") for rel in tree_bytes(web_dir)} - {"build_manifest.json"}
+        manifest = json.loads(read_bytes(os.path.join(web_dir, "build_manifest.json")))
+        assert {entry["path"] for entry in manifest["files"]} == on_disk
+        assert any(rel.endswith(".gz") for rel in on_disk) == precompress
+        dir_info = json.loads(read_bytes(os.path.join(web_dir, "dir_info.json")))
+        assert not any(name.endswith((".gz", ".br")) for names in dir_info.values() for name in names)
+
+    # raw_dump は前回ビルドから引き継ぐ（圧縮版は引き継がず、事前圧縮のステージが作る）
+    second = build(legacy_src, out, ref="b", incremental_from="a", precompress=True)
+    check(second, True)
+    check(build(legacy_src, out, ref="b", incremental_from="a"), False)
+    check(build(legacy_src, out, ref="c", incremental_from="a"), False)
+
+
+def counters(out_root):
+    return json.loads(read_bytes(os.path.join(out_root, "build_profile.json")))["counters"]
+
+
+def test_unchanged_rebuild_links_assets_instead_of_copying(tmp_path, legacy_src):
+    out = tmp_path / "out"
+    first = counters(build(legacy_src, out, ref="a"))
+    assert first["assets_copied"] > 0
+    assert first["assets_linked"] == 0
+
+    second = counters(build(legacy_src, out, ref="b", incremental_from="a"))
+    assert second["assets_copied"] == 0
+    assert second["assets_linked"] == first["assets_copied"]
+
+
+def test_file_counters_separate_written_linked_and_kept(tmp_path, legacy_src):
+    out = tmp_path / "out"
+    first = counters(build(legacy_src, out, ref="a", precompress=True))
+    assert first["files_written"] > 0
+    assert first["files_compressed"] > 0
+
+    # 変更の無い再ビルドでは、新しく書くのは build_manifest.json（新しい ref）だけ
+    second = counters(build(legacy_src, out, ref="b", incremental_from="a", precompress=True))
+    assert second["files_written"] == 1
+    assert second["files_linked"] == first["files_written"] - 1
+    assert second["files_compressed"] == 0
+    assert second["files_compressed_reused"] == first["files_compressed"]
+
+    # 同じ ref の再ビルドでは build_manifest.json も同じ内容なので書き込まない
+    third = counters(build(legacy_src, out, ref="b", incremental_from="a", precompress=True))
+    assert third.get("files_written", 0) == 0
+    assert third["files_compressed"] == 0
@@ -0,0 +1,40 @@
+import json
+import os
+import sys
+import tracemalloc
+
+from webmenu import cli
+from webmenu.core.build_profile import PROFILE_FILE
+from webmenu.core.profiling import COLLAPSED_FILE, PROFILE_DIR, PSTATS_FILE, TRACEMALLOC_FILE
+
+
+def test_generate_with_profile_writes_diagnostics(tmp_path, legacy_src, monkeypatch):
+    free, osusume = legacy_src
+    out = tmp_path / "out"
+    monkeypatch.setattr(sys, "argv", [
+        "webmenu", "generate", "--free", free, "--osusume", osusume, "--out", str(out),
+        "--ref", "r1", "--skip-assets", "--profile", "--jobs", "4"])
+    cli.main()
+
+    out_root = out / "builds" / "r1"
+    profile_dir = out_root / PROFILE_DIR
+    for name in (PSTATS_FILE, COLLAPSED_FILE, TRACEMALLOC_FILE):
+        assert (profile_dir / name).stat().st_size > 0, name
+    assert (profile_dir / TRACEMALLOC_FILE).read_text(encoding="utf-8").startswith("current=")
+    assert not tracemalloc.is_tracing()
+
+    with open(os.path.join(out_root, PROFILE_FILE), encoding="utf-8") as f:
+        profile = json.load(f)
+    # --profile ではステージを逐次実行し、各ステージに確保元の上位が入る
+    assert profile["jobs"] == 1
+    assert profile["stages"]
+    assert all("allocations" in stage for stage in profile["stages"])
+
+    # tracemalloc が無効な通常のビルドでは allocations を出さない
+    monkeypatch.setattr(sys, "argv", [
+        "webmenu", "generate", "--free", free, "--osusume", osusume, "--out", str(out),
+        "--ref", "r2", "--skip-assets"])
+    cli.main()
+    with open(os.path.join(out, "builds", "r2", PROFILE_FILE), encoding="utf-8") as f:
+        assert not any("allocations" in stage for stage in json.load(f)["stages"])
+    assert not (out / "builds" / "r2" / PROFILE_DIR).exists()
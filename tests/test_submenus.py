@@ -0,0 +1,27 @@
+import copy
+import logging
+
+from webmenu.core.refs import RefTable
+from webmenu.mapping.to_web_submenus import make_submenu_graph
+from webmenu.parsers.menudb_reader import read_menudb
+
+
+def test_duplicate_item_code_keeps_the_first_entry(legacy_src, caplog):
+    free, _ = legacy_src
+    menudb = read_menudb(f"{free}/datas/menudb.dat")
+    refs = RefTable.from_menudb(menudb)
+    expected = make_submenu_graph(menudb, refs)
+    assert expected["items"]["101"]["pages"] == ["sub-001"]
+
+    # 101 と同じコードで、サブメニューを持たずセット商品だけ持つ商品を後ろに追加する
+    infos = menudb["item_infos"]
+    duplicate = copy.copy(next(info for info in infos if info.code == 101))
+    duplicate.index = len(infos)
+    duplicate.subMenuFlg = 0
+    duplicate.setItemAddr = next(info for info in infos if info.code == 103).setItemAddr
+    menudb["item_infos"] = infos + [duplicate]
+
+    with caplog.at_level(logging.WARNING, logger="webmenu_generator"):
+        graph = make_submenu_graph(menudb, refs)
+    assert graph == expected
+    assert "101" in caplog.text
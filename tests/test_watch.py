@@ -0,0 +1,49 @@
+import copy
+import os
+
+from webmenu import cli, watch
+from webmenu.session import BuildSession
+
+
+def test_watch_rebuilds_incrementally_and_prunes_old_builds(tmp_path, legacy_src, monkeypatch):
+    free, osusume = legacy_src
+    out = str(tmp_path / "out")
+    args = cli.build_parser().parse_args([
+        "watch", "--free", free, "--osusume", osusume, "--out", out,
+        "--interval", "0.01", "--keep-builds", "1", "--skip-assets"])
+
+    builds = []
+    original_build = BuildSession.build
+
+    def build(self, ref, options):
+        builds.append((ref, options.incremental_from))
+        return original_build(self, ref, options)
+
+    statuses = []
+    original_write_status = watch.write_status
+
+    def write_status(path, status):
+        statuses.append(copy.deepcopy(status))
+        if status["state"] == "watching" and status["builds"] == 1 and len(builds) == 1:
+            # 1 回目のビルド後に入力を変更する
+            with open(os.path.join(free, "config", "other.ini"), "a", encoding="shift_jis") as f:
+                f.write("B=1\n")
+        original_write_status(path, status)
+
+    monkeypatch.setattr(BuildSession, "build", build)
+    monkeypatch.setattr(watch, "write_status", write_status)
+    watch.run_watch(args, max_builds=2)
+
+    (first, first_from), (second, second_from) = builds
+    assert first_from == ""
+    assert second_from == first
+    assert [s["state"] for s in statuses] == [
+        "watching", "building", "watching", "building", "watching", "stopped"]
+    assert statuses[-1]["builds"] == 2
+    assert statuses[-1]["last"]["ref"] == second
+    assert statuses[-1]["last"]["result"] == "done"
+    assert statuses[3]["current"]["changed_files"] == 1
+    assert os.path.isfile(os.path.join(out, watch.STATUS_FILE))
+
+    # --keep-builds 1: 最も古い watch ビルドは削除される
+    assert sorted(os.listdir(os.path.join(out, "builds"))) == [second]